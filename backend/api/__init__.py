@@ -8,6 +8,7 @@ def register_blueprints(app: Flask):
     from .navigation import nav_bp
     from .project import project_bp
     from .blog import blog_bp
+    from .search import search_bp
     from .version import version_bp
 
     app.register_blueprint(auth_bp, url_prefix="/api/auth")
@@ -15,4 +16,5 @@ def register_blueprints(app: Flask):
     app.register_blueprint(nav_bp, url_prefix="/api/navigation")
     app.register_blueprint(project_bp, url_prefix="/api/project")
     app.register_blueprint(blog_bp, url_prefix="/api/blog")
+    app.register_blueprint(search_bp, url_prefix="/api/search")
     app.register_blueprint(version_bp, url_prefix="/api/version")
@@ -4,11 +4,13 @@
 # @description: 博客模块
 # ------------------------------------------------------------
 
-from flask import Blueprint, jsonify, request, send_file, session
+from flask import Blueprint, jsonify, request, session
 
 from backend.config import ROLE_ADMIN, ROLE_GUEST
+from backend.core.FileSender import send_file_response
 from backend.core.Logger import get_logger
 from backend.core.Security import require_member
+from backend.data.pagination import parse_limit
 from backend.services import blog_service
 
 logger = get_logger("API_Blog")
@@ -49,8 +51,40 @@ def get_blogs():
 
     # 如果是管理员明确请求所有, 则 view_all=True, 否则按正常逻辑: 公开 + 自己的
     view_all = show_all and is_admin
+    tag = request.args.get("tag") or None
+
+    # 传入 limit 或 cursor 时启用键集分页, 否则保持返回完整列表
+    if "limit" in request.args or "cursor" in request.args:
+        try:
+            blogs, next_cursor = blog_service.get_page(
+                parse_limit(request.args.get("limit", type=int)),
+                request.args.get("cursor") or None,
+                user_uuid=user_uuid,
+                view_all=view_all,
+                tag=tag,
+            )
+        except ValueError:
+            return (
+                jsonify(
+                    {
+                        "level": "warning",
+                        "message": "无效的分页游标",
+                    },
+                ),
+                400,
+            )
+        return (
+            jsonify(
+                {
+                    "level": "success",
+                    "data": blogs,
+                    "next_cursor": next_cursor,
+                },
+            ),
+            200,
+        )
 
-    blogs = blog_service.get_all(user_uuid=user_uuid, view_all=view_all)
+    blogs = blog_service.get_all(user_uuid=user_uuid, view_all=view_all, tag=tag)
     return (
         jsonify(
             {
@@ -62,6 +96,30 @@ def get_blogs():
     )
 
 
+@blog_bp.route("/tags", methods=["GET"])
+def get_tags():
+    """
+    @name: 获取博客标签统计
+    @return:
+    {
+        "level": "success",
+        "data": [
+            {"tag": str, "count": int}...
+        ]
+    }
+    """
+    tags = blog_service.get_tags(user_uuid=session.get("user_uuid"))
+    return (
+        jsonify(
+            {
+                "level": "success",
+                "data": tags,
+            },
+        ),
+        200,
+    )
+
+
 @blog_bp.route("/", methods=["POST"], strict_slashes=False)
 @require_member
 def create_blog():
@@ -128,7 +186,12 @@ def get_blog_detail(uuid):
     user_uuid = session.get("user_uuid")
     user_role = session.get("role", ROLE_GUEST)
 
-    success, message, blog = blog_service.get_by_uuid(uuid, user_uuid, user_role)
+    # format=html 时返回服务端渲染的 HTML 与目录, 代替 Markdown 原文
+    as_html = request.args.get("format") == "html"
+
+    success, message, blog = blog_service.get_by_uuid(
+        uuid, user_uuid, user_role, as_html=as_html
+    )
 
     if not success:
         # 如果是权限不足, 返回 403; 如果是不存在, 返回 404
@@ -144,9 +207,8 @@ def get_blog_detail(uuid):
             code,
         )
 
-    # 增加访问量并更新视图数
-    blog_service.increment_views(uuid)
-    blog["views"] = blog.get("views", 0) + 1
+    # 增加访问量并更新视图数 (计数先缓冲在内存中, 响应中补上尚未写回的增量)
+    blog["views"] = blog.get("views", 0) + blog_service.increment_views(uuid)
 
     return (
         jsonify(
@@ -159,15 +221,21 @@ def get_blog_detail(uuid):
     )
 
 
-@blog_bp.route("/<uuid>", methods=["PUT"])
+@blog_bp.route("/<uuid>", methods=["PUT", "PATCH"])
 @require_member
 def update_blog(uuid):
-    """更新博客"""
+    """
+    @name: 更新博客
+    PUT 与 PATCH 均只写入发生变化的字段;
+    PATCH 额外支持 content_patch 行区间补丁, 且响应中不包含正文
+    """
     data: dict = request.json
     user_uuid = session.get("user_uuid")
     user_role = session.get("role", ROLE_GUEST)
 
-    success, message, blog = blog_service.update(uuid, data, user_uuid, user_role)
+    success, message, blog = blog_service.update(
+        uuid, data, user_uuid, user_role, partial=request.method == "PATCH"
+    )
 
     if success:
         logger.debug(f"文章 {blog.get('uuid')} 更新成功: {blog.get('title')}")
@@ -183,9 +251,12 @@ def update_blog(uuid):
         )
     else:
         logger.error(f"文章更新失败: {message}")
-        code = (
-            403 if message == "权限不足" else (404 if message == "文章不存在" else 500)
-        )
+        code = {
+            "权限不足": 403,
+            "文章不存在": 404,
+            "文章已被修改, 请刷新后重试": 409,
+            "无效的正文补丁": 400,
+        }.get(message, 500)
         level = "warning" if code < 500 else "error"
         return (
             jsonify(
@@ -235,6 +306,129 @@ def delete_blog(uuid):
         )
 
 
+def _draft_error(message: str, data=None):
+    code = {
+        "权限不足": 403,
+        "文章不存在": 404,
+        "草稿不存在": 404,
+        "无效的草稿": 400,
+        "草稿版本冲突": 409,
+    }.get(message, 500)
+    level = "warning" if code < 500 else "error"
+    body = {
+        "level": level,
+        "message": message,
+    }
+    if data is not None:
+        body["data"] = data
+    return jsonify(body), code
+
+
+@blog_bp.route("/<uuid>/draft", methods=["GET"])
+@require_member
+def get_draft(uuid):
+    """
+    @name: 获取博客草稿
+    @return:
+    {
+        "level": "success",
+        "data": {"content": str, "revision": int, "saved_at": str}
+    }
+    """
+    success, message, draft = blog_service.get_draft(
+        uuid, session.get("user_uuid"), session.get("role", ROLE_GUEST)
+    )
+    if not success:
+        return _draft_error(message)
+    return (
+        jsonify(
+            {
+                "level": "success",
+                "data": draft,
+            },
+        ),
+        200,
+    )
+
+
+@blog_bp.route("/<uuid>/draft", methods=["PUT"])
+@require_member
+def save_draft(uuid):
+    """
+    @name: 自动保存博客草稿
+    @expect: {"content": str, "revision": int}
+    只覆盖草稿槽, 不修改已发布的文章; 内容未变化的请求会被忽略,
+    revision 不大于已保存版本时返回 409, data 为当前草稿的 {"revision", "saved_at"}
+    """
+    success, message, draft = blog_service.save_draft(
+        uuid,
+        request.get_json(silent=True) or {},
+        session.get("user_uuid"),
+        session.get("role", ROLE_GUEST),
+    )
+    if not success:
+        return _draft_error(message, draft)
+    return (
+        jsonify(
+            {
+                "level": "success",
+                "message": message,
+                "data": draft,
+            },
+        ),
+        200,
+    )
+
+
+@blog_bp.route("/<uuid>/draft", methods=["DELETE"])
+@require_member
+def delete_draft(uuid):
+    """
+    @name: 丢弃博客草稿
+    """
+    success, message = blog_service.delete_draft(
+        uuid, session.get("user_uuid"), session.get("role", ROLE_GUEST)
+    )
+    if not success:
+        return _draft_error(message)
+    return (
+        jsonify(
+            {
+                "level": "success",
+                "message": message,
+            },
+        ),
+        200,
+    )
+
+
+@blog_bp.route("/<uuid>/draft/publish", methods=["POST"])
+@require_member
+def publish_draft(uuid):
+    """
+    @name: 发布博客草稿
+    将草稿内容写入文章正文并删除草稿
+    """
+    success, message, blog = blog_service.publish_draft(
+        uuid, session.get("user_uuid"), session.get("role", ROLE_GUEST)
+    )
+    if not success:
+        logger.error(f"文章发布失败: {message}")
+        return _draft_error(message)
+
+    logger.debug(f"文章 {uuid} 草稿已发布")
+    return (
+        jsonify(
+            {
+                "level": "success",
+                "message": message,
+                "data": blog,
+            },
+        ),
+        200,
+    )
+
+
 @blog_bp.route("/<uuid>/assets", methods=["POST"])
 @require_member
 def upload_asset(uuid):
@@ -267,7 +461,7 @@ def upload_asset(uuid):
     user_uuid = session.get("user_uuid")
     user_role = session.get("role", ROLE_GUEST)
 
-    success, message, asset_uuid = blog_service.upload_asset(
+    success, message, asset = blog_service.upload_asset(
         uuid, file, user_uuid, user_role
     )
 
@@ -294,7 +488,12 @@ def upload_asset(uuid):
             {
                 "level": "success",
                 "message": message,
-                "data": {"uuid": asset_uuid},
+                "data": {
+                    "uuid": asset["uuid"],
+                    "width": asset["width"],
+                    "height": asset["height"],
+                    "placeholder": asset["placeholder"],
+                },
             }
         ),
         200,
@@ -307,9 +506,15 @@ def get_asset(blog_uuid, asset_uuid):
     @name: 获取博客资源
     """
 
-    success, file_path = blog_service.get_asset_path(blog_uuid, asset_uuid)
+    # ?w= 指定期望宽度时, 根据 Accept 头返回 WebP 或原格式的缩放变体
+    success, asset = blog_service.get_asset(
+        blog_uuid,
+        asset_uuid,
+        width=request.args.get("w", type=int),
+        accept_webp=request.accept_mimetypes["image/webp"] > 0,
+    )
 
-    if not success or not file_path:
+    if not success or not asset:
         return (
             jsonify(
                 {
@@ -320,4 +525,13 @@ def get_asset(blog_uuid, asset_uuid):
             404,
         )
 
-    return send_file(file_path)
+    # 资产按 UUID 寻址且内容不会变化, 使用内容哈希作为 ETag 并允许长期缓存
+    response = send_file_response(
+        asset["path"],
+        etag=asset["etag"],
+        mimetype=asset["mime_type"],
+        immutable=True,
+    )
+    if asset["negotiated"]:
+        response.vary.add("Accept")
+    return response
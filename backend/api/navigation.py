@@ -6,11 +6,14 @@
 
 import json
 
-from flask import Blueprint, jsonify, request, session
+from flask import Blueprint, Response, jsonify, request, session, stream_with_context
 
-from backend.config import Config, ROLE_ADMIN, ROLE_GUEST
+from backend.config import ROLE_ADMIN, ROLE_GUEST
 from backend.core.Logger import get_logger
-from backend.core.Security import require_login, require_member
+from backend.core.FileSender import send_file_response
+from backend.core.Security import require_admin, require_login, require_member
+from backend.data.pagination import parse_limit
+from backend.data.typeahead_index import DEFAULT_SUGGEST_LIMIT
 from backend.services import navigation_service
 
 logger = get_logger("API_Navigation")
@@ -21,23 +24,7 @@ nav_bp = Blueprint("navigation", __name__)
 def get_categories():
     """获取所有导航分类"""
     try:
-        file_path = Config.NAVIGATIONS_DIR / "categories.json"
-        if not file_path.exists():
-            logger.warning("获取分类文件时发现文件不存在, 建议检查返回结果是否可靠")
-            return (
-                jsonify(
-                    {
-                        "level": "success",
-                        "data": [],
-                    },
-                ),
-                200,
-            )
-
-        with file_path.open("r", encoding="utf-8") as f:
-            categories = json.load(f)
-
-        logger.debug(f"获取分类文件成功, 现有分类: {categories}")
+        categories = navigation_service.get_categories()
         return (
             jsonify(
                 {
@@ -60,6 +47,32 @@ def get_categories():
         )
 
 
+@nav_bp.route("/suggest", methods=["GET"])
+def suggest_navigations():
+    """导航输入联想"""
+    user_uuid = session.get("user_uuid")
+    user_role = session.get("role", ROLE_GUEST)
+    show_all = request.args.get("all", "false").lower() == "true"
+
+    limit = request.args.get("limit", type=int)
+    suggestions = navigation_service.suggest(
+        request.args.get("q", ""),
+        parse_limit(limit) if limit is not None else DEFAULT_SUGGEST_LIMIT,
+        user_uuid=user_uuid,
+        user_role=user_role,
+        view_all=show_all,
+    )
+    return (
+        jsonify(
+            {
+                "level": "success",
+                "data": suggestions,
+            },
+        ),
+        200,
+    )
+
+
 @nav_bp.route("/", methods=["GET"], strict_slashes=False)
 def get_navigations():
     """获取导航列表"""
@@ -80,19 +93,62 @@ def get_navigations():
             403,
         )
 
-    navs_list = navigation_service.get_all(
-        user_uuid=user_uuid, user_role=user_role, view_all=show_all
-    )
+    # 传入 limit 或 cursor 时启用键集分页, 否则保持返回完整列表
+    if "limit" in request.args or "cursor" in request.args:
+        try:
+            navs_list, next_cursor = navigation_service.get_page(
+                parse_limit(request.args.get("limit", type=int)),
+                request.args.get("cursor") or None,
+                user_uuid=user_uuid,
+                user_role=user_role,
+                view_all=show_all,
+            )
+        except ValueError:
+            return (
+                jsonify(
+                    {
+                        "level": "warning",
+                        "message": "无效的分页游标",
+                    },
+                ),
+                400,
+            )
+        return (
+            jsonify(
+                {
+                    "level": "success",
+                    "data": navs_list,
+                    "next_cursor": next_cursor,
+                },
+            ),
+            200,
+        )
 
-    return (
-        jsonify(
-            {
-                "level": "success",
-                "data": navs_list,
-            },
-        ),
-        200,
-    )
+    if show_all:
+        navs_list = navigation_service.get_all(
+            user_uuid=user_uuid, user_role=user_role, view_all=True
+        )
+        return (
+            jsonify(
+                {
+                    "level": "success",
+                    "data": navs_list,
+                },
+            ),
+            200,
+        )
+
+    # 公开导航已预先序列化, 直接拼接响应体, 不再逐项构造与序列化
+    body, etag = navigation_service.get_visible_json(user_uuid)
+    if etag and etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        response = Response(
+            b'{"data":' + body + b',"level":"success"}', mimetype="application/json"
+        )
+    if etag:
+        response.set_etag(etag)
+    return response
 
 
 @nav_bp.route("/", methods=["POST"], strict_slashes=False)
@@ -142,6 +198,214 @@ def create_navigation():
         )
 
 
+@nav_bp.route("/favicon/<name>", methods=["GET"])
+def get_favicon(name):
+    """获取本地缓存的导航图标"""
+    path = navigation_service.get_favicon_path(name)
+    if not path:
+        return (
+            jsonify(
+                {
+                    "level": "error",
+                    "message": "图标不存在",
+                },
+            ),
+            404,
+        )
+
+    # 文件名即内容哈希, 内容不会变化, 允许长期缓存
+    response = send_file_response(path, etag=path.stem, immutable=True)
+    # 图标来自第三方站点, 禁止其中的 SVG 执行脚本或加载外部资源
+    response.headers["Content-Security-Policy"] = (
+        "default-src 'none'; style-src 'unsafe-inline'; sandbox"
+    )
+    response.headers["X-Content-Type-Options"] = "nosniff"
+    return response
+
+
+@nav_bp.route("/crawl", methods=["POST"])
+@require_admin
+def crawl_navigations():
+    """立即检查一批导航链接"""
+    limit = request.args.get("limit", type=int)
+    if limit is not None and limit < 1:
+        return (
+            jsonify(
+                {
+                    "level": "warning",
+                    "message": "检查数量必须为正整数",
+                },
+            ),
+            400,
+        )
+
+    summary = navigation_service.crawl(limit)
+    if summary is None:
+        return (
+            jsonify(
+                {
+                    "level": "warning",
+                    "message": "链接检查正在进行中",
+                },
+            ),
+            409,
+        )
+
+    return (
+        jsonify(
+            {
+                "level": "success",
+                "message": "链接检查完成",
+                "data": summary,
+            },
+        ),
+        200,
+    )
+
+
+@nav_bp.route("/import", methods=["POST"])
+@require_member
+def import_navigations():
+    """批量导入导航 (JSON 数组, {"items": [...]} 或 NDJSON)"""
+    if request.mimetype == "application/x-ndjson":
+        try:
+            items = [
+                json.loads(line)
+                for line in request.get_data().splitlines()
+                if line.strip()
+            ]
+        except ValueError:
+            items = None
+    else:
+        items = request.get_json(silent=True)
+        if isinstance(items, dict):
+            items = items.get("items")
+
+    if not isinstance(items, list):
+        return (
+            jsonify(
+                {
+                    "level": "warning",
+                    "message": "无效的导入数据",
+                },
+            ),
+            400,
+        )
+
+    user_uuid = session.get("user_uuid")
+    user_role = session.get("role", ROLE_GUEST)
+
+    success, message, result = navigation_service.import_items(
+        items, user_uuid, user_role
+    )
+
+    if success:
+        logger.info(f"导航导入成功: {result}")
+        return (
+            jsonify(
+                {
+                    "level": "success",
+                    "message": message,
+                    "data": result,
+                },
+            ),
+            200,
+        )
+    else:
+        if message.startswith("导入失败"):
+            logger.error(f"导航导入失败: {message}")
+            code, level = 500, "error"
+        else:
+            # 导入数据不合法属于客户端错误, 不按服务端错误记录
+            logger.warning(f"导航导入失败: {message}")
+            code, level = 400, "warning"
+        return (
+            jsonify(
+                {
+                    "level": level,
+                    "message": message,
+                },
+            ),
+            code,
+        )
+
+
+@nav_bp.route("/export", methods=["GET"])
+@require_member
+def export_navigations():
+    """以 NDJSON 流式导出当前用户可见的导航"""
+    user_uuid = session.get("user_uuid")
+    user_role = session.get("role", ROLE_GUEST)
+    show_all = request.args.get("all", "false").lower() == "true"
+
+    if show_all and user_role < ROLE_ADMIN:
+        return (
+            jsonify(
+                {
+                    "level": "warning",
+                    "message": "权限不足",
+                },
+            ),
+            403,
+        )
+
+    lines = navigation_service.export_ndjson(user_uuid, user_role, view_all=show_all)
+    response = Response(stream_with_context(lines), mimetype="application/x-ndjson")
+    response.headers["Content-Disposition"] = "attachment; filename=navigations.ndjson"
+    return response
+
+
+@nav_bp.route("/order", methods=["PUT"])
+@require_member
+def reorder_navigations():
+    """批量调整导航排序"""
+    data = request.get_json(silent=True) or {}
+    items = data.get("items") if isinstance(data, dict) else None
+    if not isinstance(items, list):
+        return (
+            jsonify(
+                {
+                    "level": "warning",
+                    "message": "无效的排序数据",
+                },
+            ),
+            400,
+        )
+
+    user_uuid = session.get("user_uuid")
+    user_role = session.get("role", ROLE_GUEST)
+
+    success, message = navigation_service.reorder(items, user_uuid, user_role)
+
+    if success:
+        logger.debug(f"导航排序更新成功: {len(items)} 项")
+        return (
+            jsonify(
+                {
+                    "level": "success",
+                    "message": message,
+                },
+            ),
+            200,
+        )
+    else:
+        logger.error(f"导航排序更新失败: {message}")
+        code = {
+            "权限不足": 403,
+            "导航不存在": 404,
+            "无效的排序数据": 400,
+        }.get(message, 500)
+        return (
+            jsonify(
+                {
+                    "level": "error",
+                    "message": message,
+                },
+            ),
+            code,
+        )
+
+
 @nav_bp.route("/<uuid>", methods=["PUT"])
 @require_login
 def update_navigation(uuid):
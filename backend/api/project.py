@@ -4,11 +4,20 @@
 # @description: 项目模块
 # ------------------------------------------------------------
 
-from flask import Blueprint, jsonify, request, session
-
-from backend.config import ROLE_ADMIN, ROLE_GUEST
+from flask import Blueprint, Response, jsonify, request, session
+
+from backend.config import ROLE_ADMIN, ROLE_GUEST, Config
+from backend.core.Archive import ARCHIVE_FORMATS
+from backend.core.FileSender import send_file_response
+from backend.core.FileViewer import (
+    MAX_VIEW_LINES,
+    SNIFF_SIZE,
+    is_binary,
+    looks_binary,
+)
 from backend.core.Logger import get_logger
 from backend.core.Security import require_admin
+from backend.data.pagination import parse_limit
 from backend.services import project_service
 
 logger = get_logger("API_Project")
@@ -40,8 +49,40 @@ def get_projects():
 
     # 如果是管理员明确请求所有, 则 view_all=True, 否则按正常逻辑: 公开 + 自己的
     view_all = show_all and is_admin
+    tag = request.args.get("tag") or None
+
+    # 传入 limit 或 cursor 时启用键集分页, 否则保持返回完整列表
+    if "limit" in request.args or "cursor" in request.args:
+        try:
+            projects, next_cursor = project_service.get_page(
+                parse_limit(request.args.get("limit", type=int)),
+                request.args.get("cursor") or None,
+                user_uuid=user_uuid,
+                view_all=view_all,
+                tag=tag,
+            )
+        except ValueError:
+            return (
+                jsonify(
+                    {
+                        "level": "warning",
+                        "message": "无效的分页游标",
+                    },
+                ),
+                400,
+            )
+        return (
+            jsonify(
+                {
+                    "level": "success",
+                    "data": projects,
+                    "next_cursor": next_cursor,
+                },
+            ),
+            200,
+        )
 
-    projects = project_service.get_all(user_uuid=user_uuid, view_all=view_all)
+    projects = project_service.get_all(user_uuid=user_uuid, view_all=view_all, tag=tag)
     return (
         jsonify(
             {
@@ -59,7 +100,12 @@ def get_project_detail(uuid):
     user_role = session.get("role", ROLE_GUEST)
     user_uuid = session.get("user_uuid")
 
-    success, message, project = project_service.get_by_uuid(uuid, user_uuid, user_role)
+    # format=html 时返回服务端渲染的 HTML 与目录, 代替 README 原文
+    as_html = request.args.get("format") == "html"
+
+    success, message, project = project_service.get_by_uuid(
+        uuid, user_uuid, user_role, as_html=as_html
+    )
 
     if not success:
         code = 403 if message == "权限不足" else 404
@@ -73,6 +119,9 @@ def get_project_detail(uuid):
             code,
         )
 
+    # 增加访问量并更新视图数 (计数先缓冲在内存中, 响应中补上尚未写回的增量)
+    project["views"] = project.get("views", 0) + project_service.increment_views(uuid)
+
     return (
         jsonify(
             {
@@ -86,13 +135,29 @@ def get_project_detail(uuid):
 
 @project_bp.route("/<uuid>/files", methods=["GET"])
 def get_project_files(uuid):
-    """获取项目文件列表"""
+    """
+    获取项目文件列表
+    depth: 展开层数, 默认 1 (仅当前目录), 0 为整棵树
+    ref: 关联 git 仓库时浏览的分支, 标签或提交, 默认 HEAD
+    """
     user_role = session.get("role", ROLE_GUEST)
     user_uuid = session.get("user_uuid")
     path = request.args.get("path", "")
+    depth = request.args.get("depth", 1, type=int)
+
+    if depth < 0:
+        return (
+            jsonify(
+                {
+                    "level": "warning",
+                    "message": "无效的展开层数",
+                },
+            ),
+            400,
+        )
 
     success, message, files = project_service.get_file_tree(
-        uuid, path, user_role, user_uuid
+        uuid, path, user_role, user_uuid, depth=depth, ref=request.args.get("ref")
     )
 
     if not success:
@@ -124,6 +189,7 @@ def get_file_content(uuid):
     user_role = session.get("role", ROLE_GUEST)
     user_uuid = session.get("user_uuid")
     path = request.args.get("path", "")
+    ref = request.args.get("ref")
 
     if not path:
         return (
@@ -136,9 +202,29 @@ def get_file_content(uuid):
             400,
         )
 
-    success, message, content = project_service.get_file_content(
-        uuid, path, user_role, user_uuid
-    )
+    # 传入 start_line 或 end_line 时按行区间读取, 不受整文件大小限制
+    if "start_line" in request.args or "end_line" in request.args:
+        start_line = request.args.get("start_line", 1, type=int)
+        end_line = request.args.get(
+            "end_line", start_line + MAX_VIEW_LINES - 1, type=int
+        )
+        if start_line < 1 or end_line < start_line:
+            return (
+                jsonify(
+                    {
+                        "level": "warning",
+                        "message": "无效的行范围",
+                    },
+                ),
+                400,
+            )
+        success, message, content = project_service.get_file_lines(
+            uuid, path, start_line, end_line, user_role, user_uuid, ref=ref
+        )
+    else:
+        success, message, content = project_service.get_file_content(
+            uuid, path, user_role, user_uuid, ref=ref
+        )
 
     if not success:
         code = 403 if message == "权限不足" else (404 if "不存在" in message else 500)
@@ -163,6 +249,193 @@ def get_file_content(uuid):
     )
 
 
+@project_bp.route("/<uuid>/raw", methods=["GET"])
+def get_raw_file(uuid):
+    """
+    @name: 获取原始文件
+    支持 HTTP Range 请求, 用于分段查看或下载大文件
+    """
+    path = request.args.get("path", "")
+    if not path:
+        return (
+            jsonify(
+                {
+                    "level": "error",
+                    "message": "路径不能为空",
+                },
+            ),
+            400,
+        )
+
+    success, message, raw = project_service.get_raw_file(
+        uuid,
+        path,
+        session.get("role", ROLE_GUEST),
+        session.get("user_uuid"),
+        ref=request.args.get("ref"),
+    )
+    if not success:
+        code = 403 if message == "权限不足" else (404 if "不存在" in message else 500)
+        return (
+            jsonify(
+                {
+                    "level": "error",
+                    "message": message,
+                },
+            ),
+            code,
+        )
+
+    # 项目文件可能包含 HTML 等内容, 统一按纯文本或二进制下发, 不让浏览器渲染
+    if isinstance(raw, tuple):
+        # git 仓库中的文件: blob sha 即内容指纹
+        sha, data = raw
+        if isinstance(data, bytes):
+            head, length = data, len(data)
+        else:
+            # 大文件为 BlobStream, 由 git 进程边读边发送
+            head, length = data.peek(SNIFF_SIZE), data.size
+        mimetype = (
+            "application/octet-stream"
+            if looks_binary(head)
+            else "text/plain; charset=utf-8"
+        )
+        response = Response(data, content_type=mimetype, direct_passthrough=True)
+        response.content_length = length
+        response.set_etag(sha)
+        response.make_conditional(request, accept_ranges=True, complete_length=length)
+    else:
+        stat = raw.stat()
+        mimetype = (
+            "application/octet-stream"
+            if is_binary(raw)
+            else "text/plain; charset=utf-8"
+        )
+        response = send_file_response(
+            raw, etag=f"{stat.st_mtime_ns:x}-{stat.st_size:x}", mimetype=mimetype
+        )
+    response.headers["X-Content-Type-Options"] = "nosniff"
+    return response
+
+
+@project_bp.route("/<uuid>/refs", methods=["GET"])
+def get_refs(uuid):
+    """
+    @name: 获取 git 分支与标签
+    @return:
+    {
+        "level": "success",
+        "data": [
+            {"name": str, "type": "branch" | "tag", "sha": str}...
+        ]
+    }
+    """
+    success, message, refs = project_service.get_refs(
+        uuid, session.get("role", ROLE_GUEST), session.get("user_uuid")
+    )
+    if not success:
+        if message == "权限不足":
+            code = 403
+        elif "不存在" in message or "未关联" in message:
+            code = 404
+        else:
+            code = 500
+        return (
+            jsonify(
+                {
+                    "level": "error",
+                    "message": message,
+                },
+            ),
+            code,
+        )
+
+    return (
+        jsonify(
+            {
+                "level": "success",
+                "data": refs,
+            },
+        ),
+        200,
+    )
+
+
+@project_bp.route("/<uuid>/archive", methods=["GET"])
+def get_archive(uuid):
+    """
+    @name: 下载项目归档
+    @param format: zip | tar.gz, 默认 zip
+    边打包边发送; 目录未变化时直接发送缓存的归档
+    """
+    fmt = request.args.get("format", "zip")
+    if fmt not in ARCHIVE_FORMATS:
+        return (
+            jsonify(
+                {
+                    "level": "warning",
+                    "message": "不支持的归档格式",
+                },
+            ),
+            400,
+        )
+
+    success, message, archive = project_service.get_archive(
+        uuid, fmt, session.get("role", ROLE_GUEST), session.get("user_uuid")
+    )
+    if not success:
+        code = 403 if message == "权限不足" else 404
+        return (
+            jsonify(
+                {
+                    "level": "error",
+                    "message": message,
+                },
+            ),
+            code,
+        )
+
+    digest, cache_path, stream = archive
+    ext, mimetype = ARCHIVE_FORMATS[fmt]
+    if cache_path is not None:
+        response = send_file_response(cache_path, etag=digest, mimetype=mimetype)
+    elif digest in request.if_none_match:
+        stream.close()
+        response = Response(status=304)
+        response.set_etag(digest)
+    else:
+        # 大小未知, 以分块传输编码发送
+        response = Response(stream, mimetype=mimetype)
+        response.set_etag(digest)
+
+    response.headers.set("Content-Disposition", "attachment", filename=f"{uuid}.{ext}")
+    return response
+
+
+@project_bp.route("/tags", methods=["GET"])
+def get_tags():
+    """
+    @name: 获取项目标签统计
+    @return:
+    {
+        "level": "success",
+        "data": [
+            {"tag": str, "count": int}...
+        ]
+    }
+    """
+    tags = project_service.get_tags(user_uuid=session.get("user_uuid"))
+    return (
+        jsonify(
+            {
+                "level": "success",
+                "data": tags,
+            },
+        ),
+        200,
+    )
+
+
 @project_bp.route("/", methods=["POST"], strict_slashes=False)
 def create_project():
     """创建项目"""
@@ -197,7 +470,12 @@ def create_project():
         )
     else:
         logger.error(f"项目创建失败: {message}")
-        code = 403 if "权限不足" in message else 500
+        if "权限不足" in message:
+            code = 403
+        elif message == "无效的 git 仓库":
+            code = 400
+        else:
+            code = 500
         return (
             jsonify(
                 {
@@ -209,14 +487,19 @@ def create_project():
         )
 
 
-@project_bp.route("/<uuid>", methods=["PUT"])
+@project_bp.route("/<uuid>", methods=["PUT", "PATCH"])
 def update_project(uuid):
-    """更新项目"""
+    """
+    @name: 更新项目
+    PUT 与 PATCH 均只写入发生变化的字段, PATCH 的响应中不包含 README
+    """
     data: dict = request.json
     user_role = session.get("role", ROLE_GUEST)
     user_uuid = session.get("user_uuid")
 
-    success, message, project = project_service.update(uuid, data, user_role, user_uuid)
+    success, message, project = project_service.update(
+        uuid, data, user_role, user_uuid, partial=request.method == "PATCH"
+    )
 
     if success:
         logger.info(f"项目更新成功: {project.get('title')}")
@@ -231,7 +514,14 @@ def update_project(uuid):
             200,
         )
     else:
-        code = 403 if "权限不足" in message else (404 if "不存在" in message else 500)
+        if "权限不足" in message:
+            code = 403
+        elif "不存在" in message:
+            code = 404
+        elif message == "无效的 git 仓库":
+            code = 400
+        else:
+            code = 500
         logger.error(f"项目更新失败: {message}")
         return (
             jsonify(
@@ -244,6 +534,89 @@ def update_project(uuid):
         )
 
 
+@project_bp.route("/<uuid>/upload", methods=["POST"])
+def upload_archive(uuid):
+    """
+    @name: 上传项目归档
+    @param file: zip / tar / tar.gz 等归档文件 (multipart)
+    @param strip: 去掉成员路径的前几级目录, 默认 0
+    解压到项目目录, 同名文件被覆盖
+    """
+    if (request.content_length or 0) > Config.PROJECT_UPLOAD_MAX_BYTES:
+        return (
+            jsonify(
+                {
+                    "level": "error",
+                    "message": "上传文件过大",
+                },
+            ),
+            413,
+        )
+
+    file = request.files.get("file")
+    if file is None or file.filename == "":
+        return (
+            jsonify(
+                {
+                    "level": "error",
+                    "message": "没有选择文件",
+                },
+            ),
+            400,
+        )
+
+    strip = request.form.get("strip", 0, type=int)
+    if strip < 0:
+        return (
+            jsonify(
+                {
+                    "level": "warning",
+                    "message": "无效的目录层数",
+                },
+            ),
+            400,
+        )
+
+    success, message, result = project_service.import_archive(
+        uuid,
+        file.stream,
+        strip,
+        session.get("role", ROLE_GUEST),
+        session.get("user_uuid"),
+    )
+
+    if not success:
+        if message == "权限不足":
+            code = 403
+        elif "不存在" in message:
+            code = 404
+        elif message.startswith("无效的归档"):
+            code = 400
+        else:
+            code = 500
+        logger.error(f"项目 {uuid} 导入归档失败: {message}")
+        return (
+            jsonify(
+                {
+                    "level": "error",
+                    "message": message,
+                },
+            ),
+            code,
+        )
+
+    return (
+        jsonify(
+            {
+                "level": "success",
+                "message": message,
+                "data": result,
+            },
+        ),
+        200,
+    )
+
+
 @project_bp.route("/<uuid>", methods=["DELETE"])
 def delete_project(uuid):
     """删除项目"""
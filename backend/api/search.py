@@ -0,0 +1,77 @@
+# ------------------------------------------------------------
+# @author: Churk
+# @status: 阶段性完工
+# @description: 检索模块
+# ------------------------------------------------------------
+
+from flask import Blueprint, jsonify, request, session
+
+from backend.config import ROLE_GUEST
+from backend.core.Logger import get_logger
+from backend.data.pagination import parse_limit
+from backend.services import search_service
+
+logger = get_logger("API_Search")
+search_bp = Blueprint("search", __name__)
+
+
+@search_bp.route("/", methods=["GET"], strict_slashes=False)
+def search():
+    """
+    @name: 全文检索博客与项目
+    @expect: ?q=关键词&type=blog|project&limit=20
+    @return:
+    {
+        "level": "success",
+        "data": {
+            "blogs": [blog_obj + snippet...],
+            "projects": [project_obj + snippet...]
+        }
+    }
+    """
+    query = request.args.get("q", "").strip()
+    if not query:
+        return (
+            jsonify(
+                {
+                    "level": "warning",
+                    "message": "检索关键词不能为空",
+                },
+            ),
+            400,
+        )
+
+    scope = request.args.get("type")
+    if scope and scope not in search_service.SCOPES:
+        return (
+            jsonify(
+                {
+                    "level": "warning",
+                    "message": "不支持的检索类型",
+                },
+            ),
+            400,
+        )
+
+    user_uuid = session.get("user_uuid")
+    user_role = session.get("role", ROLE_GUEST)
+    show_all = request.args.get("all", "false").lower() == "true"
+
+    result = search_service.search(
+        query,
+        scopes=[scope] if scope else None,
+        user_uuid=user_uuid,
+        user_role=user_role,
+        view_all=show_all,
+        limit=parse_limit(request.args.get("limit", type=int)),
+    )
+    logger.debug(f"检索 {query!r} 完成")
+    return (
+        jsonify(
+            {
+                "level": "success",
+                "data": result,
+            },
+        ),
+        200,
+    )
@@ -6,9 +6,11 @@
 
 from pathlib import Path
 
-from flask import Blueprint, jsonify, request, send_from_directory, session
+from flask import Blueprint, jsonify, request, session
+from werkzeug.security import safe_join
 
 from backend.config import Config
+from backend.core.FileSender import send_file_response
 from backend.core.Logger import get_logger
 from backend.core.Security import (
     require_admin,
@@ -229,7 +231,18 @@ def get_avatar(uuid, filename):
     """
     # 头像存储路径: database/profiles/<uuid>/<filename>
     user_dir: Path = Config.PROFILES_DIR / uuid
-    avatar_path: Path = user_dir / filename
+
+    # 仅允许访问头像文件, 防止通过该接口读取用户目录中的其他文件 (如 users.db)
+    if not filename.startswith("avatar.") or uuid in (".", ".."):
+        return (
+            jsonify(
+                {
+                    "level": "error",
+                    "message": "头像不存在",
+                }
+            ),
+            404,
+        )
 
     if not user_dir.exists():
         logger.debug(f"用户目录不存在: {user_dir}")
@@ -243,10 +256,26 @@ def get_avatar(uuid, filename):
             404,
         )
 
-    if not avatar_path.exists():
-        return send_from_directory(Config.DEFAULTS_DIR, filename)
-    else:
-        return send_from_directory(user_dir, filename)
+    # 安全拼接路径, 防止 filename 越界
+    avatar_path = safe_join(str(user_dir), filename)
+    if avatar_path is None or not Path(avatar_path).is_file():
+        avatar_path = safe_join(str(Config.DEFAULTS_DIR), filename)
+    if avatar_path is None or not Path(avatar_path).is_file():
+        return (
+            jsonify(
+                {
+                    "level": "error",
+                    "message": "头像不存在",
+                }
+            ),
+            404,
+        )
+
+    # 头像会被同名覆盖, 使用 mtime/size 作为 ETag, 每次重新验证
+    stat = Path(avatar_path).stat()
+    return send_file_response(
+        Path(avatar_path), etag=f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+    )
 
 
 @user_bp.route("/rebuild/<uuid>", methods=["POST"])
@@ -13,6 +13,7 @@ from backend.core.Logger import get_logger
 from backend.core.Version import get_version_info
 from backend.data.database import init_db
 from backend.api import register_blueprints
+from backend.services import counter_service, scheduler_service
 
 
 def create_app(config_class=Config):
@@ -44,6 +45,12 @@ def create_app(config_class=Config):
     logger.info("正在注册 API 蓝图...")
     register_blueprints(app)
 
+    # 启动计数器后台写回线程
+    counter_service.init_app(app)
+
+    # 启动定时任务后台线程
+    scheduler_service.init_app(app)
+
     # 打印版本信息
     version = get_version_info()
     logger.info(f"版本: {version['version']} ({version['commit_hash']})")
@@ -62,6 +62,15 @@ class Config:
     PROJECTS_DB_PATH = PROJECTS_DIR / "projects.db"
     BLOGS_DB_PATH = BLOGS_DIR / "blogs.db"
 
+    # 项目可关联的 git 仓库只能位于该目录下
+    GIT_REPOS_DIR = Path(os.environ.get("GIT_REPOS_DIR") or DATABASE_DIR / "repos")
+
+    # 可重建的缓存文件目录
+    CACHE_DIR = DATABASE_DIR / "cache"
+    ARCHIVE_CACHE_DIR = CACHE_DIR / "archives"
+    UPLOAD_STAGING_DIR = CACHE_DIR / "uploads"
+    FAVICON_CACHE_DIR = CACHE_DIR / "favicons"
+
     # 版本信息
     VERSION_FILE = PROJECT_ROOT / "version"
 
@@ -90,6 +99,38 @@ class Config:
     # TOTP 配置
     TOTP_WINDOW_TOLERANCE = 1
 
+    # 文件下发卸载配置: "" (由 Flask 发送) | "x-accel" (Nginx/OpenResty) | "x-sendfile"
+    FILE_OFFLOAD_MODE = os.environ.get("FILE_OFFLOAD_MODE", "").lower()
+    # x-accel 模式下映射到 DATABASE_DIR 的 internal location 前缀
+    FILE_OFFLOAD_PREFIX = os.environ.get("FILE_OFFLOAD_PREFIX", "/_protected")
+
+    # 计数器写回配置: 每隔多少秒, 或累计多少次计数后批量写回数据库
+    COUNTER_FLUSH_INTERVAL = float(os.environ.get("COUNTER_FLUSH_INTERVAL", "5"))
+    COUNTER_FLUSH_THRESHOLD = int(os.environ.get("COUNTER_FLUSH_THRESHOLD", "200"))
+
+    # 博客资产清理配置: 每隔多少秒清理一次, 资产未被引用多少秒后才会被删除
+    ASSET_SWEEP_INTERVAL = float(os.environ.get("ASSET_SWEEP_INTERVAL", "600"))
+    ASSET_SWEEP_GRACE = float(os.environ.get("ASSET_SWEEP_GRACE", "86400"))
+
+    # 项目归档上传配置: 上传大小与解压后总大小上限 (字节), 文件数上限, 并行写入线程数
+    PROJECT_UPLOAD_MAX_BYTES = int(
+        os.environ.get("PROJECT_UPLOAD_MAX_BYTES", str(512 * 1024 * 1024))
+    )
+    PROJECT_UPLOAD_MAX_FILES = int(os.environ.get("PROJECT_UPLOAD_MAX_FILES", "20000"))
+    PROJECT_UPLOAD_WORKERS = int(os.environ.get("PROJECT_UPLOAD_WORKERS", "8"))
+
+    # 导航链接检查配置: 检查间隔 (秒, 0 为关闭), 每次检查的数量, 结果过期时间 (秒),
+    # 总并发数, 同一主机相邻请求的最小间隔 (秒), 单次请求超时 (秒), 是否允许检查内网地址
+    NAV_CRAWL_INTERVAL = float(os.environ.get("NAV_CRAWL_INTERVAL", "600"))
+    NAV_CRAWL_BATCH = int(os.environ.get("NAV_CRAWL_BATCH", "200"))
+    NAV_CRAWL_MAX_AGE = float(os.environ.get("NAV_CRAWL_MAX_AGE", "86400"))
+    NAV_CRAWL_CONCURRENCY = int(os.environ.get("NAV_CRAWL_CONCURRENCY", "16"))
+    NAV_CRAWL_HOST_INTERVAL = float(os.environ.get("NAV_CRAWL_HOST_INTERVAL", "1"))
+    NAV_CRAWL_TIMEOUT = float(os.environ.get("NAV_CRAWL_TIMEOUT", "10"))
+    NAV_CRAWL_ALLOW_PRIVATE = (
+        os.environ.get("NAV_CRAWL_ALLOW_PRIVATE", "false").lower() == "true"
+    )
+
     @staticmethod
     def ensure_dirs():
         Config.PROJECTS_DIR.mkdir(parents=True, exist_ok=True)
@@ -99,6 +140,10 @@ class Config:
         Config.LOG_DIR.mkdir(parents=True, exist_ok=True)
         Config.DEFAULTS_DIR.mkdir(parents=True, exist_ok=True)
         Config.BACKUP_ROOT.mkdir(parents=True, exist_ok=True)
+        Config.ARCHIVE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        Config.GIT_REPOS_DIR.mkdir(parents=True, exist_ok=True)
+        Config.UPLOAD_STAGING_DIR.mkdir(parents=True, exist_ok=True)
+        Config.FAVICON_CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,334 @@
+# ------------------------------------------------------------
+# @author: Churk
+# @status: 阶段性完工
+# @description: 归档模块, 边遍历边生成 zip / tar.gz 数据流, 以及带配额限制的流式解压
+# ------------------------------------------------------------
+
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+import hashlib
+import os
+from pathlib import Path
+import stat as stat_mode
+import tarfile
+import threading
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+import zipfile
+import zlib
+
+CHUNK_SIZE = 64 * 1024
+
+# 解压时不超过该大小的文件读入内存后交给线程池写入, 更大的文件在当前线程流式写入
+SMALL_FILE_SIZE = 1024 * 1024
+
+# 格式 -> (扩展名, MIME 类型)
+ARCHIVE_FORMATS = {
+    "zip": ("zip", "application/zip"),
+    "tar.gz": ("tar.gz", "application/gzip"),
+}
+
+# (相对路径, 绝对路径, stat)
+ArchiveEntry = Tuple[str, Path, os.stat_result]
+
+
+def iter_files(
+    root: Path, exclude: Optional[Callable[[str], bool]] = None
+) -> Iterator[ArchiveEntry]:
+    """
+    按路径顺序遍历目录下的所有普通文件, 不跟随符号链接.
+    逐个生成而不收集成列表, 内存占用只与目录深度和单个目录的条目数有关.
+    :param exclude: 接收文件名, 返回 True 时跳过该文件
+    """
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        base = Path(dirpath)
+        for name in sorted(filenames):
+            if exclude and exclude(name):
+                continue
+            path = base / name
+            stat = path.lstat()
+            if not path.is_symlink() and path.is_file():
+                yield path.relative_to(root).as_posix(), path, stat
+
+
+def tree_hash(entries: Iterable[ArchiveEntry]) -> str:
+    """根据文件路径, 大小与 mtime 计算目录指纹, 不读取文件内容"""
+    sha256 = hashlib.sha256()
+    for rel, _, stat in entries:
+        sha256.update(f"{rel}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode("utf-8"))
+    return sha256.hexdigest()
+
+
+class _ChunkSink:
+    """只支持追加写入的缓冲区, zipfile 写入后由生成器立即取走数据"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_zip(entries: Iterable[ArchiveEntry]) -> Iterator[bytes]:
+    """生成 zip 数据流 (写入不可 seek 的流时, zipfile 会在文件数据后写数据描述符)"""
+    sink = _ChunkSink()
+    with zipfile.ZipFile(
+        sink, "w", compression=zipfile.ZIP_DEFLATED, strict_timestamps=False
+    ) as zf:
+        for rel, path, stat in entries:
+            info = zipfile.ZipInfo.from_file(path, rel, strict_timestamps=False)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            force_zip64 = stat.st_size > zipfile.ZIP64_LIMIT
+            with (
+                path.open("rb") as src,
+                zf.open(info, "w", force_zip64=force_zip64) as dst,
+            ):
+                while chunk := src.read(CHUNK_SIZE):
+                    dst.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            data = sink.drain()
+            if data:
+                yield data
+    yield sink.drain()
+
+
+def _iter_tar(entries: Iterable[ArchiveEntry]) -> Iterator[bytes]:
+    """按 tar 格式逐块生成未压缩数据"""
+    for rel, path, stat in entries:
+        info = tarfile.TarInfo(rel)
+        info.size = stat.st_size
+        info.mtime = int(stat.st_mtime)
+        info.mode = stat.st_mode & 0o777
+        yield info.tobuf(tarfile.PAX_FORMAT, "utf-8", "surrogateescape")
+
+        # 打包期间文件大小可能变化, 必须严格写入 header 中声明的字节数
+        remaining = info.size
+        with path.open("rb") as src:
+            while remaining > 0:
+                chunk = src.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    yield b"\0" * remaining
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+        padding = -info.size % tarfile.BLOCKSIZE
+        if padding:
+            yield b"\0" * padding
+
+    # 结尾两个空块
+    yield b"\0" * (tarfile.BLOCKSIZE * 2)
+
+
+def stream_tar_gz(entries: Iterable[ArchiveEntry]) -> Iterator[bytes]:
+    """生成 tar.gz 数据流"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    written = 0
+    for block in _iter_tar(entries):
+        written += len(block)
+        data = compressor.compress(block)
+        if data:
+            yield data
+
+    # 与 tarfile 一致, 补齐到记录大小
+    padding = -written % tarfile.RECORDSIZE
+    yield compressor.compress(b"\0" * padding) + compressor.flush()
+
+
+def stream_archive(entries: Iterable[ArchiveEntry], fmt: str) -> Iterator[bytes]:
+    if fmt == "zip":
+        return stream_zip(entries)
+    if fmt == "tar.gz":
+        return stream_tar_gz(entries)
+    raise ValueError(f"Unsupported archive format: {fmt}")
+
+
+def tee_to_file(
+    chunks: Iterator[bytes],
+    target: Path,
+    on_complete: Optional[Callable[[Path], None]] = None,
+) -> Iterator[bytes]:
+    """
+    转发数据流的同时写入 target, 完整结束后才原子替换为正式文件;
+    客户端中途断开时删除未完成的文件.
+    """
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+    completed = False
+    try:
+        with tmp.open("wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+                yield chunk
+        os.replace(tmp, target)
+        completed = True
+        if on_complete:
+            on_complete(target)
+    finally:
+        if not completed:
+            tmp.unlink(missing_ok=True)
+
+
+class ArchiveError(ValueError):
+    """归档格式无效, 包含非法路径或超出配额"""
+
+
+def _member_path(name: str, strip: int) -> Optional[str]:
+    """
+    校验归档成员路径并转换为相对路径.
+    拒绝绝对路径与包含 ".." 的路径; 去掉前 strip 级目录后为空时返回 None
+    """
+    name = name.replace("\\", "/")
+    if "\0" in name or name.startswith("/") or (len(name) > 1 and name[1] == ":"):
+        raise ArchiveError(f"illegal member path: {name!r}")
+    parts = [part for part in name.split("/") if part not in ("", ".")]
+    if ".." in parts:
+        raise ArchiveError(f"illegal member path: {name!r}")
+    parts = parts[strip:]
+    return "/".join(parts) if parts else None
+
+
+def _iter_members(fileobj: IO[bytes]) -> Iterator[Tuple[str, Optional[IO[bytes]]]]:
+    """
+    依次生成归档成员 (名称, 数据流), 目录的数据流为 None, 跳过链接与设备文件.
+    zip 需要读取末尾的中央目录, 因此 fileobj 必须可 seek; tar 按流式模式读取,
+    成员的数据流只在迭代到下一个成员之前有效.
+    """
+    if zipfile.is_zipfile(fileobj):
+        fileobj.seek(0)
+        with zipfile.ZipFile(fileobj) as zf:
+            for info in zf.infolist():
+                if info.is_dir():
+                    yield info.filename, None
+                    continue
+                # 高 16 位为 Unix 文件类型, 可能为 0 (非 Unix 工具创建)
+                file_type = stat_mode.S_IFMT(info.external_attr >> 16)
+                if file_type not in (0, stat_mode.S_IFREG):
+                    continue
+                with zf.open(info) as src:
+                    yield info.filename, src
+        return
+
+    fileobj.seek(0)
+    try:
+        tar = tarfile.open(fileobj=fileobj, mode="r|*")
+    except tarfile.TarError:
+        raise ArchiveError("unsupported archive format")
+    with tar:
+        for member in tar:
+            if member.isdir():
+                yield member.name, None
+            elif member.isreg():
+                yield member.name, tar.extractfile(member)
+
+
+def _write_file(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("wb") as f:
+        f.write(data)
+
+
+def extract_archive(
+    fileobj: IO[bytes],
+    dest: Path,
+    max_bytes: int,
+    max_files: int,
+    strip: int = 0,
+    exclude: Optional[Callable[[str], bool]] = None,
+    workers: int = 8,
+) -> Dict[str, Any]:
+    """
+    边读取边解压 zip / tar (含 gz/bz2/xz) 到 dest.
+    归档只能顺序读取, 小文件读入内存后由线程池并行写入, 大文件直接在当前线程写入;
+    配额按实际解压出的字节数计算, 不信任归档头中声明的大小.
+
+    :param max_bytes: 解压后的总字节数上限
+    :param max_files: 文件数上限
+    :param strip: 去掉成员路径的前几级目录, 同 tar --strip-components
+    :param exclude: 接收相对路径, 返回 True 时跳过该成员
+    :return: {"files": [相对路径], "dirs": [相对路径], "bytes": int}
+    """
+    files: List[str] = []
+    written: Set[str] = set()
+    dirs: Set[str] = set()
+    pending: Dict[str, Future] = {}
+    total = 0
+
+    def consume(n: int):
+        nonlocal total
+        total += n
+        if total > max_bytes:
+            raise ArchiveError(f"archive exceeds {max_bytes} bytes")
+
+    def settle(futures):
+        for future in futures:
+            future.result()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        try:
+            for name, src in _iter_members(fileobj):
+                rel = _member_path(name, strip)
+                if rel is None or (exclude and exclude(rel)):
+                    continue
+                target = dest / rel
+                if src is None:
+                    dirs.add(rel)
+                    target.mkdir(parents=True, exist_ok=True)
+                    continue
+
+                # 归档中重复的成员以后出现的为准, 只记录一次; 前一次写入未完成时先等待
+                if rel in pending:
+                    settle([pending.pop(rel)])
+                if rel not in written:
+                    written.add(rel)
+                    files.append(rel)
+                    if len(files) > max_files:
+                        raise ArchiveError(f"archive exceeds {max_files} files")
+
+                head = src.read(SMALL_FILE_SIZE + 1)
+                consume(len(head))
+                if len(head) <= SMALL_FILE_SIZE:
+                    # 限制排队的任务数, 内存中最多同时保留 workers * 4 个小文件
+                    if len(pending) >= workers * 4:
+                        done, _ = wait(pending.values(), return_when=FIRST_COMPLETED)
+                        settle(done)
+                        pending = {k: f for k, f in pending.items() if not f.done()}
+                    pending[rel] = pool.submit(_write_file, target, head)
+                    continue
+
+                target.parent.mkdir(parents=True, exist_ok=True)
+                with target.open("wb") as f:
+                    f.write(head)
+                    while chunk := src.read(CHUNK_SIZE):
+                        consume(len(chunk))
+                        f.write(chunk)
+
+            settle(pending.values())
+        except (zipfile.BadZipFile, tarfile.TarError, zlib.error, EOFError) as e:
+            raise ArchiveError(f"corrupted archive: {e}")
+        finally:
+            for future in pending.values():
+                future.cancel()
+
+    return {"files": files, "dirs": sorted(dirs), "bytes": total}
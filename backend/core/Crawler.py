@@ -0,0 +1,268 @@
+# ------------------------------------------------------------
+# @author: Churk
+# @status: 阶段性完工
+# @description: 异步链接检查与图标抓取模块, 基于 asyncio 的最小 HTTP/1.1 客户端, 限制总并发与单主机请求频率
+# ------------------------------------------------------------
+
+import asyncio
+from contextlib import asynccontextmanager, suppress
+import ipaddress
+import socket
+import ssl
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import quote, urljoin, urlsplit
+
+from backend.core.Logger import get_logger
+
+logger = get_logger("Crawler")
+
+USER_AGENT = "JuFireX-LinkChecker/1.0"
+
+# 图标大小上限, 超过时视为无效
+ICON_MAX_BYTES = 256 * 1024
+
+_MAX_REDIRECTS = 5
+_MAX_HEADER_LINES = 100
+_REDIRECT_CODES = (301, 302, 303, 307, 308)
+
+# 按文件头识别图标格式, 不信任服务器声明的 Content-Type
+_ICON_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"\x00\x00\x01\x00", "ico"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+    (b"\xff\xd8\xff", "jpg"),
+)
+
+
+class CrawlError(Exception):
+    pass
+
+
+# 单个链接失败时记录为不可访问, 不影响其他链接; 连接提前关闭时 readexactly 抛出 EOFError
+_FAILURES = (CrawlError, OSError, EOFError, asyncio.TimeoutError, ValueError)
+
+
+def sniff_icon(data: bytes) -> Optional[str]:
+    """识别图标格式, 返回扩展名, 不是支持的图片时返回 None"""
+    for signature, ext in _ICON_SIGNATURES:
+        if data.startswith(signature):
+            return ext
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    if b"<svg" in data[:1024].lower():
+        return "svg"
+    return None
+
+
+def is_http_url(value: Optional[str]) -> bool:
+    return bool(value) and urlsplit(value).scheme in ("http", "https")
+
+
+class _Response:
+    __slots__ = ("status", "headers", "body")
+
+    def __init__(self, status: int, headers: Dict[str, str], body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+
+class Crawler:
+    """
+    异步链接检查器.
+    同一主机的请求串行执行, 且相邻两次请求之间至少间隔 host_interval 秒;
+    不同主机的请求并行, 总并发不超过 concurrency.
+    默认拒绝解析到内网, 回环等非公网地址的链接, 防止借导航链接探测内网.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 16,
+        host_interval: float = 1.0,
+        timeout: float = 10.0,
+        allow_private: bool = False,
+    ):
+        self.concurrency = concurrency
+        self.host_interval = host_interval
+        self.timeout = timeout
+        self.allow_private = allow_private
+        self._ssl = ssl.create_default_context()
+
+    def run(self, targets: Iterable[Tuple[Any, str, Optional[str]]]) -> Dict[Any, dict]:
+        """
+        检查一批链接, 阻塞直到全部完成.
+        :param targets: [(key, 链接, 图标链接或 None)]
+        :return: {key: {"status", "latency_ms", "icon", "icon_ext"}},
+                 status 为最终响应的状态码 (跟随重定向), 无法访问时为 None;
+                 icon 为下载到的图标内容, 没有图标链接或下载失败时为 None
+        """
+        return asyncio.run(self._run(list(targets)))
+
+    async def _run(self, targets: List[Tuple[Any, str, Optional[str]]]):
+        # 信号量与主机状态必须在事件循环内创建
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._host_locks: Dict[str, asyncio.Lock] = {}
+        self._host_next: Dict[str, float] = {}
+
+        results: Dict[Any, dict] = {}
+
+        async def crawl(key, url: str, icon_url: Optional[str]):
+            results[key] = await self._crawl_one(url, icon_url)
+
+        await asyncio.gather(*(crawl(*target) for target in targets))
+        return results
+
+    async def _crawl_one(self, url: str, icon_url: Optional[str]) -> dict:
+        result = {"status": None, "latency_ms": None, "icon": None, "icon_ext": None}
+        try:
+            response, latency = await self._get(url, max_body=0)
+            result["status"] = response.status
+            result["latency_ms"] = latency
+        except _FAILURES as e:
+            logger.debug(f"检查链接失败 {url}: {e!r}")
+
+        if icon_url:
+            try:
+                response, _ = await self._get(icon_url, max_body=ICON_MAX_BYTES)
+                ext = sniff_icon(response.body) if response.status == 200 else None
+                if ext:
+                    result["icon"], result["icon_ext"] = response.body, ext
+            except _FAILURES as e:
+                logger.debug(f"下载图标失败 {icon_url}: {e!r}")
+        return result
+
+    async def _get(self, url: str, max_body: int) -> Tuple[_Response, int]:
+        """
+        GET 请求并跟随重定向.
+        :return: (最终响应, 耗时毫秒), 耗时为各次请求从建立连接到收到响应头的时间之和,
+                 不含等待主机间隔与并发名额的时间
+        """
+        elapsed = 0.0
+        for _ in range(_MAX_REDIRECTS + 1):
+            response, seconds = await self._request(url, max_body)
+            elapsed += seconds
+            location = response.headers.get("location")
+            if response.status not in _REDIRECT_CODES or not location:
+                return response, round(elapsed * 1000)
+            url = urljoin(url, location)
+        raise CrawlError("too many redirects")
+
+    @asynccontextmanager
+    async def _host_slot(self, host: str):
+        loop = asyncio.get_running_loop()
+        lock = self._host_locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            # 等待期间只占用该主机的锁, 不占用全局并发名额
+            delay = self._host_next.get(host, 0) - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                async with self._semaphore:
+                    yield
+            finally:
+                self._host_next[host] = loop.time() + self.host_interval
+
+    async def _resolve(self, host: str, port: int) -> str:
+        """解析主机地址, 直接连接解析结果, 避免检查与连接之间 DNS 结果被替换"""
+        loop = asyncio.get_running_loop()
+        infos = await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        if not infos:
+            raise CrawlError(f"cannot resolve {host}")
+        address = infos[0][4][0]
+        if not self.allow_private and not ipaddress.ip_address(address).is_global:
+            raise CrawlError(f"refusing non-public address {address}")
+        return address
+
+    async def _request(self, url: str, max_body: int) -> Tuple[_Response, float]:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise CrawlError(f"unsupported url {url}")
+        https = parts.scheme == "https"
+        host = parts.hostname
+        port = parts.port or (443 if https else 80)
+
+        target = quote(parts.path or "/", safe="/%:@!$&'()*+,;=~")
+        if parts.query:
+            target += "?" + quote(parts.query, safe="/%:@!$&'()*+,;=~?")
+        host_header = parts.netloc.rpartition("@")[2]
+
+        async with self._host_slot(host), asyncio.timeout(self.timeout):
+            address = await self._resolve(host, port)
+            started = time.perf_counter()
+            reader, writer = await asyncio.open_connection(
+                address,
+                port,
+                ssl=self._ssl if https else None,
+                server_hostname=host if https else None,
+            )
+            try:
+                writer.write(
+                    (
+                        f"GET {target} HTTP/1.1\r\n"
+                        f"Host: {host_header}\r\n"
+                        f"User-Agent: {USER_AGENT}\r\n"
+                        "Accept: */*\r\n"
+                        "Accept-Encoding: identity\r\n"
+                        "Connection: close\r\n\r\n"
+                    ).encode("ascii")
+                )
+                await writer.drain()
+                status, headers = await self._read_head(reader)
+                elapsed = time.perf_counter() - started
+                body = (
+                    await self._read_body(reader, headers, max_body)
+                    if max_body
+                    else b""
+                )
+                return _Response(status, headers, body), elapsed
+            finally:
+                writer.close()
+                with suppress(Exception):
+                    await writer.wait_closed()
+
+    @staticmethod
+    async def _read_head(reader: asyncio.StreamReader) -> Tuple[int, Dict[str, str]]:
+        parts = (await reader.readline()).decode("latin-1").split(None, 2)
+        if len(parts) < 2 or not parts[0].startswith("HTTP/"):
+            raise CrawlError("invalid status line")
+        status = int(parts[1])
+
+        headers: Dict[str, str] = {}
+        for _ in range(_MAX_HEADER_LINES):
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                return status, headers
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        raise CrawlError("too many headers")
+
+    @staticmethod
+    async def _read_body(
+        reader: asyncio.StreamReader, headers: Dict[str, str], max_body: int
+    ) -> bytes:
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            body = bytearray()
+            while True:
+                size = int((await reader.readline()).split(b";")[0].strip() or b"0", 16)
+                if size == 0:
+                    return bytes(body)
+                if len(body) + size > max_body:
+                    raise CrawlError("body too large")
+                body += await reader.readexactly(size)
+                await reader.readline()
+
+        length = headers.get("content-length")
+        if length is not None:
+            if int(length) > max_body:
+                raise CrawlError("body too large")
+            return await reader.readexactly(int(length))
+
+        # 没有长度信息时读到连接关闭为止
+        body = bytearray()
+        while chunk := await reader.read(65536):
+            body += chunk
+            if len(body) > max_body:
+                raise CrawlError("body too large")
+        return bytes(body)
@@ -0,0 +1,39 @@
+# ------------------------------------------------------------
+# @author: Churk
+# @status: 阶段性完工
+# @description: 跨 worker 的文件锁, 用于启动迁移与后台任务等同一时间只能由一个进程执行的操作
+# ------------------------------------------------------------
+
+from contextlib import contextmanager
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows 下只有单进程开发服务器, 无需跨进程互斥
+    fcntl = None
+
+from backend.config import Config
+
+
+@contextmanager
+def file_lock(name: str, blocking: bool = True) -> Iterator[bool]:
+    """
+    获取位于 CACHE_DIR/locks 下的排他文件锁, 产出是否获取成功.
+    :param name: 锁名称, 即锁文件名
+    :param blocking: 为 False 时锁已被占用则立即产出 False
+    """
+    path = Config.CACHE_DIR / "locks" / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a") as f:
+        if fcntl is None:
+            yield True
+            return
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
@@ -0,0 +1,64 @@
+# ------------------------------------------------------------
+# @author: Churk
+# @status: 阶段性完工
+# @description: 文件下发模块, 统一处理缓存头与反向代理 (X-Accel-Redirect / X-Sendfile) 卸载
+# ------------------------------------------------------------
+
+from pathlib import Path
+from typing import Optional
+
+from flask import Response, request, send_file
+
+from backend.config import Config
+
+# 一年, 用于内容不可变的资源
+IMMUTABLE_MAX_AGE = 31536000
+
+
+def send_file_response(
+    path: Path,
+    etag: Optional[str] = None,
+    mimetype: Optional[str] = None,
+    immutable: bool = False,
+) -> Response:
+    """
+    下发文件.
+    根据 Config.FILE_OFFLOAD_MODE, 由 Flask 直接发送文件, 或仅返回
+    X-Accel-Redirect (Nginx/OpenResty) / X-Sendfile (Apache/Lighttpd) 头交给代理发送.
+
+    :param path: 文件绝对路径, 卸载模式下必须位于 Config.DATABASE_DIR 内
+    :param etag: 强 ETag, 命中 If-None-Match 时直接返回 304
+    :param mimetype: MIME 类型, 为 None 时由文件名推断
+    :param immutable: 内容是否永不变化 (如按内容寻址的资源), 是则允许客户端长期缓存
+    """
+    if etag and etag in request.if_none_match:
+        response = Response(status=304)
+    elif Config.FILE_OFFLOAD_MODE == "x-accel":
+        relative = path.resolve().relative_to(Config.DATABASE_DIR.resolve())
+        response = Response(mimetype=mimetype)
+        response.headers["X-Accel-Redirect"] = (
+            f"{Config.FILE_OFFLOAD_PREFIX.rstrip('/')}/{relative.as_posix()}"
+        )
+    elif Config.FILE_OFFLOAD_MODE == "x-sendfile":
+        response = Response(mimetype=mimetype)
+        response.headers["X-Sendfile"] = str(path.resolve())
+    else:
+        response = send_file(path, mimetype=mimetype, etag=etag is None)
+
+    if mimetype is None and response.status_code != 304:
+        # 卸载模式下由代理根据文件推断类型, 去掉 Flask 默认的 text/html
+        if Config.FILE_OFFLOAD_MODE in ("x-accel", "x-sendfile"):
+            del response.headers["Content-Type"]
+
+    if etag:
+        response.set_etag(etag)
+
+    if immutable:
+        response.headers["Cache-Control"] = (
+            f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+        )
+    else:
+        # 内容可能变化, 允许缓存但每次都需要用 ETag 重新验证
+        response.headers["Cache-Control"] = "public, no-cache"
+
+    return response
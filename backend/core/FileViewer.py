@@ -0,0 +1,156 @@
+# ------------------------------------------------------------
+# @author: Churk
+# @status: 阶段性完工
+# @description: 文件查看模块, 通过内存映射与换行偏移索引按行读取大文件
+# ------------------------------------------------------------
+
+from array import array
+from bisect import bisect_right
+import codecs
+from collections import OrderedDict
+import mmap
+import os
+from pathlib import Path
+import threading
+from typing import Any, Dict, Tuple
+
+# 判断是否为二进制文件时读取的字节数
+SNIFF_SIZE = 8192
+
+# 单次按行读取的最大行数与最大字节数, 超出部分截断
+MAX_VIEW_LINES = 5000
+MAX_VIEW_BYTES = 2 * 1024 * 1024
+
+# 换行偏移索引缓存的最大文件数
+LINE_INDEX_CACHE_SIZE = 16
+
+_line_index_cache: "OrderedDict[str, Tuple[int, int, array]]" = OrderedDict()
+_line_index_lock = threading.Lock()
+
+
+def is_binary(path: Path) -> bool:
+    """只读取文件开头判断是否为二进制"""
+    with path.open("rb") as f:
+        return looks_binary(f.read(SNIFF_SIZE))
+
+
+def looks_binary(head: bytes) -> bool:
+    """根据内容开头判断是否为二进制: 含 NUL 字节或不是合法的 UTF-8"""
+    head = head[:SNIFF_SIZE]
+    if b"\0" in head:
+        return True
+    try:
+        # 增量解码, 允许末尾被截断的多字节字符
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+    except UnicodeDecodeError:
+        return True
+    return False
+
+
+def _build_line_index(buf) -> array:
+    offsets = array("Q")
+    pos = buf.find(b"\n")
+    while pos != -1:
+        offsets.append(pos)
+        pos = buf.find(b"\n", pos + 1)
+    return offsets
+
+
+def _get_line_index(path: Path, mm: mmap.mmap, stat) -> array:
+    """获取文件的换行偏移索引, 以 mtime/size 校验缓存"""
+    key = str(path)
+    with _line_index_lock:
+        cached = _line_index_cache.get(key)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            _line_index_cache.move_to_end(key)
+            return cached[2]
+
+    offsets = _build_line_index(mm)
+
+    with _line_index_lock:
+        _line_index_cache[key] = (stat.st_mtime_ns, stat.st_size, offsets)
+        _line_index_cache.move_to_end(key)
+        while len(_line_index_cache) > LINE_INDEX_CACHE_SIZE:
+            _line_index_cache.popitem(last=False)
+    return offsets
+
+
+def _empty_result() -> Dict[str, Any]:
+    return {
+        "content": "",
+        "start_line": 0,
+        "end_line": 0,
+        "total_lines": 0,
+        "truncated": False,
+    }
+
+
+def _slice_lines(buf, offsets: array, start_line: int, end_line: int) -> Dict[str, Any]:
+    """按换行偏移索引从 buf (mmap 或 bytes) 中截取行区间"""
+    size = len(buf)
+    # 以换行结尾时最后一个换行之后没有新行
+    total = len(offsets) if buf[-1:] == b"\n" else len(offsets) + 1
+
+    start = max(start_line, 1)
+    end = min(end_line, total, start + MAX_VIEW_LINES - 1)
+    truncated = end < min(end_line, total)
+    if start > end:
+        return {
+            "content": "",
+            "start_line": start,
+            "end_line": start - 1,
+            "total_lines": total,
+            "truncated": False,
+        }
+
+    begin = offsets[start - 2] + 1 if start > 1 else 0
+    stop = offsets[end - 1] if end - 1 < len(offsets) else size
+    if stop - begin > MAX_VIEW_BYTES:
+        truncated = True
+        # 在最后一个完整行处截断, end_line 为实际返回的最后一行, 客户端从 end_line + 1 继续读取不会漏行
+        last = bisect_right(offsets, begin + MAX_VIEW_BYTES, start - 1, end)
+        if last >= start:
+            end = last
+            stop = offsets[end - 1]
+        else:
+            # 单行超过上限时只能返回该行的开头
+            end = start
+            stop = begin + MAX_VIEW_BYTES
+
+    return {
+        "content": buf[begin:stop].decode("utf-8", errors="replace"),
+        "start_line": start,
+        "end_line": end,
+        "total_lines": total,
+        "truncated": truncated,
+    }
+
+
+def read_lines(path: Path, start_line: int, end_line: int) -> Dict[str, Any]:
+    """
+    读取第 start_line 到 end_line 行 (从 1 开始, 包含两端).
+    只映射文件而不整体读入, 行数或字节数超出上限时截断.
+    :return: {"content", "start_line", "end_line", "total_lines", "truncated"}
+    """
+    stat = path.stat()
+    if stat.st_size == 0:
+        return _empty_result()
+
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        offsets = _get_line_index(path, mm, stat)
+        return _slice_lines(mm, offsets, start_line, end_line)
+
+
+def read_file_lines(f, start_line: int, end_line: int) -> Dict[str, Any]:
+    """同 read_lines, 用于临时文件等打开的文件对象, 换行偏移索引不缓存"""
+    if os.fstat(f.fileno()).st_size == 0:
+        return _empty_result()
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return _slice_lines(mm, _build_line_index(mm), start_line, end_line)
+
+
+def read_buffer_lines(data: bytes, start_line: int, end_line: int) -> Dict[str, Any]:
+    """同 read_lines, 用于已在内存中的内容 (如 git 对象)"""
+    if not data:
+        return _empty_result()
+    return _slice_lines(data, _build_line_index(data), start_line, end_line)
@@ -0,0 +1,63 @@
+# ------------------------------------------------------------
+# @author: Churk
+# @status: 阶段性完工
+# @description: 跨 worker 的代数计数器, 通过内存映射文件共享, 用于判断进程内缓存是否过期
+# ------------------------------------------------------------
+
+import mmap
+from pathlib import Path
+import struct
+import threading
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows 下只有单进程开发服务器, 线程锁即可
+    fcntl = None
+
+_FORMAT = "<Q"
+_SIZE = struct.calcsize(_FORMAT)
+
+
+class GenerationCounter:
+    """
+    共享的代数计数器.
+    数据写入后调用 bump(), 各 worker 读取 value 与自己缓存时记录的代数比较, 不同则重建缓存.
+    value 只读取内存映射的 8 个字节, 不产生系统调用; bump() 通过文件锁与其他 worker 互斥.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._mm: Optional[mmap.mmap] = None
+        self._lock = threading.Lock()
+
+    def _map(self) -> mmap.mmap:
+        if self._mm is None:
+            with self._lock:
+                if self._mm is None:
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    with self.path.open("a+b") as f:
+                        # 追加模式下补齐长度, 多个进程同时创建时不会覆盖已有的值
+                        if f.seek(0, 2) < _SIZE:
+                            f.write(b"\0" * (_SIZE - f.tell()))
+                            f.flush()
+                        self._mm = mmap.mmap(f.fileno(), _SIZE)
+        return self._mm
+
+    @property
+    def value(self) -> int:
+        return struct.unpack_from(_FORMAT, self._map())[0]
+
+    def bump(self) -> int:
+        """代数加一, 返回新值"""
+        mm = self._map()
+        with self._lock, self.path.open("rb") as f:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                value = struct.unpack_from(_FORMAT, mm)[0] + 1
+                struct.pack_into(_FORMAT, mm, 0, value)
+            finally:
+                if fcntl:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        return value
@@ -0,0 +1,408 @@
+# ------------------------------------------------------------
+# @author: Churk
+# @status: 阶段性完工
+# @description: git 对象读取模块, 通过常驻的 git cat-file 进程读取裸仓库中的树与文件, 无需检出
+# ------------------------------------------------------------
+
+import atexit
+from collections import OrderedDict
+from pathlib import Path
+import re
+import subprocess
+import threading
+from typing import Dict, List, Optional, Tuple
+
+GIT_BINARY = "git"
+
+# 对象缓存的总字节数上限; 超过 MAX_CACHED_OBJECT 的对象不缓存
+OBJECT_CACHE_BYTES = 32 * 1024 * 1024
+MAX_CACHED_OBJECT = 1024 * 1024
+
+# 文件大小缓存的最大条目数, 超出后整体清空
+SIZE_CACHE_ENTRIES = 100000
+
+# 流式读取大对象时每次读取的字节数
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# 单次 --batch-check 管道写入的对象数, 避免两端管道缓冲区都写满而死锁
+BATCH_CHECK_CHUNK = 256
+
+# 不允许出现在引用名中的字符: 空白与控制字符会破坏 cat-file 的按行协议
+_INVALID_REF = re.compile(r"[\x00-\x20\x7f]")
+_SHA_PATTERN = re.compile(r"[0-9a-f]{40}")
+
+# 树条目: (名称, 模式, sha)
+TreeEntry = Tuple[str, str, str]
+
+MODE_TREE = "40000"
+MODE_SUBMODULE = "160000"
+
+
+class GitError(Exception):
+    """git 进程异常或对象不存在"""
+
+
+class GitObjectNotFound(GitError, FileNotFoundError):
+    """引用, 路径或对象不存在"""
+
+
+def is_git_repo(path: Path) -> bool:
+    """判断是否为 git 仓库目录 (裸仓库或 .git 目录)"""
+    return (path / "HEAD").is_file() and (path / "objects").is_dir()
+
+
+class _CatFile:
+    """常驻的 git cat-file 进程, 进程意外退出后在下一次请求时重启"""
+
+    def __init__(self, repo_path: Path, mode: str):
+        self.repo_path = repo_path
+        self.mode = mode
+        self.proc: Optional[subprocess.Popen] = None
+
+    def _ensure(self) -> subprocess.Popen:
+        if self.proc is None or self.proc.poll() is not None:
+            self.proc = subprocess.Popen(
+                [GIT_BINARY, "--git-dir", str(self.repo_path), "cat-file", self.mode],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        return self.proc
+
+    @staticmethod
+    def _header(line: bytes) -> Optional[Tuple[str, str, int]]:
+        """解析 "<sha> <类型> <大小>", 对象不存在时 git 输出 "<spec> missing", 返回 None"""
+        parts = line.decode("utf-8", errors="replace").split()
+        if len(parts) != 3:
+            return None
+        sha, obj_type, size = parts
+        return sha, obj_type, int(size)
+
+    def request(self, spec: str) -> Tuple[str, str, bytes]:
+        """--batch: 读取一个对象, 返回 (sha, 类型, 内容)"""
+        for attempt in range(2):
+            proc = self._ensure()
+            try:
+                proc.stdin.write(spec.encode("utf-8") + b"\n")
+                proc.stdin.flush()
+                line = proc.stdout.readline()
+                if not line:
+                    raise BrokenPipeError("git cat-file exited")
+                header = self._header(line)
+                if header is None:
+                    raise GitObjectNotFound(f"object not found: {spec}")
+                sha, obj_type, size = header
+                # 内容之后还有一个换行
+                data = proc.stdout.read(size + 1)[:size]
+                return sha, obj_type, data
+            except GitObjectNotFound:
+                raise
+            except OSError as e:
+                self.close()
+                if attempt:
+                    raise GitError(f"git cat-file failed: {e}")
+
+    def check(self, specs: List[str]) -> List[Optional[Tuple[str, str, int]]]:
+        """--batch-check: 按管道批量查询对象的类型与大小, 不存在的对象为 None"""
+        results = []
+        for i in range(0, len(specs), BATCH_CHECK_CHUNK):
+            chunk = specs[i : i + BATCH_CHECK_CHUNK]
+            proc = self._ensure()
+            try:
+                proc.stdin.write(b"".join(s.encode("utf-8") + b"\n" for s in chunk))
+                proc.stdin.flush()
+                for spec in chunk:
+                    line = proc.stdout.readline()
+                    if not line:
+                        raise BrokenPipeError("git cat-file exited")
+                    results.append(self._header(line))
+            except OSError as e:
+                self.close()
+                raise GitError(f"git cat-file failed: {e}")
+        return results
+
+    def close(self):
+        if self.proc is not None:
+            try:
+                self.proc.stdin.close()
+                self.proc.wait(timeout=1)
+            except Exception:
+                self.proc.kill()
+            self.proc = None
+
+
+class BlobStream:
+    """
+    由独立的 git cat-file blob 进程流式输出的文件内容, 用于不适合整体读入内存的大对象.
+    进程在首次读取时才启动, 读完或 close() 时结束; 可直接作为 WSGI 响应体迭代.
+    """
+
+    def __init__(self, repo_path: Path, sha: str, size: int):
+        self.repo_path = repo_path
+        self.sha = sha
+        self.size = size
+        self._proc: Optional[subprocess.Popen] = None
+        self._head = b""
+
+    def _stdout(self):
+        if self._proc is None:
+            self._proc = subprocess.Popen(
+                [
+                    GIT_BINARY,
+                    "--git-dir",
+                    str(self.repo_path),
+                    "cat-file",
+                    "blob",
+                    self.sha,
+                ],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        return self._proc.stdout
+
+    def peek(self, size: int) -> bytes:
+        """读取开头 size 个字节, 不影响之后的 read() 与迭代"""
+        if len(self._head) < size:
+            self._head += self._stdout().read(size - len(self._head))
+        return self._head[:size]
+
+    def read(self, size: int = -1) -> bytes:
+        head, self._head = self._head, b""
+        if size < 0:
+            return head + self._stdout().read()
+        if len(head) >= size:
+            self._head = head[size:]
+            return head[:size]
+        return head + self._stdout().read(size - len(head))
+
+    def __iter__(self):
+        try:
+            while chunk := self.read(STREAM_CHUNK_SIZE):
+                yield chunk
+        finally:
+            self.close()
+
+    def close(self):
+        if self._proc is not None:
+            self._proc.stdout.close()
+            if self._proc.poll() is None:
+                self._proc.kill()
+            self._proc.wait()
+            self._proc = None
+
+
+class GitRepository:
+    """
+    只读访问一个 git 仓库.
+    每个 worker 对每个仓库各保留一个 cat-file --batch 与 --batch-check 进程;
+    对象按 sha 缓存, 对象内容不可变, 因此缓存永远不需要失效, 只有引用需要每次解析.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._batch = _CatFile(path, "--batch")
+        self._batch_check = _CatFile(path, "--batch-check")
+        self._lock = threading.Lock()
+        # sha -> (类型, 内容或解析后的树条目, 字节数)
+        self._objects: OrderedDict = OrderedDict()
+        self._cached_bytes = 0
+        # blob sha -> 大小
+        self._sizes: Dict[str, int] = {}
+
+    def _cache_put(self, sha: str, obj_type: str, value, size: int):
+        if size > MAX_CACHED_OBJECT:
+            return
+        self._objects[sha] = (obj_type, value, size)
+        self._cached_bytes += size
+        while self._cached_bytes > OBJECT_CACHE_BYTES:
+            _, (_, _, evicted) = self._objects.popitem(last=False)
+            self._cached_bytes -= evicted
+
+    def _read(self, spec: str) -> Tuple[str, str, object]:
+        """读取对象, sha 命中缓存时不访问 git; 树对象缓存解析后的条目"""
+        with self._lock:
+            cached = self._objects.get(spec)
+            if cached:
+                self._objects.move_to_end(spec)
+                return spec, cached[0], cached[1]
+
+            sha, obj_type, data = self._batch.request(spec)
+            value = self._parse_tree(data) if obj_type == "tree" else data
+            self._cache_put(sha, obj_type, value, len(data))
+            return sha, obj_type, value
+
+    @staticmethod
+    def _parse_tree(data: bytes) -> List[TreeEntry]:
+        """解析树对象: 若干个 "<mode> <name>\\0<20 字节 sha>" """
+        entries = []
+        pos = 0
+        while pos < len(data):
+            space = data.index(b" ", pos)
+            nul = data.index(b"\0", space)
+            mode = data[pos:space].decode("ascii")
+            name = data[space + 1 : nul].decode("utf-8", errors="surrogateescape")
+            sha = data[nul + 1 : nul + 21].hex()
+            entries.append((name, mode, sha))
+            pos = nul + 21
+        return entries
+
+    @staticmethod
+    def validate_ref(ref: str) -> str:
+        if not ref or len(ref) > 255 or _INVALID_REF.search(ref):
+            raise GitObjectNotFound(f"invalid ref: {ref!r}")
+        return ref
+
+    def resolve(self, ref: str) -> str:
+        """将引用 (分支, 标签, sha 等) 解析为提交的 sha; 引用可变, 每次都向 git 查询"""
+        ref = self.validate_ref(ref)
+        if _SHA_PATTERN.fullmatch(ref):
+            cached = self._objects.get(ref)
+            if cached and cached[0] == "commit":
+                return ref
+        sha, _, _ = self._read(f"{ref}^{{commit}}")
+        return sha
+
+    def _root_tree(self, commit_sha: str) -> str:
+        _, _, data = self._read(commit_sha)
+        # 提交对象首行为 "tree <sha>"
+        return data[5:45].decode("ascii")
+
+    def _lookup(self, ref: str, path: str) -> Tuple[str, str]:
+        """
+        沿路径逐级查找对象.
+        :return: (模式, sha); 根目录的模式为 MODE_TREE
+        """
+        mode, sha = MODE_TREE, self._root_tree(self.resolve(ref))
+        for part in [p for p in path.replace("\\", "/").split("/") if p]:
+            if mode != MODE_TREE:
+                raise GitObjectNotFound(f"path not found: {path}")
+            _, _, entries = self._read(sha)
+            for name, entry_mode, entry_sha in entries:
+                if name == part:
+                    mode, sha = entry_mode, entry_sha
+                    break
+            else:
+                raise GitObjectNotFound(f"path not found: {path}")
+        return mode, sha
+
+    def _blob_sizes(self, shas: List[str]) -> Dict[str, int]:
+        missing = [sha for sha in shas if sha not in self._sizes]
+        if missing:
+            with self._lock:
+                if len(self._sizes) > SIZE_CACHE_ENTRIES:
+                    self._sizes.clear()
+                for sha, header in zip(missing, self._batch_check.check(missing)):
+                    self._sizes[sha] = header[2] if header else 0
+        return {sha: self._sizes.get(sha, 0) for sha in shas}
+
+    def subtree(self, ref: str, path: str) -> "GitTreeCursor":
+        """返回指向某个目录的游标, 递归展开目录树时不必每层重新解析引用"""
+        mode, sha = self._lookup(ref, path)
+        if mode != MODE_TREE:
+            raise NotADirectoryError("Not a directory")
+        return GitTreeCursor(self, sha)
+
+    def blob_info(self, ref: str, path: str) -> Tuple[str, int]:
+        """返回文件的 (sha, 大小), 不读取内容"""
+        mode, sha = self._lookup(ref, path)
+        if mode in (MODE_TREE, MODE_SUBMODULE):
+            raise GitObjectNotFound(f"not a file: {path}")
+        return sha, self._blob_sizes([sha])[sha]
+
+    def read_blob(self, sha: str) -> bytes:
+        _, obj_type, data = self._read(sha)
+        if obj_type != "blob":
+            raise GitObjectNotFound(f"not a blob: {sha}")
+        return data
+
+    def open_blob(self, sha: str, size: int) -> BlobStream:
+        """以流的形式读取文件内容, 不经过对象缓存; size 为 blob_info 返回的大小"""
+        return BlobStream(self.path, sha, size)
+
+    def list_refs(self) -> List[Dict[str, str]]:
+        """列出分支与标签: [{"name", "type", "sha"}]"""
+        result = subprocess.run(
+            [
+                GIT_BINARY,
+                "--git-dir",
+                str(self.path),
+                "for-each-ref",
+                "--format=%(refname)%00%(objectname)",
+                "refs/heads",
+                "refs/tags",
+            ],
+            capture_output=True,
+            timeout=10,
+        )
+        if result.returncode != 0:
+            raise GitError(result.stderr.decode("utf-8", errors="replace").strip())
+
+        refs = []
+        for line in result.stdout.decode("utf-8", errors="replace").splitlines():
+            refname, sha = line.split("\0")
+            ref_type = "branch" if refname.startswith("refs/heads/") else "tag"
+            refs.append(
+                {"name": refname.split("/", 2)[2], "type": ref_type, "sha": sha}
+            )
+        return refs
+
+    def close(self):
+        with self._lock:
+            self._batch.close()
+            self._batch_check.close()
+
+
+class GitTreeCursor:
+    """已解析到具体树对象的目录, 子目录按名称逐级进入"""
+
+    def __init__(self, repo: GitRepository, sha: str):
+        self.repo = repo
+        self.sha = sha
+
+    def list(self) -> List[Tuple[str, bool, int]]:
+        """
+        列出目录内容, 格式与项目目录列表一致: [(名称, 是否目录, 大小)], 目录在前.
+        子模块视为空目录, 符号链接以文件形式列出.
+        """
+        _, _, entries = self.repo._read(self.sha)
+        blobs = [s for _, m, s in entries if m not in (MODE_TREE, MODE_SUBMODULE)]
+        sizes = self.repo._blob_sizes(blobs)
+        result = [
+            (
+                name,
+                m in (MODE_TREE, MODE_SUBMODULE),
+                0 if m in (MODE_TREE, MODE_SUBMODULE) else sizes.get(s, 0),
+            )
+            for name, m, s in entries
+        ]
+        result.sort(key=lambda e: (not e[1], e[0]))
+        return result
+
+    def child(self, name: str) -> Optional["GitTreeCursor"]:
+        """进入子目录; 子模块没有可读取的树, 返回 None"""
+        _, _, entries = self.repo._read(self.sha)
+        for entry_name, mode, sha in entries:
+            if entry_name == name and mode == MODE_TREE:
+                return GitTreeCursor(self.repo, sha)
+        return None
+
+
+_repositories: Dict[str, GitRepository] = {}
+_repositories_lock = threading.Lock()
+
+
+def get_repository(path: Path) -> GitRepository:
+    """获取仓库实例, 同一 worker 内按路径复用 (进程在首次读取时才启动)"""
+    key = str(path)
+    with _repositories_lock:
+        repo = _repositories.get(key)
+        if repo is None:
+            repo = _repositories[key] = GitRepository(path)
+        return repo
+
+
+@atexit.register
+def _close_repositories():
+    with _repositories_lock:
+        for repo in _repositories.values():
+            repo.close()
@@ -0,0 +1,95 @@
+# ------------------------------------------------------------
+# @author: Churk
+# @status: 阶段性完工
+# @description: 图片处理模块, 基于 Pillow 生成响应式尺寸变体与模糊占位图
+# ------------------------------------------------------------
+
+import base64
+import io
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from PIL import Image, ImageFilter, ImageOps
+
+from backend.core.Logger import get_logger
+
+logger = get_logger("Imaging")
+
+# 可生成变体的位图类型 (GIF 可能为动图, SVG 为矢量图, 均直接返回原图)
+RASTER_MIME_TYPES = {"image/png", "image/jpeg", "image/webp", "image/bmp"}
+
+# 变体宽度档位, 请求的宽度向上取整到最近的档位, 避免为任意宽度生成文件
+VARIANT_WIDTHS = (320, 640, 960, 1280, 1920)
+
+VARIANT_FORMATS = {
+    "webp": ("WEBP", "image/webp"),
+    "jpeg": ("JPEG", "image/jpeg"),
+    "png": ("PNG", "image/png"),
+}
+
+PLACEHOLDER_SIZE = 16
+
+
+def probe_image(path: Path) -> Optional[Dict[str, Any]]:
+    """
+    读取图片尺寸并生成模糊占位图.
+    :return: {"width", "height", "placeholder": data URI}, 非图片或损坏时返回 None
+    """
+    try:
+        with Image.open(path) as im:
+            im = ImageOps.exif_transpose(im)
+            width, height = im.size
+
+            thumb = im.convert("RGBA") if im.mode in ("P", "LA") else im.copy()
+            if thumb.mode not in ("RGB", "RGBA"):
+                thumb = thumb.convert("RGB")
+            thumb.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+            thumb = thumb.filter(ImageFilter.GaussianBlur(1))
+
+            buffer = io.BytesIO()
+            thumb.save(buffer, "WEBP", quality=40)
+    except Exception as e:
+        logger.debug(f"无法解析图片 {path}: {e}")
+        return None
+
+    encoded = base64.b64encode(buffer.getvalue()).decode("ascii")
+    return {
+        "width": width,
+        "height": height,
+        "placeholder": f"data:image/webp;base64,{encoded}",
+    }
+
+
+def pick_width(requested: int, original: Optional[int]) -> int:
+    """将请求宽度取整到档位, 且不超过原图宽度"""
+    target = next((w for w in VARIANT_WIDTHS if w >= requested), VARIANT_WIDTHS[-1])
+    if original:
+        target = min(target, original)
+    return max(target, 1)
+
+
+def render_variant(source: Path, target: Path, width: int, fmt: str):
+    """
+    生成指定宽度与格式的变体.
+    先写入临时文件再原子替换, 多个 worker 并发生成同一变体时不会读到半截文件.
+    """
+    pil_format, _ = VARIANT_FORMATS[fmt]
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+
+    with Image.open(source) as im:
+        im = ImageOps.exif_transpose(im)
+        if im.width > width:
+            height = max(1, round(im.height * width / im.width))
+            im = im.resize((width, height), Image.Resampling.LANCZOS)
+
+        if fmt == "jpeg":
+            im = im.convert("RGB")
+        elif im.mode not in ("RGB", "RGBA"):
+            im = im.convert("RGBA")
+
+        options = {"optimize": True} if fmt == "png" else {"quality": 80}
+        im.save(tmp, pil_format, **options)
+
+    os.replace(tmp, target)
@@ -0,0 +1,134 @@
+# ------------------------------------------------------------
+# @author: Churk
+# @status: 阶段性完工
+# @description: Markdown 渲染模块, 服务端渲染 Markdown 为安全的 HTML 并缓存到磁盘
+# ------------------------------------------------------------
+
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+import mistune
+from mistune.toc import add_toc_hook
+
+from backend.core.Logger import get_logger
+
+logger = get_logger("Markdown")
+
+# 渲染器或插件升级后递增此版本号, 已有缓存会在下次访问或批量重渲染时失效
+RENDERER_VERSION = 1
+
+# 缓存文件与源文件放在同一目录: article.md -> .article.md.render.json
+RENDER_CACHE_SUFFIX = ".render.json"
+
+_markdown = None
+
+
+def _get_markdown() -> mistune.Markdown:
+    global _markdown
+    if _markdown is None:
+        # escape=True 会转义原始 HTML, 链接与图片中的危险协议由 mistune 默认过滤
+        _markdown = mistune.create_markdown(
+            escape=True,
+            plugins=["strikethrough", "table", "url", "task_lists", "footnotes"],
+        )
+        add_toc_hook(_markdown, min_level=1, max_level=4)
+    return _markdown
+
+
+def _content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def render_markdown(text: str) -> Dict[str, Any]:
+    """
+    将 Markdown 渲染为 HTML 和目录.
+    :return: {"html": str, "toc": [{"level": int, "id": str, "text": str}]}
+    """
+    html, state = _get_markdown().parse(text)
+    toc = [
+        {"level": level, "id": heading_id, "text": heading_text}
+        for level, heading_id, heading_text in state.env.get("toc_items", [])
+    ]
+    return {"html": html, "toc": toc}
+
+
+def get_cache_path(source: Path) -> Path:
+    return source.with_name(f".{source.name}{RENDER_CACHE_SUFFIX}")
+
+
+def write_render_cache(source: Path, text: str) -> Dict[str, Any]:
+    """渲染内容并写入缓存文件, 返回渲染结果"""
+    rendered = render_markdown(text)
+    cache = {
+        "hash": _content_hash(text),
+        "version": RENDERER_VERSION,
+        **rendered,
+    }
+    try:
+        with get_cache_path(source).open("w", encoding="utf-8") as f:
+            json.dump(cache, f, ensure_ascii=False)
+    except OSError as e:
+        logger.warning(f"写入渲染缓存失败: {source} - {e}")
+    return rendered
+
+
+def get_rendered(source: Path, text: Optional[str] = None) -> Dict[str, Any]:
+    """
+    获取源文件的渲染结果, 缓存缺失/内容哈希不一致/渲染器版本过期时重新渲染.
+    :param source: Markdown 源文件路径
+    :param text: 已读取的源文件内容, 为 None 时从 source 读取
+    """
+    if text is None:
+        text = source.read_text(encoding="utf-8")
+
+    cache_path = get_cache_path(source)
+    if cache_path.exists():
+        try:
+            with cache_path.open("r", encoding="utf-8") as f:
+                cache = json.load(f)
+            is_fresh = cache.get("version") == RENDERER_VERSION
+            if is_fresh and cache.get("hash") == _content_hash(text):
+                return {"html": cache["html"], "toc": cache["toc"]}
+        except Exception:
+            logger.warning(f"渲染缓存损坏: {cache_path}")
+
+    return write_render_cache(source, text)
+
+
+def _rerender(source: str) -> bool:
+    path = Path(source)
+    try:
+        write_render_cache(path, path.read_text(encoding="utf-8"))
+        return True
+    except Exception as e:
+        logger.error(f"重新渲染失败: {source} - {e}")
+        return False
+
+
+def rerender_all(sources: Iterable[Path], max_workers: Optional[int] = None) -> int:
+    """
+    使用进程池批量重新渲染, 用于升级渲染器后刷新全部缓存.
+    :return: 成功渲染的文件数
+    """
+    paths = [str(s) for s in sources if s.is_file()]
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return sum(pool.map(_rerender, paths, chunksize=16))
+
+
+if __name__ == "__main__":
+    # 用法: python -m backend.core.Markdown
+    from backend.config import Config
+
+    sources = list(Config.BLOGS_DIR.glob("*/article.md"))
+    for project_dir in Config.PROJECTS_DIR.iterdir():
+        if project_dir.is_dir():
+            sources.extend(
+                p
+                for p in project_dir.iterdir()
+                if p.is_file() and p.name.lower() in ("readme.md", "readme.markdown")
+            )
+    count = rerender_all(sources)
+    print(f"已重新渲染 {count}/{len(sources)} 个 Markdown 文件")
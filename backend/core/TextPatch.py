@@ -0,0 +1,62 @@
+# ------------------------------------------------------------
+# @author: Churk
+# @status: 阶段性完工
+# @description: 文本补丁模块, 按行区间局部修改正文, 避免为小改动上传整篇文章
+# ------------------------------------------------------------
+
+import hashlib
+from typing import Any, Dict, List, Optional
+
+
+class PatchError(ValueError):
+    """补丁格式错误或行区间越界"""
+
+
+class PatchConflict(PatchError):
+    """补丁基于的版本与当前内容不一致"""
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def apply_patch(
+    text: str, hunks: List[Dict[str, Any]], base_hash: Optional[str] = None
+) -> str:
+    """
+    将按行区间描述的补丁应用到文本.
+    每个 hunk 为 {"start": int, "end": int, "lines": [str]}, 表示用 lines 替换
+    原文第 [start, end) 行 (从 0 开始, 按 "\\n" 分行); start == end 时为插入, lines 为空时为删除.
+    所有区间都基于原文计算, 不能重叠.
+
+    :param base_hash: 客户端生成补丁时原文的 sha256, 与当前内容不一致时抛出 PatchConflict
+    """
+    if base_hash is not None and base_hash != content_hash(text):
+        raise PatchConflict("content has changed since the patch was created")
+    if not isinstance(hunks, list):
+        raise PatchError("patch must be a list of hunks")
+
+    lines = text.split("\n")
+    parsed = []
+    for hunk in hunks:
+        try:
+            start, end, new_lines = int(hunk["start"]), int(hunk["end"]), hunk["lines"]
+        except (KeyError, TypeError, ValueError):
+            raise PatchError("hunk requires start, end and lines")
+        if not isinstance(new_lines, list) or not all(
+            isinstance(line, str) for line in new_lines
+        ):
+            raise PatchError("hunk lines must be a list of strings")
+        if not 0 <= start <= end <= len(lines):
+            raise PatchError(f"hunk range [{start}, {end}) out of bounds")
+        parsed.append((start, end, new_lines))
+
+    # 从后往前应用, 前面区间的行号不受影响
+    parsed.sort(key=lambda h: (h[0], h[1]), reverse=True)
+    for (start, end, _), (next_start, _, _) in zip(parsed[1:], parsed):
+        if end > next_start:
+            raise PatchError("hunks overlap")
+
+    for start, end, new_lines in parsed:
+        lines[start:end] = new_lines
+    return "\n".join(lines)
@@ -0,0 +1,35 @@
+# ------------------------------------------------------------
+# @author: Churk
+# @status: 阶段性完工
+# @description: 计数列写入模块, 供各数据仓库批量写回浏览量等计数
+# ------------------------------------------------------------
+
+from typing import Dict
+
+from sqlalchemy import bindparam, update
+
+from backend.data.database import db
+
+
+def add_counts(model, column: str, deltas: Dict[str, int]):
+    """
+    原子地批量累加计数列, 一次事务执行 UPDATE ... SET col = col + :n.
+    :param model: 带 uuid 与 updated_at 列的模型
+    :param column: 计数列名
+    :param deltas: {uuid: 增量}
+    """
+    if not deltas:
+        return
+    table = model.__table__
+    stmt = (
+        update(table).where(table.c.uuid == bindparam("b_uuid"))
+        # 显式保留 updated_at, 计数变化不视为内容更新
+        .values(
+            {
+                column: table.c[column] + bindparam("n"),
+                "updated_at": table.c.updated_at,
+            }
+        )
+    )
+    with db.engines[model.__bind_key__].begin() as conn:
+        conn.execute(stmt, [{"b_uuid": u, "n": n} for u, n in deltas.items()])
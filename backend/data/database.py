@@ -31,9 +31,14 @@ def init_db(app: Flask):
         from backend.data.models.navigation import Navigation
         from backend.data.models.project import Project
         from backend.data.models.blog import Blog
+        from backend.data.models.blog_asset import BlogAsset
 
         db.create_all()
 
+        from backend.data.migrations import migrate
+
+        migrate()
+
         if Config.SEED:
             from backend.data.seed import seed
 
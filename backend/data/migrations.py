@@ -0,0 +1,313 @@
+# ------------------------------------------------------------
+# @author: Churk
+# @status: 阶段性完工
+# @description: 数据库迁移模块, 处理 create_all 无法覆盖的表结构变更与数据回填
+# ------------------------------------------------------------
+
+from datetime import datetime
+import json
+
+from sqlalchemy import inspect, select, text, update
+from sqlalchemy.exc import OperationalError
+
+from backend.config import Config
+from backend.core.FileLock import file_lock
+from backend.core.Logger import get_logger
+from backend.data.database import db
+
+logger = get_logger("Migrations")
+
+
+def _add_missing_columns(bind_key: str, table: str, columns: dict):
+    """
+    为已存在的表补齐新增列 (create_all 不会修改已存在的表).
+    :param bind_key: 数据库绑定键
+    :param table: 表名
+    :param columns: 列名 -> 列定义 DDL
+    :return: 本次新增的列名
+    """
+    engine = db.engines[bind_key]
+    existing = {c["name"] for c in inspect(engine).get_columns(table)}
+    missing = {name: ddl for name, ddl in columns.items() if name not in existing}
+    if not missing:
+        return set()
+
+    with engine.begin() as conn:
+        for name, ddl in missing.items():
+            try:
+                conn.execute(text(f'ALTER TABLE "{table}" ADD COLUMN "{name}" {ddl}'))
+                logger.info(f"表 {table} 新增列: {name}")
+            except OperationalError as e:
+                # 多个 worker 同时启动时, 列可能已被其他进程添加
+                if "duplicate column" not in str(e).lower():
+                    raise
+    return set(missing)
+
+
+def _is_applied(bind_key: str, name: str) -> bool:
+    """一次性数据回填是否已完成, 完成标记记录在对应数据库的 migration_flags 表中"""
+    with db.engines[bind_key].begin() as conn:
+        conn.execute(
+            text("CREATE TABLE IF NOT EXISTS migration_flags (name TEXT PRIMARY KEY)")
+        )
+        row = conn.execute(
+            text("SELECT 1 FROM migration_flags WHERE name = :name"), {"name": name}
+        ).first()
+    return row is not None
+
+
+def _mark_applied(bind_key: str, name: str):
+    with db.engines[bind_key].begin() as conn:
+        conn.execute(
+            text("INSERT OR IGNORE INTO migration_flags (name) VALUES (:name)"),
+            {"name": name},
+        )
+
+
+def _ensure_indexes(bind_key: str, model):
+    """为已存在的表补建模型中声明的索引"""
+    engine = db.engines[bind_key]
+    for index in model.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+
+
+def migrate_project_metadata():
+    """
+    将 projects/<uuid>/metadata.json 中的元数据迁移到 Project 表的列中.
+    回填成功后删除 metadata.json, 因此每个项目只会迁移一次.
+    """
+    from backend.data.models.project import Project
+
+    _add_missing_columns(
+        "projects",
+        Project.__tablename__,
+        {
+            "title": "VARCHAR(100) NOT NULL DEFAULT 'Untitled Project'",
+            "description": "TEXT DEFAULT ''",
+            "tags": "JSON",
+            "url": "VARCHAR(500) DEFAULT ''",
+            "icon": "VARCHAR(255) DEFAULT ''",
+        },
+    )
+    _ensure_indexes("projects", Project)
+
+    count = 0
+    for proj in db.session.scalars(select(Project)).all():
+        metadata_path = Config.PROJECTS_DIR / proj.uuid / "metadata.json"
+        if not metadata_path.exists():
+            continue
+
+        try:
+            with metadata_path.open("r", encoding="utf-8") as f:
+                metadata = json.load(f)
+        except Exception:
+            logger.warning(f"项目 {proj.uuid} 元数据文件损坏, 跳过迁移")
+            continue
+
+        tags = metadata.get("tags", [])
+        if isinstance(tags, str):
+            tags = [t.strip() for t in tags.split(",") if t.strip()]
+
+        # 显式保留 updated_at, 迁移不应被视为一次内容更新
+        db.session.execute(
+            update(Project)
+            .where(Project.id == proj.id)
+            .values(
+                title=metadata.get("title") or "Untitled Project",
+                description=metadata.get("description", ""),
+                tags=tags,
+                url=metadata.get("url", ""),
+                icon=metadata.get("icon", ""),
+                updated_at=Project.updated_at,
+            )
+        )
+        db.session.commit()
+
+        metadata_path.unlink(missing_ok=True)
+        count += 1
+
+    if count:
+        logger.info(f"已将 {count} 个项目的 metadata.json 迁移到数据库")
+
+
+def migrate_project_git_repo():
+    """为项目表补充 git 仓库列"""
+    from backend.data.models.project import Project
+
+    _add_missing_columns(
+        "projects", Project.__tablename__, {"git_repo": "VARCHAR(255)"}
+    )
+
+
+def migrate_navigation_health():
+    """为导航表补充链接检查结果列"""
+    from backend.data.models.navigation import Navigation
+
+    _add_missing_columns(
+        "navigations",
+        Navigation.__tablename__,
+        {
+            "status_code": "INTEGER",
+            "latency_ms": "INTEGER",
+            "checked_at": "DATETIME",
+            "favicon": "VARCHAR(64)",
+        },
+    )
+
+
+def migrate_list_indexes():
+    """补建列表分页所需的排序键复合索引"""
+    from backend.data.models.blog import Blog
+    from backend.data.models.navigation import Navigation
+
+    _ensure_indexes("blogs", Blog)
+    _ensure_indexes("navigations", Navigation)
+
+
+def migrate_search_index():
+    """创建博客/项目的 FTS5 检索表, 首次创建时从现有数据回填"""
+    from backend.data import blogs, projects
+    from backend.data.models.blog import Blog
+    from backend.data.models.project import Project
+
+    if not blogs.search_index.exists():
+        blogs.search_index.create()
+        for blog in db.session.scalars(select(Blog)).all():
+            blogs.search_index.index(blog.id, blogs._read_files(blog.uuid))
+        logger.info("已创建博客检索索引")
+
+    if not projects.search_index.exists():
+        projects.search_index.create()
+        for proj in db.session.scalars(select(Project)).all():
+            fields = proj.to_dict()
+            try:
+                fields.update(projects._read_files(proj.uuid))
+            except Exception:
+                logger.warning(f"项目 {proj.uuid} README 读取失败, 仅索引元数据")
+            projects.search_index.index(proj.id, fields)
+        logger.info("已创建项目检索索引")
+
+
+def migrate_tag_index():
+    """
+    从博客 metadata.json 与项目 tags 列回填标签索引, 每个数据库只执行一次.
+    以完成标记而非索引是否为空判断, 没有任何标签时也不会在每次启动时重新扫描;
+    需要重建时删除 migration_flags 表中的 tag_index 行后重启.
+    """
+    from backend.data import blogs, projects
+    from backend.data.models.blog import Blog
+    from backend.data.models.project import Project
+
+    if not _is_applied("blogs", "tag_index"):
+        for blog in db.session.scalars(select(Blog)).all():
+            blogs.tag_index.set(blog.id, blogs._get_metadata(blog.uuid).get("tags", []))
+        _mark_applied("blogs", "tag_index")
+        logger.info("已回填博客标签索引")
+
+    if not _is_applied("projects", "tag_index"):
+        for proj in db.session.scalars(select(Project)).all():
+            projects.tag_index.set(proj.id, proj.tags)
+        _mark_applied("projects", "tag_index")
+        logger.info("已回填项目标签索引")
+
+
+def _backfill_asset_references():
+    """扫描一次所有文章, 将正文中引用的资产标记为已引用, 其余资产标记为从现在起孤立"""
+    from backend.data.models.blog_asset import BlogAsset
+    from backend.data.repositories.blog_repo import extract_asset_refs
+
+    for article_path in Config.BLOGS_DIR.glob("*/article.md"):
+        refs = extract_asset_refs(article_path.read_text(encoding="utf-8"))
+        if refs:
+            db.session.execute(
+                update(BlogAsset)
+                .where(
+                    BlogAsset.blog_uuid == article_path.parent.name,
+                    BlogAsset.uuid.in_(refs),
+                )
+                .values(referenced=True, orphaned_at=None)
+            )
+    # 升级时已不被引用的资产从现在开始计算宽限期, 否则 orphaned_at 为空, 永远不会被清理
+    db.session.execute(
+        update(BlogAsset)
+        .where(BlogAsset.referenced.is_(False), BlogAsset.orphaned_at.is_(None))
+        .values(orphaned_at=datetime.now())
+    )
+    db.session.commit()
+
+
+def migrate_blog_assets():
+    """
+    资产表为空时, 将已有的 blogs/<uuid>/assets/* 文件登记到资产表.
+    首次登记或新增引用标记列时, 根据文章内容回填引用标记.
+    """
+    import hashlib
+    import mimetypes
+
+    from backend.core.Imaging import RASTER_MIME_TYPES, probe_image
+    from backend.data.models.blog_asset import BlogAsset
+
+    added = _add_missing_columns(
+        "blogs",
+        BlogAsset.__tablename__,
+        {
+            "width": "INTEGER",
+            "height": "INTEGER",
+            "placeholder": "TEXT",
+            "referenced": "BOOLEAN NOT NULL DEFAULT 0",
+            "orphaned_at": "DATETIME",
+        },
+    )
+
+    _ensure_indexes("blogs", BlogAsset)
+
+    if db.session.scalars(select(BlogAsset.id).limit(1)).first() is not None:
+        if "referenced" in added:
+            _backfill_asset_references()
+        return
+
+    count = 0
+    for asset_file in Config.BLOGS_DIR.glob("*/assets/*"):
+        if not asset_file.is_file() or not asset_file.suffix:
+            continue
+        ext = asset_file.suffix.lower()
+        mime_type = mimetypes.guess_type(f"x{ext}")[0] or "application/octet-stream"
+        info = probe_image(asset_file) if mime_type in RASTER_MIME_TYPES else None
+        db.session.add(
+            BlogAsset(
+                uuid=asset_file.stem,
+                blog_uuid=asset_file.parent.parent.name,
+                ext=asset_file.suffix,
+                size=asset_file.stat().st_size,
+                content_hash=hashlib.sha256(asset_file.read_bytes()).hexdigest(),
+                mime_type=mime_type,
+                width=info["width"] if info else None,
+                height=info["height"] if info else None,
+                placeholder=info["placeholder"] if info else None,
+            )
+        )
+        count += 1
+
+    if count:
+        db.session.commit()
+        _backfill_asset_references()
+        logger.info(f"已将 {count} 个博客资产登记到资产表")
+
+
+def migrate():
+    """
+    执行所有迁移, 每一步都必须是幂等的.
+    多个 worker 同时启动时通过文件锁依次执行, 后获得锁的 worker 会看到前者的结果并跳过回填.
+    """
+    with file_lock("migrations"):
+        _migrate()
+
+
+def _migrate():
+    migrate_project_metadata()
+    migrate_project_git_repo()
+    migrate_navigation_health()
+    migrate_list_indexes()
+    migrate_search_index()
+    migrate_tag_index()
+    migrate_blog_assets()
@@ -11,6 +11,7 @@ def _get_uuid() -> str:
 class Blog(db.Model):
     __tablename__ = "blog"
     __bind_key__ = "blogs"
+    __table_args__ = (db.Index("ix_blog_created_at_id", "created_at", "id"),)
 
     id = db.Column(db.Integer, primary_key=True)
     uuid = db.Column(db.String(36), unique=True, nullable=False, default=_get_uuid)
@@ -0,0 +1,46 @@
+from datetime import datetime
+
+from backend.data.database import db
+
+
+class BlogAsset(db.Model):
+    __tablename__ = "blog_asset"
+    __bind_key__ = "blogs"
+
+    id = db.Column(db.Integer, primary_key=True)
+    uuid = db.Column(db.String(36), unique=True, nullable=False)
+    blog_uuid = db.Column(db.String(36), nullable=False, index=True)
+    ext = db.Column(db.String(16), nullable=False)
+    size = db.Column(db.Integer, nullable=False, default=0)
+    content_hash = db.Column(db.String(64), nullable=False)
+    mime_type = db.Column(db.String(100), nullable=False)
+    width = db.Column(db.Integer, nullable=True)
+    height = db.Column(db.Integer, nullable=True)
+    placeholder = db.Column(db.Text, nullable=True)
+    # 是否被文章正文引用, 在保存文章时增量维护
+    referenced = db.Column(db.Boolean, nullable=False, default=False)
+    # 变为未引用的时间, 超过宽限期后由后台清理任务删除; 为空表示不参与清理
+    orphaned_at = db.Column(db.DateTime, nullable=True, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.now)
+
+    @property
+    def filename(self) -> str:
+        return f"{self.uuid}{self.ext}"
+
+    def to_dict(self):
+        return {
+            "uuid": self.uuid,
+            "blog_uuid": self.blog_uuid,
+            "ext": self.ext,
+            "size": self.size,
+            "content_hash": self.content_hash,
+            "mime_type": self.mime_type,
+            "width": self.width,
+            "height": self.height,
+            "placeholder": self.placeholder,
+            "referenced": self.referenced,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
+
+    def __repr__(self):
+        return f"<BlogAsset {self.filename}>"
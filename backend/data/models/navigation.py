@@ -11,6 +11,9 @@ def _get_uuid() -> str:
 class Navigation(db.Model):
     __tablename__ = "navigation"
     __bind_key__ = "navigations"
+    __table_args__ = (
+        db.Index("ix_navigation_order_created_at_id", "order", "created_at", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     uuid = db.Column(db.String(36), unique=True, nullable=False, default=_get_uuid)
@@ -22,6 +25,11 @@ class Navigation(db.Model):
     owner_uuid = db.Column(db.String(36), nullable=True)
     is_public = db.Column(db.Boolean, default=True)
     order = db.Column(db.Integer, default=0)
+    # 链接检查结果, 由后台任务写入: 最终状态码 (无法访问时为空), 延迟, 检查时间, 本地缓存的图标文件名
+    status_code = db.Column(db.Integer, nullable=True)
+    latency_ms = db.Column(db.Integer, nullable=True)
+    checked_at = db.Column(db.DateTime, nullable=True)
+    favicon = db.Column(db.String(64), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.now)
     updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
 
@@ -36,6 +44,10 @@ class Navigation(db.Model):
             "owner_uuid": self.owner_uuid,
             "is_public": self.is_public,
             "order": self.order,
+            "status_code": self.status_code,
+            "latency_ms": self.latency_ms,
+            "checked_at": self.checked_at.isoformat() if self.checked_at else None,
+            "favicon": self.favicon,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
         }
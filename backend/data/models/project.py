@@ -11,10 +11,22 @@ def _get_uuid() -> str:
 class Project(db.Model):
     __tablename__ = "project"
     __bind_key__ = "projects"
+    __table_args__ = (
+        db.Index("ix_project_order_created_at_id", "order", "created_at", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     uuid = db.Column(db.String(36), unique=True, nullable=False, default=_get_uuid)
     owner_uuid = db.Column(db.String(36), nullable=False)
+    title = db.Column(
+        db.String(100), nullable=False, default="Untitled Project", index=True
+    )
+    description = db.Column(db.Text, nullable=True, default="")
+    tags = db.Column(db.JSON, nullable=True, default=list)
+    url = db.Column(db.String(500), nullable=True, default="")
+    icon = db.Column(db.String(255), nullable=True, default="")
+    # 关联的 git 仓库 (相对 Config.GIT_REPOS_DIR 的路径), 为空时文件来自项目目录
+    git_repo = db.Column(db.String(255), nullable=True)
     is_public = db.Column(db.Boolean, default=True)
     order = db.Column(db.Integer, default=0)
     views = db.Column(db.Integer, default=0)
@@ -26,6 +38,12 @@ class Project(db.Model):
         return {
             "uuid": self.uuid,
             "owner_uuid": self.owner_uuid,
+            "title": self.title,
+            "description": self.description or "",
+            "tags": list(self.tags or []),
+            "url": self.url or "",
+            "icon": self.icon or "",
+            "git_repo": self.git_repo or "",
             "is_public": self.is_public,
             "order": self.order,
             "views": self.views,
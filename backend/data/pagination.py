@@ -0,0 +1,99 @@
+# ------------------------------------------------------------
+# @author: Churk
+# @status: 阶段性完工
+# @description: 键集 (keyset) 分页模块, 基于排序键而非 OFFSET 翻页
+# ------------------------------------------------------------
+
+import base64
+from datetime import datetime
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import DateTime, Integer, Select, String, tuple_
+
+from backend.data.database import db
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+
+def parse_limit(value: Optional[int]) -> int:
+    """将请求中的 limit 限制在 [1, MAX_LIMIT] 范围内"""
+    if value is None:
+        return DEFAULT_LIMIT
+    return max(1, min(int(value), MAX_LIMIT))
+
+
+def encode_cursor(row: Any, columns: Sequence) -> str:
+    """将一行记录的排序键编码为不透明游标"""
+    values = []
+    for column in columns:
+        value = getattr(row, column.key)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        values.append(value)
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_value(column, value: Any) -> Any:
+    """按列类型还原游标中的值, 类型不符时抛出 ValueError"""
+    if value is None:
+        return None
+    if isinstance(column.type, DateTime):
+        if not isinstance(value, str):
+            raise ValueError("Invalid cursor")
+        return datetime.fromisoformat(value)
+    if isinstance(column.type, Integer):
+        if not isinstance(value, int) or isinstance(value, bool):
+            raise ValueError("Invalid cursor")
+        return value
+    if isinstance(column.type, String):
+        if not isinstance(value, str):
+            raise ValueError("Invalid cursor")
+        return value
+    # 其他类型只接受 JSON 标量, 拒绝数组与对象
+    if isinstance(value, (list, dict)):
+        raise ValueError("Invalid cursor")
+    return value
+
+
+def decode_cursor(cursor: str, columns: Sequence) -> List[Any]:
+    """
+    解码游标为排序键的值列表.
+    游标来自客户端, 每个值都按列类型校验, 任何格式错误都统一抛出 ValueError.
+    :raises ValueError: 游标格式错误
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("Invalid cursor")
+        return [_decode_value(c, v) for c, v in zip(columns, values)]
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def keyset_paginate(
+    stmt: Select, columns: Sequence, limit: int, cursor: Optional[str] = None
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    按 columns 降序进行键集分页, 无论翻到第几页都只扫描 limit + 1 行.
+    :param stmt: 已应用过滤条件的查询
+    :param columns: 排序键 (需唯一, 通常以主键结尾)
+    :param limit: 每页数量
+    :param cursor: 上一页返回的 next_cursor
+    :return: (当前页记录, 下一页游标; 没有下一页时为 None)
+    """
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        stmt = stmt.where(tuple_(*columns) < tuple_(*values))
+
+    stmt = stmt.order_by(*[c.desc() for c in columns]).limit(limit + 1)
+    rows = list(db.session.scalars(stmt).all())
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1], columns)
+    return rows, next_cursor
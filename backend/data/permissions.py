@@ -0,0 +1,24 @@
+# ------------------------------------------------------------
+# @author: Churk
+# @status: 阶段性完工
+# @description: 鉴权字段查询模块, 供各数据仓库只读取所有者与可见性
+# ------------------------------------------------------------
+
+from typing import Any, Dict, Optional
+
+from sqlalchemy import select
+
+from backend.data.database import db
+
+
+def get_permission(model, uuid: str) -> Optional[Dict[str, Any]]:
+    """
+    仅查询鉴权所需的所有者与可见性, 不读取任何文件.
+    :param model: 带 uuid, owner_uuid 与 is_public 列的模型
+    :return: {"owner_uuid": str, "is_public": bool}, 不存在时返回 None
+    """
+    stmt = select(model.owner_uuid, model.is_public).filter_by(uuid=uuid)
+    row = db.session.execute(stmt).first()
+    if not row:
+        return None
+    return {"owner_uuid": row.owner_uuid, "is_public": row.is_public}
@@ -4,21 +4,87 @@
 # @description: 博客数据仓库, 封装 Blog 模型的所有数据库操作
 # ------------------------------------------------------------
 
+from datetime import datetime, timedelta
+import hashlib
 import json
+import mimetypes
+import os
 from pathlib import Path
 import re
 import shutil
-from typing import Any, Dict, List, Optional
+from typing import Any, BinaryIO, Dict, List, Optional, Set, Tuple
+import uuid as uuid_lib
 
-from sqlalchemy import or_, select
+from sqlalchemy import delete, or_, select, update
 
 from backend.config import Config
+from backend.core.Imaging import RASTER_MIME_TYPES, probe_image
 from backend.core.Logger import get_logger
+from backend.core.Markdown import get_rendered, write_render_cache
+from backend.core.TextPatch import apply_patch
+from backend.data.counters import add_counts
 from backend.data.database import db
 from backend.data.models.blog import Blog
+from backend.data.models.blog_asset import BlogAsset
+from backend.data.pagination import keyset_paginate
+from backend.data.permissions import get_permission
+from backend.data.search_index import SearchIndex
+from backend.data.tag_index import TagIndex
 
 logger = get_logger("Repo_Blog")
 
+# 正文中的资产链接: /api/blog/<blog-uuid>/assets/<asset-uuid>
+_ASSET_REF_PATTERN = re.compile(r"/api/blog/[^/]+/assets/([a-f0-9-]+)")
+
+
+def extract_asset_refs(content: str) -> Set[str]:
+    """提取正文中引用的资产 UUID"""
+    return set(_ASSET_REF_PATTERN.findall(content))
+
+
+class DraftConflict(Exception):
+    """草稿 revision 落后于已保存的版本, current 为当前生效的草稿信息 (不含正文)"""
+
+    def __init__(self, current: Dict[str, Any]):
+        super().__init__(f"stale draft revision, current is {current['revision']}")
+        self.current = current
+
+
+class _BlogMeta:
+    """
+    博客元数据索引条目, 只保留列表所需字段, 并记录 metadata.json 的 mtime/size 用于校验
+    """
+
+    __slots__ = (
+        "mtime_ns",
+        "size",
+        "title",
+        "summary",
+        "tags",
+        "cover_image",
+        "author_name",
+    )
+
+    FIELDS = ("title", "summary", "tags", "cover_image", "author_name")
+
+    def __init__(self, stat, metadata: Dict[str, Any]):
+        self.mtime_ns = stat.st_mtime_ns
+        self.size = stat.st_size
+        for field in self.FIELDS:
+            setattr(self, field, metadata.get(field))
+
+    def is_fresh(self, stat) -> bool:
+        return self.mtime_ns == stat.st_mtime_ns and self.size == stat.st_size
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {}
+        for field in self.FIELDS:
+            value = getattr(self, field)
+            if value is not None:
+                # tags 为列表, 复制一份避免调用方修改索引内容
+                result[field] = list(value) if field == "tags" else value
+        return result
+
 
 class BlogRepository:
     """
@@ -27,6 +93,12 @@ class BlogRepository:
 
     def __init__(self):
         self.model = Blog
+        # 进程内元数据索引 (每个 worker 各自持有): uuid -> _BlogMeta
+        self._meta_index: Dict[str, _BlogMeta] = {}
+        self.search_index = SearchIndex(
+            "blogs", Blog, ("title", "summary", "tags", "content")
+        )
+        self.tag_index = TagIndex("blogs", Blog)
 
     def _get_blog_dir(self, uuid: str) -> Path:
         return Config.BLOGS_DIR / uuid
@@ -36,31 +108,43 @@ class BlogRepository:
         path.mkdir(parents=True, exist_ok=True)
 
     def _save_files(self, uuid: str, data: Dict[str, Any]):
-        self._ensure_blog_dir(uuid)
-        blog_dir = self._get_blog_dir(uuid)
+        self._write_metadata(uuid, data)
+        self._write_content(uuid, data.get("content", ""))
 
-        # 元数据
+    def _write_metadata(self, uuid: str, data: Dict[str, Any]):
+        self._ensure_blog_dir(uuid)
         metadata = {
             "title": data.get("title", ""),
             "summary": data.get("summary", ""),
-            "tags": data.get("tags", []),
+            "tags": self._normalize_tags(data.get("tags", [])),
             "cover_image": data.get("cover_image", ""),
             "author_name": data.get("author_name", ""),
         }
 
-        if isinstance(metadata["tags"], str):
-            metadata["tags"] = [
-                t.strip() for t in metadata["tags"].split(",") if t.strip()
-            ]
-
-        with (blog_dir / "metadata.json").open("w", encoding="utf-8") as f:
+        with (self._get_blog_dir(uuid) / "metadata.json").open(
+            "w", encoding="utf-8"
+        ) as f:
             json.dump(metadata, f, ensure_ascii=False, indent=2)
 
-        # 内容
-        content = data.get("content", "")
-
-        with (blog_dir / "article.md").open("w", encoding="utf-8") as f:
+    def _write_content(self, uuid: str, content: str):
+        self._ensure_blog_dir(uuid)
+        article_path = self._get_blog_dir(uuid) / "article.md"
+        with article_path.open("w", encoding="utf-8") as f:
             f.write(content)
+        write_render_cache(article_path, content)
+
+    def _read_content(self, uuid: str) -> str:
+        content_path = self._get_blog_dir(uuid) / "article.md"
+        if not content_path.exists():
+            return ""
+        with content_path.open("r", encoding="utf-8") as f:
+            return f.read()
+
+    @staticmethod
+    def _normalize_tags(tags) -> List[str]:
+        if isinstance(tags, str):
+            return [t.strip() for t in tags.split(",") if t.strip()]
+        return list(tags or [])
 
     def _read_files(self, uuid: str) -> Dict[str, Any]:
         blog_dir = self._get_blog_dir(uuid)
@@ -87,44 +171,182 @@ class BlogRepository:
 
         return result
 
+    def _get_metadata(self, uuid: str) -> Dict[str, Any]:
+        """从元数据索引读取博客元数据, 仅在 metadata.json 的 mtime/size 变化时重新加载"""
+        metadata_path = self._get_blog_dir(uuid) / "metadata.json"
+        try:
+            stat = metadata_path.stat()
+        except OSError:
+            self._meta_index.pop(uuid, None)
+            return {}
+
+        entry = self._meta_index.get(uuid)
+        if entry is None or not entry.is_fresh(stat):
+            metadata = {}
+            try:
+                with metadata_path.open("r", encoding="utf-8") as f:
+                    metadata = json.load(f)
+            except Exception:
+                logger.warning(f"博客 {uuid} 元数据文件损坏")
+            entry = _BlogMeta(stat, metadata)
+            self._meta_index[uuid] = entry
+
+        return entry.to_dict()
+
+    def _invalidate_metadata(self, uuid: str):
+        """使元数据索引条目失效, 下次访问时惰性重建"""
+        self._meta_index.pop(uuid, None)
+
     def _merge_blog_data(self, blog: Blog, show_content: bool = True) -> Dict[str, Any]:
         base_data = blog.to_dict()
-        file_data = self._read_files(blog.uuid)
         if not show_content:
-            # 过滤掉 content 字段, 这是为了防止渲染全部文章时获取过多内容, 拖慢响应时间
-            file_data.pop("content", None)
+            # 列表只需元数据, 走索引而不读取 article.md, 防止渲染全部文章时拖慢响应时间
+            return {**base_data, **self._get_metadata(blog.uuid)}
 
+        file_data = self._read_files(blog.uuid)
         return {**base_data, **file_data}
 
-    def _clean_unused_assets(self, uuid: str):
-        blog_dir = self._get_blog_dir(uuid)
-        article_path = blog_dir / "article.md"
-        assets_dir = blog_dir / "assets"
-        if not assets_dir.exists() or not article_path.exists():
-            return
-
-        # 获取article中的所有资产ID
-        with article_path.open("r", encoding="utf-8") as f:
-            content = f.read()
-            asset_ids = set()
-            for line in content.splitlines():
-                # 提取模式 /api/blog/<*>/assets/<assets-uuid> 中的UUID
-                match = re.search(r"/api/blog/[^/]+/assets/([a-f0-9-]+)", line)
-                if match:
-                    asset_ids.add(match.group(1))
-
-        # 遍历资产目录, 删除未被引用的资产
-        for asset_file in assets_dir.iterdir():
-            if asset_file.is_file() and asset_file.suffix:
-                asset_id = asset_file.stem
-                if asset_id not in asset_ids:
-                    asset_file.unlink()
-                    logger.info(f"删除未被引用的资产 {asset_id}")
+    def _sync_asset_refs(self, uuid: str, content: str):
+        """
+        根据新正文增量更新资产引用标记, 只写入发生变化的资产.
+        不再被引用的资产仅记录时间, 文件由 sweep_orphaned_assets 在请求之外清理.
+        """
+        new_refs = extract_asset_refs(content)
+        old_refs = set(
+            db.session.scalars(
+                select(BlogAsset.uuid).where(
+                    BlogAsset.blog_uuid == uuid, BlogAsset.referenced.is_(True)
+                )
+            )
+        )
+
+        added = new_refs - old_refs
+        removed = old_refs - new_refs
+        if added:
+            db.session.execute(
+                update(BlogAsset)
+                .where(BlogAsset.blog_uuid == uuid, BlogAsset.uuid.in_(added))
+                .values(referenced=True, orphaned_at=None)
+            )
+        if removed:
+            db.session.execute(
+                update(BlogAsset)
+                .where(BlogAsset.blog_uuid == uuid, BlogAsset.uuid.in_(removed))
+                .values(referenced=False, orphaned_at=datetime.now())
+            )
+        if added or removed:
+            db.session.commit()
 
-    def get_all(
-        self, user_uuid: Optional[str] = None, view_all: bool = False
-    ) -> List[Dict[str, Any]]:
+    def sweep_orphaned_assets(self, grace_seconds: float) -> int:
+        """
+        删除未被引用且超过宽限期的资产文件 (含尺寸变体) 及其记录.
+        宽限期内重新引用的资产会被保留, 刚上传尚未保存到正文的资产同样受宽限期保护.
+        :return: 删除的资产数
+        """
+        cutoff = datetime.now() - timedelta(seconds=grace_seconds)
+        # 先删除记录再删除文件: 条件在同一条语句中判断, 不会误删刚被重新引用的资产
+        rows = db.session.execute(
+            delete(BlogAsset)
+            .where(
+                BlogAsset.referenced.is_(False),
+                BlogAsset.orphaned_at.is_not(None),
+                BlogAsset.orphaned_at < cutoff,
+            )
+            .returning(BlogAsset.blog_uuid, BlogAsset.uuid, BlogAsset.ext)
+        ).all()
+        db.session.commit()
+
+        for blog_uuid, asset_uuid, ext in rows:
+            assets_dir = self._get_assets_dir(blog_uuid)
+            (assets_dir / f"{asset_uuid}{ext}").unlink(missing_ok=True)
+            variants_dir = assets_dir / "variants"
+            if variants_dir.exists():
+                for variant in variants_dir.glob(f"{asset_uuid}_*"):
+                    variant.unlink(missing_ok=True)
+            logger.info(f"删除未被引用的资产 {asset_uuid}")
+
+        return len(rows)
+
+    def _get_assets_dir(self, uuid: str) -> Path:
+        return self._get_blog_dir(uuid) / "assets"
+
+    def save_asset(
+        self,
+        blog_uuid: str,
+        stream: BinaryIO,
+        filename: str,
+        mime_type: Optional[str] = None,
+    ) -> BlogAsset:
+        """
+        保存资产文件并登记到资产表, 写入时同步计算大小与内容哈希.
+        :param stream: 文件数据流
+        :param filename: 原始文件名, 用于确定扩展名
+        :param mime_type: 客户端声明的 MIME 类型, 无法从扩展名推断时使用
+        """
+        assets_dir = self._get_assets_dir(blog_uuid)
+        assets_dir.mkdir(parents=True, exist_ok=True)
+
+        ext = Path(filename).suffix.lower() or ".png"  # 默认扩展名
+        asset = BlogAsset(
+            uuid=str(uuid_lib.uuid4()),
+            blog_uuid=blog_uuid,
+            ext=ext,
+            mime_type=mimetypes.guess_type(f"x{ext}")[0]
+            or mime_type
+            or "application/octet-stream",
+            # 上传后到保存正文之前视为未引用, 超过宽限期仍未被引用则会被清理
+            orphaned_at=datetime.now(),
+        )
+
+        sha256 = hashlib.sha256()
+        size = 0
+        with (assets_dir / asset.filename).open("wb") as f:
+            while chunk := stream.read(64 * 1024):
+                sha256.update(chunk)
+                size += len(chunk)
+                f.write(chunk)
+
+        asset.size = size
+        asset.content_hash = sha256.hexdigest()
+
+        # 位图记录尺寸并生成模糊占位图, 尺寸变体在首次请求时按需生成
+        if asset.mime_type in RASTER_MIME_TYPES:
+            info = probe_image(assets_dir / asset.filename)
+            if info:
+                asset.width = info["width"]
+                asset.height = info["height"]
+                asset.placeholder = info["placeholder"]
+
+        db.session.add(asset)
+        db.session.commit()
+        return asset
+
+    def get_asset(self, blog_uuid: str, asset_uuid: str) -> Optional[BlogAsset]:
+        """通过资产表查找资产, 不扫描目录"""
+        stmt = select(BlogAsset).filter_by(uuid=asset_uuid, blog_uuid=blog_uuid)
+        return db.session.scalars(stmt).first()
+
+    def get_asset_path(self, asset: BlogAsset) -> Path:
+        return self._get_assets_dir(asset.blog_uuid) / asset.filename
+
+    def get_variant_path(self, asset: BlogAsset, width: int, fmt: str) -> Path:
+        # 变体统一放在 assets/variants 下, 以 <资产 UUID>_<宽度> 命名, 清理资产时一并删除
+        ext = "jpg" if fmt == "jpeg" else fmt
+        return (
+            self._get_assets_dir(asset.blog_uuid)
+            / "variants"
+            / f"{asset.uuid}_{width}.{ext}"
+        )
+
+    def _visible_stmt(
+        self,
+        user_uuid: Optional[str] = None,
+        view_all: bool = False,
+        tag: Optional[str] = None,
+    ):
         stmt = select(self.model)
+        if tag:
+            stmt = self.tag_index.filter(stmt, tag)
 
         if not view_all:
             # Public + Own
@@ -137,17 +359,87 @@ class BlogRepository:
             else:
                 stmt = stmt.filter_by(is_public=True)
 
+        return stmt
+
+    def get_all(
+        self,
+        user_uuid: Optional[str] = None,
+        view_all: bool = False,
+        tag: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        stmt = self._visible_stmt(user_uuid, view_all, tag)
         stmt = stmt.order_by(self.model.created_at.desc())
         blogs = db.session.scalars(stmt).all()
 
         return [self._merge_blog_data(b, show_content=False) for b in blogs]
 
-    def get_by_uuid(self, uuid: str) -> Optional[Dict[str, Any]]:
+    def get_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        user_uuid: Optional[str] = None,
+        view_all: bool = False,
+        tag: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """按 created_at 键集分页获取博客列表, 返回 (当前页, 下一页游标)"""
+        blogs, next_cursor = keyset_paginate(
+            self._visible_stmt(user_uuid, view_all, tag),
+            [self.model.created_at, self.model.id],
+            limit,
+            cursor,
+        )
+        return [
+            self._merge_blog_data(b, show_content=False) for b in blogs
+        ], next_cursor
+
+    def search(
+        self,
+        query: str,
+        user_uuid: Optional[str] = None,
+        view_all: bool = False,
+        limit: int = 20,
+    ) -> List[Dict[str, Any]]:
+        """全文检索博客, 按相关度排序, 每项附带 snippet 高亮片段"""
+        hits = self.search_index.search(query, user_uuid, view_all, limit)
+        if not hits:
+            return []
+
+        stmt = select(self.model).where(self.model.id.in_([h[0] for h in hits]))
+        blogs = {b.id: b for b in db.session.scalars(stmt).all()}
+
+        results = []
+        for blog_id, snippet in hits:
+            blog = blogs.get(blog_id)
+            if blog:
+                data = self._merge_blog_data(blog, show_content=False)
+                data["snippet"] = snippet
+                results.append(data)
+        return results
+
+    def get_tags(
+        self, user_uuid: Optional[str] = None, view_all: bool = False
+    ) -> List[Dict[str, Any]]:
+        """从标签索引统计可见博客的标签数量, 不读取任何文件"""
+        return self.tag_index.counts(user_uuid, view_all)
+
+    def get_permission(self, uuid: str) -> Optional[Dict[str, Any]]:
+        return get_permission(self.model, uuid)
+
+    def get_by_uuid(self, uuid: str, as_html: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        根据 UUID 获取博客详情.
+        :param as_html: 为 True 时以渲染后的 html/toc 代替 Markdown 原文 content
+        """
         stmt = select(self.model).filter_by(uuid=uuid)
         blog = db.session.scalars(stmt).first()
         if not blog:
             return None
-        return self._merge_blog_data(blog)
+
+        data = self._merge_blog_data(blog)
+        if as_html:
+            content = data.pop("content", "")
+            data.update(get_rendered(self._get_blog_dir(uuid) / "article.md", content))
+        return data
 
     def create(self, data: Dict[str, Any]) -> Dict[str, Any]:
         # 提取数据库字段
@@ -162,42 +454,145 @@ class BlogRepository:
 
         # 保存文件
         self._save_files(blog.uuid, data)
+        self._invalidate_metadata(blog.uuid)
+        self.search_index.index(blog.id, data)
+        self.tag_index.set(blog.id, data.get("tags", []))
 
         return self._merge_blog_data(blog)
 
-    def update(self, uuid: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    def update(
+        self,
+        uuid: str,
+        data: Dict[str, Any],
+        content_patch: Optional[List[Dict[str, Any]]] = None,
+        base_hash: Optional[str] = None,
+        show_content: bool = True,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        更新博客, 只写入实际发生变化的部分: 仅改数据库字段时不读写任何文件,
+        元数据与正文分别按需重写.
+        :param content_patch: 正文行区间补丁, 见 backend.core.TextPatch.apply_patch
+        :param base_hash: 补丁基于的正文 sha256, 用于检测并发修改
+        :param show_content: 返回值是否包含正文, 为 False 时不读取 article.md
+        """
         stmt = select(self.model).filter_by(uuid=uuid)
         blog = db.session.scalars(stmt).first()
         if not blog:
             return None
 
-        # 更新数据库字段
-        if "is_public" in data:
+        changed: Dict[str, Any] = {}
+
+        # 元数据: 与索引中的当前值比较, 有差异才重写 metadata.json
+        meta_keys = [k for k in _BlogMeta.FIELDS if k in data]
+        if meta_keys:
+            current_meta = self._get_metadata(uuid)
+            for key in meta_keys:
+                value = data[key]
+                if key == "tags":
+                    value = self._normalize_tags(value)
+                if current_meta.get(key) != value:
+                    changed[key] = value
+            if changed:
+                self._write_metadata(uuid, {**current_meta, **changed})
+                self._invalidate_metadata(uuid)
+
+        # 正文: 整篇替换或应用补丁, 内容不变时不重写文件
+        if "content" in data or content_patch is not None:
+            current_content = self._read_content(uuid)
+            if content_patch is not None:
+                content = apply_patch(current_content, content_patch, base_hash)
+            else:
+                content = data["content"]
+            if content != current_content:
+                self._write_content(uuid, content)
+                changed["content"] = content
+                # 增量更新资产引用, 未使用的资产文件由后台任务延迟清理
+                self._sync_asset_refs(uuid, content)
+
+        if "is_public" in data and data["is_public"] != blog.is_public:
             blog.is_public = data["is_public"]
-
+        elif changed:
+            # 仅文件变化时数据库行没有变更, 手动刷新更新时间
+            blog.updated_at = datetime.now()
         db.session.commit()
 
-        # 更新文件 (合并现有内容)
-        current_data = self._read_files(uuid)
+        if changed:
+            self.search_index.update(blog.id, changed)
+            if "tags" in changed:
+                self.tag_index.set(blog.id, changed["tags"])
+
+        return self._merge_blog_data(blog, show_content=show_content)
+
+    def _get_draft_path(self, uuid: str) -> Path:
+        return self._get_blog_dir(uuid) / ".draft.json"
+
+    def get_draft(self, uuid: str) -> Optional[Dict[str, Any]]:
+        """
+        读取草稿槽.
+        :return: {"content": str, "revision": int, "saved_at": str}, 没有草稿时返回 None
+        """
+        draft_path = self._get_draft_path(uuid)
+        try:
+            with draft_path.open("r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            logger.warning(f"博客 {uuid} 草稿文件损坏")
+            return None
 
-        # 更新元数据/内容字段
-        for key in [
-            "title",
-            "summary",
-            "tags",
-            "cover_image",
-            "author_name",
-            "content",
-        ]:
-            if key in data:
-                current_data[key] = data[key]
+    def save_draft(self, uuid: str, content: str, revision: int) -> Dict[str, Any]:
+        """
+        覆盖写入草稿槽, 不涉及数据库, 渲染缓存与索引.
+        内容未变化时不重写文件; revision 不大于已保存版本且内容不同时 (乱序到达的旧请求,
+        或另一个编辑器已保存了更新的版本) 抛出 DraftConflict.
+        :return: 当前生效的草稿信息 (不含正文)
+        """
+        current = self.get_draft(uuid)
+        if current:
+            info = {"revision": current["revision"], "saved_at": current["saved_at"]}
+            if content == current["content"]:
+                return info
+            if revision <= current["revision"]:
+                raise DraftConflict(info)
 
-        self._save_files(uuid, current_data)
+        self._ensure_blog_dir(uuid)
+        draft = {
+            "content": content,
+            "revision": revision,
+            "saved_at": datetime.now().isoformat(),
+        }
+        # 先写临时文件再原子替换, 避免读到写了一半的草稿
+        draft_path = self._get_draft_path(uuid)
+        tmp_path = draft_path.with_name(f"{draft_path.name}.{os.getpid()}.tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(draft, f, ensure_ascii=False)
+        os.replace(tmp_path, draft_path)
+
+        return {"revision": revision, "saved_at": draft["saved_at"]}
+
+    def delete_draft(self, uuid: str) -> bool:
+        try:
+            self._get_draft_path(uuid).unlink()
+            return True
+        except FileNotFoundError:
+            return False
 
-        # 删除未使用的资产文件
-        self._clean_unused_assets(uuid)
+    def publish_draft(self, uuid: str) -> Optional[Dict[str, Any]]:
+        """
+        将草稿发布为正文 (走 update 的增量写入流程), 成功后删除草稿.
+        :return: 更新后的博客数据, 没有草稿时返回 None
+        """
+        draft = self.get_draft(uuid)
+        if draft is None:
+            return None
 
-        return self._merge_blog_data(blog)
+        blog = self.update(uuid, {"content": draft["content"]})
+        # 发布期间又有新的自动保存时保留草稿
+        current = self.get_draft(uuid)
+        if blog is not None and current and current["revision"] == draft["revision"]:
+            self.delete_draft(uuid)
+        return blog
 
     def delete(self, uuid: str) -> bool:
         stmt = select(self.model).filter_by(uuid=uuid)
@@ -205,8 +600,13 @@ class BlogRepository:
         if not blog:
             return False
 
+        blog_id = blog.id
         db.session.delete(blog)
+        db.session.execute(delete(BlogAsset).where(BlogAsset.blog_uuid == uuid))
         db.session.commit()
+        self._invalidate_metadata(uuid)
+        self.search_index.delete(blog_id)
+        self.tag_index.delete(blog_id)
 
         # 删除博客目录
         blog_dir = self._get_blog_dir(uuid)
@@ -215,12 +615,11 @@ class BlogRepository:
 
         return True
 
+    def add_counts(self, column: str, deltas: Dict[str, int]):
+        add_counts(self.model, column, deltas)
+
     def increment_views(self, uuid: str):
-        stmt = select(self.model).filter_by(uuid=uuid)
-        blog = db.session.scalars(stmt).first()
-        if blog:
-            blog.views += 1
-            db.session.commit()
+        self.add_counts("views", {uuid: 1})
 
     """
     def update_likes(self, uuid: str, increment: bool = True):
@@ -4,18 +4,87 @@
 # @description: 导航数据仓库, 封装 Navigation 模型的所有数据库操作
 # ------------------------------------------------------------
 
+from datetime import datetime, timedelta
+import hashlib
+import heapq
 import json
-from typing import List, Optional
+from operator import itemgetter
+import os
+from pathlib import Path
+import re
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+from uuid import uuid4
 
-from sqlalchemy import distinct, or_, select
+from sqlalchemy import bindparam, insert, or_, select, update
 
 from backend.config import Config
+from backend.core.Generation import GenerationCounter
 from backend.core.Logger import get_logger
 from backend.data.database import db
 from backend.data.models.navigation import Navigation
+from backend.data.pagination import keyset_paginate
+from backend.data.typeahead_index import DEFAULT_SUGGEST_LIMIT, TypeaheadIndex
 
 logger = get_logger("Repo_Navigation")
 
+# 批量导入时可写入的字段及新建时的默认值
+IMPORT_FIELDS = {
+    "title": None,
+    "url": None,
+    "icon": "fas:link",
+    "description": "",
+    "category": "default",
+    "is_public": True,
+    "order": 0,
+}
+
+# 单条 IN 查询的最大参数数, 低于 SQLite 的变量数上限
+_IN_CHUNK = 500
+
+# 链接检查结果列, 只能由后台任务写入
+CRAWL_FIELDS = ("status_code", "latency_ms", "checked_at", "favicon")
+
+# 图标按内容寻址: <sha256 前 32 位>.<扩展名>
+_FAVICON_NAME = re.compile(r"[0-9a-f]{32}\.(png|ico|gif|jpg|webp|svg)")
+
+
+def _sort_key(nav: Navigation) -> Tuple[int, float]:
+    """与 get_all 的排序一致: order 降序, created_at 降序"""
+    created = nav.created_at.timestamp() if nav.created_at else 0
+    return -(nav.order or 0), -created
+
+
+def _suggestion(nav: Navigation) -> dict:
+    """输入联想结果只包含展示所需的字段"""
+    return {
+        "uuid": nav.uuid,
+        "title": nav.title,
+        "url": nav.url,
+        "icon": nav.icon,
+        "category": nav.category,
+        "description": nav.description,
+    }
+
+
+def _serialize(nav: Navigation) -> bytes:
+    return json.dumps(nav.to_dict(), ensure_ascii=False, separators=(",", ":")).encode(
+        "utf-8"
+    )
+
+
+class _PublicSnapshot:
+    """公开导航的预序列化快照: 每一项的排序键与 JSON 片段, 以及拼接好的完整数组"""
+
+    __slots__ = ("generation", "keys", "fragments", "body", "etag")
+
+    def __init__(self, generation: int, navs: List[Navigation]):
+        self.generation = generation
+        self.keys = [_sort_key(nav) for nav in navs]
+        self.fragments = [_serialize(nav) for nav in navs]
+        self.body = b"[" + b",".join(self.fragments) + b"]"
+        self.etag = hashlib.sha1(self.body).hexdigest()
+
 
 class NavigationRepository:
     """
@@ -24,42 +93,172 @@ class NavigationRepository:
 
     def __init__(self):
         self.model = Navigation
+        # 进程内分类缓存, 分类集合变化时由写入方递增共享代数, 其他 worker 据此重新加载
+        self._categories: Optional[List[str]] = None
+        self._categories_generation = -1
+        self._categories_counter = GenerationCounter(
+            Config.CACHE_DIR / "generations" / "navigation_categories"
+        )
+        # 公开导航快照, 任何导航写入都会递增该代数
+        self._snapshot: Optional[_PublicSnapshot] = None
+        self._snapshot_counter = GenerationCounter(
+            Config.CACHE_DIR / "generations" / "navigations"
+        )
+        # 输入联想索引与快照共用代数, 代数变化后与数据库比对版本做增量更新
+        self._typeahead = TypeaheadIndex(
+            ("title", "url", "category", "description"), _suggestion
+        )
+        self._typeahead_generation = -1
 
-    def _sync_categories(self):
-        """同步分类到 JSON 文件"""
-        try:
-            # 获取所有非空分类
-            stmt = select(distinct(self.model.category)).where(
-                self.model.category.is_not(None)
-            )
-            categories = list(db.session.scalars(stmt).all())
-            # 过滤掉可能的空字符串
-            categories = [c for c in categories if c]
+    def _load_categories(self) -> List[str]:
+        """从数据库查询所有非空分类"""
+        stmt = (
+            select(self.model.category)
+            .where(self.model.category.is_not(None))
+            .distinct()
+        )
+        # 过滤掉可能的空字符串
+        return [c for c in db.session.scalars(stmt).all() if c]
 
-            file_path = Config.NAVIGATIONS_DIR / "categories.json"
+    def get_categories(self) -> List[str]:
+        """获取所有分类, 代数未变化时直接返回进程内缓存"""
+        generation = self._categories_counter.value
+        if self._categories is None or generation != self._categories_generation:
+            # 先读代数再查询: 查询期间发生的变更会递增代数, 下次读取时重新加载
+            self._categories = self._load_categories()
+            self._categories_generation = generation
+        return self._categories
 
-            # 写入文件
-            with file_path.open("w", encoding="utf-8") as f:
-                json.dump(categories, f, ensure_ascii=False, indent=2)
+    def _category_in_use(self, category: Optional[str]) -> bool:
+        stmt = select(self.model.id).filter_by(category=category).limit(1)
+        return db.session.scalars(stmt).first() is not None
+
+    def _sync_categories(self, added=None, removed=None):
+        """
+        在写入后同步分类缓存, 只有分类集合确实变化时才递增共享代数.
+        :param added: 写入后出现的分类
+        :param removed: 写入后可能不再被使用的分类
+        不传参数时重新查询分类集合并与缓存比较 (如批量导入后)
+        """
+        try:
+            if added is None and removed is None:
+                # 批量写入 (如播种, 导入) 后快照同样需要重建, 分类集合则与数据库比较
+                self._invalidate_snapshot()
+                if set(self._load_categories()) == set(self.get_categories()):
+                    return
+            else:
+                categories = self.get_categories()
+                changed = (added and added not in categories) or (
+                    removed
+                    and removed != added
+                    and removed in categories
+                    and not self._category_in_use(removed)
+                )
+                if not changed:
+                    return
 
-            logger.info(f"已同步分类: {categories}")
+            # 先递增代数再加载, 与 get_categories 相同, 保证不会记下比数据更新的代数
+            generation = self._categories_counter.bump()
+            self._categories = self._load_categories()
+            self._categories_generation = generation
+            logger.info(f"已同步分类: {self._categories}")
         except Exception as e:
             # 记录错误但不中断流程
-            logger.error(f"同步分类到 JSON 文件时出错: {e}")
+            logger.error(f"同步分类时出错: {e}")
+            self._categories = None
+
+    def _invalidate_snapshot(self):
+        """写入提交后调用, 通知所有 worker 重建公开导航快照"""
+        try:
+            self._snapshot_counter.bump()
+        except Exception as e:
+            logger.error(f"递增导航快照代数时出错: {e}")
+            self._snapshot = None
+
+    def _get_snapshot(self) -> _PublicSnapshot:
+        generation = self._snapshot_counter.value
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.generation != generation:
+            # 先读代数再查询, 查询期间的写入会在下次读取时触发重建
+            stmt = self._visible_stmt().order_by(
+                self.model.order.desc(), self.model.created_at.desc()
+            )
+            snapshot = _PublicSnapshot(generation, db.session.scalars(stmt).all())
+            self._snapshot = snapshot
+        return snapshot
+
+    def get_visible_json(self, user_uuid: str = None) -> Tuple[bytes, Optional[str]]:
+        """
+        获取可见导航列表的 JSON 数组, 结果与 get_all(user_uuid) 相同.
+        游客直接返回公开快照; 登录用户只额外查询自己的私有导航, 按排序键合并到快照中,
+        公开导航不重新序列化.
+        :return: (JSON 字节串, ETag), 只有公开快照带 ETag
+        """
+        snapshot = self._get_snapshot()
+        if not user_uuid:
+            return snapshot.body, snapshot.etag
+
+        stmt = (
+            select(self.model)
+            .where(
+                self.model.owner_uuid == user_uuid,
+                # is_public 为 NULL 的导航不在公开快照中, 同样视为私有
+                or_(self.model.is_public.is_(False), self.model.is_public.is_(None)),
+            )
+            .order_by(self.model.order.desc(), self.model.created_at.desc())
+        )
+        private = db.session.scalars(stmt).all()
+        if not private:
+            return snapshot.body, snapshot.etag
+
+        merged = heapq.merge(
+            zip(snapshot.keys, snapshot.fragments),
+            ((_sort_key(nav), _serialize(nav)) for nav in private),
+            key=itemgetter(0),
+        )
+        return b"[" + b",".join(fragment for _, fragment in merged) + b"]", None
+
+    def _sync_typeahead(self):
+        generation = self._snapshot_counter.value
+        if generation == self._typeahead_generation:
+            return
+
+        def load(ids: List[int]) -> List[Navigation]:
+            navs = []
+            for i in range(0, len(ids), _IN_CHUNK):
+                stmt = select(self.model).where(
+                    self.model.id.in_(ids[i : i + _IN_CHUNK])
+                )
+                navs.extend(db.session.scalars(stmt))
+            return navs
+
+        # 先读代数再比对, 比对期间的写入会在下次检索时再次同步
+        stmt = select(self.model.id, self.model.updated_at, self.model.order)
+        versions = {row[0]: (row[1], row[2]) for row in db.session.execute(stmt)}
+        updated, removed = self._typeahead.sync(versions, load)
+        self._typeahead_generation = generation
+        logger.debug(f"输入联想索引已同步: 更新 {updated} 项, 删除 {removed} 项")
+
+    def suggest(
+        self,
+        query: str,
+        user_uuid: str = None,
+        view_all: bool = False,
+        limit: int = DEFAULT_SUGGEST_LIMIT,
+    ) -> List[dict]:
+        """
+        输入联想: 按标题, 链接, 分类, 描述匹配检索词, 返回前 limit 项.
+        检索只访问进程内索引, 导航写入后的首次检索会先增量同步索引.
+        """
+        self._sync_typeahead()
+        return self._typeahead.search(query, user_uuid, view_all, limit)
 
     def get_by_uuid(self, uuid: str) -> Optional[Navigation]:
         """根据 UUID 获取导航项"""
         stmt = select(self.model).filter_by(uuid=uuid)
         return db.session.scalars(stmt).first()
 
-    def get_all(
-        self, user_uuid: str = None, view_all: bool = False
-    ) -> List[Navigation]:
-        """
-        获取导航列表.
-        :param user_uuid: 当前用户 UUID
-        :param view_all: 是否查看所有数据 (仅限管理员明确请求时)
-        """
+    def _visible_stmt(self, user_uuid: str = None, view_all: bool = False):
         stmt = select(self.model)
 
         if view_all:
@@ -74,15 +273,46 @@ class NavigationRepository:
             # 游客: 仅公开
             stmt = stmt.filter_by(is_public=True)
 
+        return stmt
+
+    def get_all(
+        self, user_uuid: str = None, view_all: bool = False
+    ) -> List[Navigation]:
+        """
+        获取导航列表.
+        :param user_uuid: 当前用户 UUID
+        :param view_all: 是否查看所有数据 (仅限管理员明确请求时)
+        """
+        stmt = self._visible_stmt(user_uuid, view_all)
         stmt = stmt.order_by(self.model.order.desc(), self.model.created_at.desc())
         return list(db.session.scalars(stmt).all())
 
+    def get_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        user_uuid: str = None,
+        view_all: bool = False,
+    ) -> Tuple[List[Navigation], Optional[str]]:
+        """
+        按 order/created_at 键集分页获取导航列表.
+        :return: (当前页, 下一页游标)
+        """
+        return keyset_paginate(
+            self._visible_stmt(user_uuid, view_all),
+            [self.model.order, self.model.created_at, self.model.id],
+            limit,
+            cursor,
+        )
+
     def add(self, data: dict) -> Navigation:
         """添加新的导航项"""
+        data = {k: v for k, v in data.items() if k not in CRAWL_FIELDS}
         nav = self.model(**data)
         db.session.add(nav)
         db.session.commit()
-        self._sync_categories()
+        self._invalidate_snapshot()
+        self._sync_categories(added=nav.category)
         return nav
 
     def update(self, uuid: str, data: dict) -> Optional[Navigation]:
@@ -91,12 +321,19 @@ class NavigationRepository:
         if not nav:
             return None
 
+        old_category = nav.category
+        old_target = (nav.url, nav.icon)
         for key, value in data.items():
-            if hasattr(nav, key):
+            if hasattr(nav, key) and key not in CRAWL_FIELDS:
                 setattr(nav, key, value)
+        if (nav.url, nav.icon) != old_target:
+            # 链接或图标变化后尽快重新检查
+            nav.checked_at = None
 
         db.session.commit()
-        self._sync_categories()
+        self._invalidate_snapshot()
+        if nav.category != old_category:
+            self._sync_categories(added=nav.category, removed=old_category)
         return nav
 
     def delete(self, uuid: str) -> bool:
@@ -105,7 +342,206 @@ class NavigationRepository:
         if not nav:
             return False
 
+        category = nav.category
         db.session.delete(nav)
         db.session.commit()
-        self._sync_categories()
+        self._invalidate_snapshot()
+        self._sync_categories(removed=category)
         return True
+
+    def iter_visible(
+        self, user_uuid: str = None, view_all: bool = False
+    ) -> Iterator[Navigation]:
+        """按 get_all 的顺序逐批读取可见导航, 用于流式导出"""
+        stmt = self._visible_stmt(user_uuid, view_all)
+        stmt = stmt.order_by(self.model.order.desc(), self.model.created_at.desc())
+        yield from db.session.scalars(stmt.execution_options(yield_per=500))
+
+    def get_owners(self, uuids: List[str]) -> Dict[str, Optional[str]]:
+        """批量查询导航项的所有者: {uuid: owner_uuid}, 不存在的 uuid 不出现在结果中"""
+        owners = {}
+        for i in range(0, len(uuids), _IN_CHUNK):
+            stmt = select(self.model.uuid, self.model.owner_uuid).where(
+                self.model.uuid.in_(uuids[i : i + _IN_CHUNK])
+            )
+            owners.update(db.session.execute(stmt).tuples().all())
+        return owners
+
+    def bulk_upsert(
+        self, items: List[dict], owner_uuid: Optional[str] = None
+    ) -> Dict[str, int]:
+        """
+        批量导入导航项: 在同一所有者范围内按 URL 更新已存在的项, 其余新建.
+        插入与更新各以一次 executemany 在同一事务中执行, 结束后只同步一次分类与快照.
+        :param items: 已校验的导航项, 必须包含 title 与 url, 只写入 IMPORT_FIELDS 中的字段
+        :param owner_uuid: 所有者, None 为系统/公共导航
+        :return: {"created": int, "updated": int}
+        """
+        # 同一 URL 出现多次时以最后一项为准
+        by_url = {item["url"]: item for item in items}
+        urls = list(by_url)
+
+        owner_clause = (
+            self.model.owner_uuid.is_(None)
+            if owner_uuid is None
+            else self.model.owner_uuid == owner_uuid
+        )
+        existing: Dict[str, int] = {}
+        for i in range(0, len(urls), _IN_CHUNK):
+            stmt = (
+                select(self.model.url, self.model.id)
+                .where(owner_clause, self.model.url.in_(urls[i : i + _IN_CHUNK]))
+                .order_by(self.model.id)
+            )
+            for url, nav_id in db.session.execute(stmt):
+                # 已有重复 URL 时只更新最早的一项
+                existing.setdefault(url, nav_id)
+
+        now = datetime.now()
+        inserts, updates = [], []
+        for url, item in by_url.items():
+            fields = {key: item[key] for key in IMPORT_FIELDS if key in item}
+            if url in existing:
+                updates.append({"id": existing[url], **fields, "updated_at": now})
+            else:
+                row = {
+                    key: item.get(key, default)
+                    for key, default in IMPORT_FIELDS.items()
+                }
+                row.update(
+                    uuid=str(uuid4()),
+                    owner_uuid=owner_uuid,
+                    created_at=now,
+                    updated_at=now,
+                )
+                inserts.append(row)
+
+        try:
+            if inserts:
+                db.session.execute(insert(self.model), inserts)
+            if updates:
+                db.session.execute(update(self.model), updates)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        self._sync_categories()
+        return {"created": len(inserts), "updated": len(updates)}
+
+    def reorder(self, orders: Dict[str, int]):
+        """
+        批量修改排序值, 一次 executemany 完成.
+        排序变化不视为内容更新, 显式保留 updated_at; 分类不变, 只需重建快照.
+        :param orders: {uuid: order}
+        """
+        if not orders:
+            return
+        table = self.model.__table__
+        stmt = (
+            update(table)
+            .where(table.c.uuid == bindparam("b_uuid"))
+            .values(order=bindparam("b_order"), updated_at=table.c.updated_at)
+        )
+        try:
+            db.session.execute(
+                stmt, [{"b_uuid": u, "b_order": o} for u, o in orders.items()]
+            )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        self._invalidate_snapshot()
+
+    def get_crawl_targets(
+        self, limit: int, max_age: float
+    ) -> List[Tuple[int, str, Optional[str], Optional[str]]]:
+        """
+        取出从未检查或检查结果已过期的导航, 最久未检查的在前.
+        :return: [(id, url, icon, favicon)]
+        """
+        stale_before = datetime.now() - timedelta(seconds=max_age)
+        stmt = (
+            select(self.model.id, self.model.url, self.model.icon, self.model.favicon)
+            .where(
+                or_(
+                    self.model.checked_at.is_(None),
+                    self.model.checked_at < stale_before,
+                )
+            )
+            .order_by(self.model.checked_at.asc().nulls_first(), self.model.id)
+            .limit(limit)
+        )
+        return db.session.execute(stmt).tuples().all()
+
+    def record_checks(self, rows: List[dict]):
+        """
+        批量写入链接检查结果, 一次 executemany 完成, 不改变 updated_at.
+        只写入检查期间 url 与 icon 未被修改的项, 被修改的项保持待检查状态.
+        :param rows: [{"id", "url", "icon", "status_code", "latency_ms", "favicon"}]
+        """
+        if not rows:
+            return
+        now = datetime.now()
+        table = self.model.__table__
+        stmt = (
+            update(table)
+            .where(
+                table.c.id == bindparam("b_id"),
+                table.c.url == bindparam("b_url"),
+                table.c.icon.is_not_distinct_from(bindparam("b_icon")),
+            )
+            .values(
+                status_code=bindparam("b_status_code"),
+                latency_ms=bindparam("b_latency_ms"),
+                favicon=bindparam("b_favicon"),
+                checked_at=now,
+                updated_at=table.c.updated_at,
+            )
+        )
+        try:
+            db.session.execute(
+                stmt,
+                [{f"b_{key}": value for key, value in row.items()} for row in rows],
+            )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        self._invalidate_snapshot()
+
+    def save_favicon(self, data: bytes, ext: str) -> str:
+        """按内容寻址保存图标, 返回文件名; 相同内容只保存一份"""
+        name = f"{hashlib.sha256(data).hexdigest()[:32]}.{ext}"
+        path = Config.FAVICON_CACHE_DIR / name
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f".{name}.{os.getpid()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        return name
+
+    def get_favicon_path(self, name: str) -> Optional[Path]:
+        if not _FAVICON_NAME.fullmatch(name):
+            return None
+        path = Config.FAVICON_CACHE_DIR / name
+        return path if path.is_file() else None
+
+    def sweep_favicons(self, grace: float = 86400) -> int:
+        """
+        删除不再被任何导航引用的图标.
+        客户端可能仍缓存着旧的图标地址, 因此只删除超过宽限期的文件.
+        """
+        stmt = select(self.model.favicon).where(self.model.favicon.is_not(None))
+        referenced = set(db.session.scalars(stmt))
+        deadline = time.time() - grace
+        removed = 0
+        for path in Config.FAVICON_CACHE_DIR.glob("*.*"):
+            if (
+                _FAVICON_NAME.fullmatch(path.name)
+                and path.name not in referenced
+                and path.stat().st_mtime < deadline
+            ):
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
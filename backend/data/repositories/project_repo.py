@@ -4,114 +4,195 @@
 # @description: 导航数据仓库, 封装 Navigation 模型的所有数据库操作
 # ------------------------------------------------------------
 
-import json
+from collections import OrderedDict
+from datetime import datetime
 import os
 from pathlib import Path
 import shutil
-from typing import Any, Dict, List, Optional
+import tempfile
+import threading
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
 from sqlalchemy import or_, select
 
 from backend.config import Config
+from backend.core.Archive import (
+    ARCHIVE_FORMATS,
+    ArchiveError,
+    extract_archive,
+    iter_files,
+    stream_archive,
+    tee_to_file,
+    tree_hash,
+)
+from backend.core.FileViewer import (
+    MAX_VIEW_BYTES,
+    SNIFF_SIZE,
+    is_binary,
+    looks_binary,
+    read_buffer_lines,
+    read_file_lines,
+    read_lines,
+)
+from backend.core.GitStore import (
+    MAX_CACHED_OBJECT,
+    BlobStream,
+    GitRepository,
+    get_repository,
+    is_git_repo,
+)
 from backend.core.Logger import get_logger
+from backend.core.Markdown import (
+    RENDER_CACHE_SUFFIX,
+    get_rendered,
+    write_render_cache,
+)
+from backend.data.counters import add_counts
 from backend.data.database import db
 from backend.data.models.project import Project
+from backend.data.pagination import keyset_paginate
+from backend.data.permissions import get_permission
+from backend.data.search_index import SearchIndex
+from backend.data.tag_index import TagIndex
 
 logger = get_logger("Repo_Project")
 
 
+# 目录列表缓存的最大目录数
+DIR_CACHE_SIZE = 4096
+
+# 单次请求返回的目录树最多包含的条目数, 超出后不再展开更深的目录
+MAX_TREE_ENTRIES = 10000
+
+# README 文件名, 按优先级排列
+README_NAMES = (
+    "README.md",
+    "readme.md",
+    "Readme.md",
+    "README.markdown",
+    "readme.markdown",
+    "Readme.markdown",
+)
+
+
+class _ProjectManifest:
+    """
+    项目目录清单, 记录 README 的文件名.
+    以目录 mtime 校验: 文件的增删改名都会改变目录 mtime, 此时重新扫描
+    """
+
+    __slots__ = ("dir_mtime_ns", "readme")
+
+    def __init__(self, dir_mtime_ns: int, readme: Optional[str] = None):
+        self.dir_mtime_ns = dir_mtime_ns
+        self.readme = readme
+
+    @classmethod
+    def scan(cls, project_dir: Path, dir_mtime_ns: int) -> "_ProjectManifest":
+        """扫描一次目录, 代替逐个 exists() 探测 README 文件名"""
+        with os.scandir(project_dir) as it:
+            names = {entry.name for entry in it if entry.is_file()}
+
+        for name in README_NAMES:
+            if name in names:
+                return cls(dir_mtime_ns, name)
+        return cls(dir_mtime_ns)
+
+
 class ProjectRepository:
     def __init__(self):
         self.model = Project
+        # 进程内目录清单 (每个 worker 各自持有): uuid -> _ProjectManifest
+        self._manifests: Dict[str, _ProjectManifest] = {}
+        # 目录列表缓存 (LRU): 目录绝对路径 -> (mtime_ns, [(名称, 是否目录)])
+        self._dir_cache: OrderedDict = OrderedDict()
+        self._dir_cache_lock = threading.Lock()
+        self.search_index = SearchIndex(
+            "projects", Project, ("title", "description", "tags", "readme")
+        )
+        self.tag_index = TagIndex("projects", Project)
 
     def _get_project_dir(self, uuid: str) -> Path:
         return Config.PROJECTS_DIR / uuid
 
+    def _normalize_tags(self, tags) -> List[str]:
+        if isinstance(tags, str):
+            return [t.strip() for t in tags.split(",") if t.strip()]
+        return list(tags or [])
+
     def _save_files(self, uuid: str, data: dict):
-        """将项目元数据和README内容保存到项目目录"""
+        """将项目README内容保存到项目目录 (元数据已存放在数据库中)"""
         project_dir = self._get_project_dir(uuid)
         project_dir.mkdir(parents=True, exist_ok=True)
 
-        # 元数据
-        metadata = {
-            "title": data.get("title", "Untitled Project"),
-            "description": data.get("description", ""),
-            "tags": data.get("tags", []),
-            "url": data.get("url", ""),
-            "icon": data.get("icon", ""),
-        }
-
-        if isinstance(metadata["tags"], str):
-            metadata["tags"] = [
-                t.strip() for t in metadata["tags"].split(",") if t.strip()
-            ]
-
-        with (project_dir / "metadata.json").open("w", encoding="utf-8") as f:
-            json.dump(metadata, f, ensure_ascii=False, indent=2)
-
         # README
         if "readme" in data:
             with (project_dir / "README.md").open("w", encoding="utf-8") as f:
                 f.write(data["readme"])
-
-    def _read_files(self, uuid: str) -> Dict[str, Any]:
-        """从项目目录读取元数据和README文件内容"""
-        possible_readme_files = [
-            "README.md",
-            "readme.md",
-            "Readme.md",
-            "README.markdown",
-            "readme.markdown",
-            "Readme.markdown",
-        ]
+            write_render_cache(project_dir / "README.md", data["readme"])
+            self._invalidate_manifest(uuid)
+
+    def _get_manifest(self, uuid: str) -> Optional[_ProjectManifest]:
+        """
+        获取项目目录清单, 目录 mtime 未变化时直接复用 (只需一次 stat),
+        否则扫描一次目录重建.
+        """
         project_dir = self._get_project_dir(uuid)
-        metadata_path = project_dir / "metadata.json"
-        readme_path = None
-        for readme_file in possible_readme_files:
-            if (project_dir / readme_file).exists():
-                readme_path = project_dir / readme_file
-                break
-
-        result = {
-            "title": "Untitled Project",
-            "description": "",
-            "tags": [],
-            "url": "",
-            "icon": "",
-            "readme": "",
-        }
+        try:
+            dir_stat = project_dir.stat()
+        except OSError:
+            self._manifests.pop(uuid, None)
+            return None
 
-        if metadata_path.exists():
-            try:
-                with metadata_path.open("r", encoding="utf-8") as f:
-                    metadata = json.load(f)
-                    result.update(metadata)
-            except Exception:
-                logger.warning(f"项目 {uuid} 元数据文件损坏")
-                pass
-
-        if readme_path.exists():
-            try:
-                with readme_path.open("r", encoding="utf-8") as f:
-                    result["readme"] = f.read()
-            except Exception:
-                logger.warning(f"项目 {uuid} README 文件损坏")
-                pass
+        manifest = self._manifests.get(uuid)
+        if manifest is None or manifest.dir_mtime_ns != dir_stat.st_mtime_ns:
+            manifest = _ProjectManifest.scan(project_dir, dir_stat.st_mtime_ns)
+            self._manifests[uuid] = manifest
+        return manifest
+
+    def _invalidate_manifest(self, uuid: str):
+        self._manifests.pop(uuid, None)
 
-        return result
+    def _find_readme(self, uuid: str) -> Optional[Path]:
+        """查找项目目录中的README文件"""
+        manifest = self._get_manifest(uuid)
+        if manifest is None or manifest.readme is None:
+            return None
+        return self._get_project_dir(uuid) / manifest.readme
+
+    def _read_readme(self, uuid: str, readme_path: Optional[Path]) -> str:
+        if readme_path is None:
+            return ""
+        try:
+            with readme_path.open("r", encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            # 清单过期 (如 README 在同一时间片内被删除), 下次重新扫描
+            self._invalidate_manifest(uuid)
+        except Exception:
+            logger.warning(f"项目 {uuid} README 文件损坏")
+        return ""
+
+    def _read_files(self, uuid: str) -> Dict[str, Any]:
+        """从项目目录读取README文件内容"""
+        return {"readme": self._read_readme(uuid, self._find_readme(uuid))}
 
     def _merge_project_data(self, proj: Project, show_content: bool = True) -> dict:
         proj_dict = proj.to_dict()
-        file_data = self._read_files(proj.uuid)
-        proj_dict.update(file_data)
-        if not show_content:
-            proj_dict.pop("readme", None)
+        if show_content:
+            # 元数据已在数据库中, 仅详情需要读取 README
+            proj_dict.update(self._read_files(proj.uuid))
         return proj_dict
 
-    def get_all(
-        self, user_uuid: Optional[str] = None, view_all: bool = False
-    ) -> List[Dict[str, Any]]:
+    def _visible_stmt(
+        self,
+        user_uuid: Optional[str] = None,
+        view_all: bool = False,
+        tag: Optional[str] = None,
+    ):
         stmt = select(self.model)
+        if tag:
+            stmt = self.tag_index.filter(stmt, tag)
 
         if not view_all:
             # Public + Own
@@ -124,17 +205,92 @@ class ProjectRepository:
             else:
                 stmt = stmt.filter_by(is_public=True)
 
+        return stmt
+
+    def get_all(
+        self,
+        user_uuid: Optional[str] = None,
+        view_all: bool = False,
+        tag: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        stmt = self._visible_stmt(user_uuid, view_all, tag)
         stmt = stmt.order_by(self.model.order.desc(), self.model.created_at.desc())
         projects = db.session.scalars(stmt).all()
 
         return [self._merge_project_data(p, show_content=False) for p in projects]
 
-    def get_by_uuid(self, uuid: str) -> Optional[Dict[str, Any]]:
+    def get_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        user_uuid: Optional[str] = None,
+        view_all: bool = False,
+        tag: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """按 order/created_at 键集分页获取项目列表, 返回 (当前页, 下一页游标)"""
+        projects, next_cursor = keyset_paginate(
+            self._visible_stmt(user_uuid, view_all, tag),
+            [self.model.order, self.model.created_at, self.model.id],
+            limit,
+            cursor,
+        )
+        return [
+            self._merge_project_data(p, show_content=False) for p in projects
+        ], next_cursor
+
+    def search(
+        self,
+        query: str,
+        user_uuid: Optional[str] = None,
+        view_all: bool = False,
+        limit: int = 20,
+    ) -> List[Dict[str, Any]]:
+        """全文检索项目, 按相关度排序, 每项附带 snippet 高亮片段"""
+        hits = self.search_index.search(query, user_uuid, view_all, limit)
+        if not hits:
+            return []
+
+        stmt = select(self.model).where(self.model.id.in_([h[0] for h in hits]))
+        projects = {p.id: p for p in db.session.scalars(stmt).all()}
+
+        results = []
+        for proj_id, snippet in hits:
+            proj = projects.get(proj_id)
+            if proj:
+                data = self._merge_project_data(proj, show_content=False)
+                data["snippet"] = snippet
+                results.append(data)
+        return results
+
+    def get_tags(
+        self, user_uuid: Optional[str] = None, view_all: bool = False
+    ) -> List[Dict[str, Any]]:
+        """从标签索引统计可见项目的标签数量, 不读取任何文件"""
+        return self.tag_index.counts(user_uuid, view_all)
+
+    def get_permission(self, uuid: str) -> Optional[Dict[str, Any]]:
+        return get_permission(self.model, uuid)
+
+    def get_by_uuid(self, uuid: str, as_html: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        根据 UUID 获取项目详情.
+        :param as_html: 为 True 时以渲染后的 html/toc 代替 README 原文
+        """
         stmt = select(self.model).filter_by(uuid=uuid)
         proj = db.session.scalars(stmt).first()
         if not proj:
             return None
-        return self._merge_project_data(proj)
+
+        data = self._merge_project_data(proj, show_content=False)
+        readme_path = self._find_readme(uuid)
+        readme = self._read_readme(uuid, readme_path)
+        if not as_html:
+            data["readme"] = readme
+        elif readme_path:
+            data.update(get_rendered(readme_path, readme))
+        else:
+            data.update({"html": "", "toc": []})
+        return data
 
     def create(self, data: dict) -> Dict[str, Any]:
         # 提取数据库字段
@@ -143,6 +299,12 @@ class ProjectRepository:
             "is_public": data.get("is_public", True),
             "order": data.get("order", 0),
             "stars": data.get("stars", 0),
+            "title": data.get("title") or "Untitled Project",
+            "description": data.get("description", ""),
+            "tags": self._normalize_tags(data.get("tags", [])),
+            "url": data.get("url", ""),
+            "icon": data.get("icon", ""),
+            "git_repo": data.get("git_repo") or None,
         }
 
         proj = self.model(**db_data)
@@ -151,43 +313,68 @@ class ProjectRepository:
 
         # 保存文件
         self._save_files(proj.uuid, data)
+        self.search_index.index(proj.id, {**db_data, "readme": data.get("readme")})
+        self.tag_index.set(proj.id, db_data["tags"])
 
         return self._merge_project_data(proj)
 
-    def update(self, uuid: str, data: dict) -> Optional[Dict[str, Any]]:
+    def update(
+        self, uuid: str, data: dict, show_content: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """
+        更新项目, 只写入实际发生变化的字段, README 内容不变时不重写文件.
+        :param show_content: 返回值是否包含 README, 为 False 时不读取文件
+        """
         stmt = select(self.model).filter_by(uuid=uuid)
         proj = db.session.scalars(stmt).first()
         if not proj:
             return None
 
         # 更新数据库字段
-        if "is_public" in data:
-            proj.is_public = data["is_public"]
-        if "order" in data:
-            proj.order = data["order"]
-        if "stars" in data:
-            proj.stars = data["stars"]
-
-        db.session.commit()
-
-        # 更新文件
-        current_file_data = self._read_files(uuid)
-
+        changed: Dict[str, Any] = {}
         for key in [
+            "is_public",
+            "order",
+            "stars",
             "title",
             "description",
             "tags",
             "url",
             "icon",
-            "readme",
-            "content",
+            "git_repo",
         ]:
-            if key in data:
-                current_file_data[key] = data[key]
+            if key not in data:
+                continue
+            value = self._normalize_tags(data[key]) if key == "tags" else data[key]
+            if key == "git_repo":
+                value = value or None
+            elif key == "title":
+                # 与 create 一致, 标题不能为空
+                value = value or "Untitled Project"
+            if getattr(proj, key) != value:
+                setattr(proj, key, value)
+                changed[key] = value
 
-        self._save_files(uuid, current_file_data)
+        # 更新文件
+        if "readme" in data:
+            readme_path = self._find_readme(uuid)
+            current = readme_path.read_text(encoding="utf-8") if readme_path else None
+            if data["readme"] != current:
+                self._save_files(uuid, {"readme": data["readme"]})
+                changed["readme"] = data["readme"]
 
-        return self._merge_project_data(proj)
+        if set(changed) == {"readme"}:
+            # 仅 README 变化时数据库行没有变更, 手动刷新更新时间
+            proj.updated_at = datetime.now()
+
+        db.session.commit()
+
+        if changed:
+            self.search_index.update(proj.id, changed)
+            if "tags" in changed:
+                self.tag_index.set(proj.id, proj.tags)
+
+        return self._merge_project_data(proj, show_content=show_content)
 
     def delete(self, uuid: str) -> bool:
         stmt = select(self.model).filter_by(uuid=uuid)
@@ -195,33 +382,168 @@ class ProjectRepository:
         if not proj:
             return False
 
+        proj_id = proj.id
         db.session.delete(proj)
         db.session.commit()
+        self.search_index.delete(proj_id)
+        self.tag_index.delete(proj_id)
 
         # 删除项目目录
         project_dir = self._get_project_dir(uuid)
         if project_dir.exists():
             shutil.rmtree(project_dir)
+        self._invalidate_manifest(uuid)
+        self._clear_archives(uuid)
 
         return True
 
+    def add_counts(self, column: str, deltas: Dict[str, int]):
+        add_counts(self.model, column, deltas)
+
     def increment_views(self, uuid: str):
-        stmt = select(self.model).filter_by(uuid=uuid)
-        proj = db.session.scalars(stmt).first()
-        if proj:
-            proj.views += 1
-            db.session.commit()
+        self.add_counts("views", {uuid: 1})
 
     def update_stars(self, uuid: str, increment: bool = True):
-        stmt = select(self.model).filter_by(uuid=uuid)
-        proj = db.session.scalars(stmt).first()
-        if proj:
-            proj.stars += 1 if increment else -1
-            db.session.commit()
-
-    def get_file_tree(self, uuid: str, path: str = "") -> List[Dict[str, Any]]:
-        project_root = self._get_project_dir(uuid)
+        self.add_counts("stars", {uuid: 1 if increment else -1})
+
+    def _list_dir(self, dir_path: Path) -> List[Tuple[str, bool, int]]:
+        """
+        列出目录内容 [(名称, 是否目录, 大小)].
+        目录内增删改名会改变其 mtime, 因此名称与类型按目录 mtime 缓存;
+        文件原地改写不会改变目录 mtime, 大小每次重新读取, 不进入缓存.
+        """
+        key = str(dir_path)
+        mtime_ns = dir_path.stat().st_mtime_ns
+        with self._dir_cache_lock:
+            cached = self._dir_cache.get(key)
+            if cached and cached[0] == mtime_ns:
+                self._dir_cache.move_to_end(key)
+                names = cached[1]
+            else:
+                names = None
+
+        if names is None:
+            names = []
+            with os.scandir(dir_path) as it:
+                for entry in it:
+                    # 隐藏 Markdown 渲染缓存文件
+                    if entry.name.endswith(RENDER_CACHE_SUFFIX):
+                        continue
+                    # 不跟随符号链接, 避免递归时跳出项目目录或形成环
+                    names.append((entry.name, entry.is_dir(follow_symlinks=False)))
+            names.sort(key=lambda e: (not e[1], e[0]))
+
+            with self._dir_cache_lock:
+                self._dir_cache[key] = (mtime_ns, names)
+                self._dir_cache.move_to_end(key)
+                while len(self._dir_cache) > DIR_CACHE_SIZE:
+                    self._dir_cache.popitem(last=False)
+
+        entries = []
+        for name, is_dir in names:
+            size = 0
+            if not is_dir:
+                try:
+                    size = os.stat(dir_path / name, follow_symlinks=False).st_size
+                except FileNotFoundError:
+                    # 列出之后被删除的文件
+                    continue
+            entries.append((name, is_dir, size))
+        return entries
+
+    def resolve_git_repo(self, git_repo: str) -> Path:
+        """
+        解析项目关联的 git 仓库路径.
+        只允许 Config.GIT_REPOS_DIR 下的仓库, 越界或不是 git 仓库时抛出 ValueError
+        """
+        repos_root = Config.GIT_REPOS_DIR.resolve()
+        repo_path = (repos_root / git_repo.lstrip("/\\")).resolve()
+        try:
+            repo_path.relative_to(repos_root)
+        except ValueError:
+            raise ValueError(f"git repository outside GIT_REPOS_DIR: {git_repo}")
+        if not is_git_repo(repo_path):
+            raise ValueError(f"not a git repository: {git_repo}")
+        return repo_path
+
+    def get_git_repo_name(self, uuid: str) -> Optional[str]:
+        """项目关联的 git 仓库 (GIT_REPOS_DIR 下的相对路径), 未关联时返回 None"""
+        stmt = select(self.model.git_repo).filter_by(uuid=uuid)
+        return db.session.scalars(stmt).first() or None
+
+    def _get_git_repo(self, uuid: str) -> Optional[GitRepository]:
+        """获取项目关联的 git 仓库, 未关联时返回 None"""
+        git_repo = self.get_git_repo_name(uuid)
+        if not git_repo:
+            return None
+        return get_repository(self.resolve_git_repo(git_repo))
+
+    def _build_tree(
+        self,
+        root,
+        rel_root: str,
+        depth: int,
+        list_entries: Callable[[Any], List[Tuple[str, bool, int]]],
+        child: Callable[[Any, str], Any],
+    ) -> List[Dict[str, Any]]:
+        """
+        按层展开目录树, 项目目录与 git 树共用.
+        :param root: 起始目录节点 (Path 或 GitTreeCursor)
+        :param list_entries: 列出节点内容 [(名称, 是否目录, 大小)]
+        :param child: 获取子目录节点, 返回 None 时该目录不展开 (如 git 子模块)
+        """
+        budget = [MAX_TREE_ENTRIES]
+
+        def walk(node, rel: str, level: int) -> List[Dict[str, Any]]:
+            entries = list_entries(node)
+            budget[0] -= len(entries)
+            files = []
+            for name, is_dir, size in entries:
+                item = {
+                    "name": name,
+                    "type": "directory" if is_dir else "file",
+                    "size": size,
+                    "path": f"{rel}/{name}" if rel else name,
+                }
+                files.append(item)
+
+            # 先计入本层所有条目再展开子目录, 预算耗尽后剩余目录不再展开
+            if depth == 0 or level < depth:
+                for item in files:
+                    if item["type"] == "directory" and budget[0] > 0:
+                        sub = child(node, item["name"])
+                        item["children"] = (
+                            [] if sub is None else walk(sub, item["path"], level + 1)
+                        )
+            return files
+
+        return walk(root, rel_root, 1)
+
+    def get_file_tree(
+        self, uuid: str, path: str = "", depth: int = 1, ref: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        获取目录树.
+        :param path: 相对项目根目录的起始路径
+        :param depth: 展开层数, 1 为仅当前目录, 0 为整棵树;
+            展开的目录带有 children, 未展开 (或超出 MAX_TREE_ENTRIES) 的目录没有 children
+        :param ref: 关联 git 仓库时浏览的引用 (分支, 标签或提交), 默认 HEAD
+        """
         path = path.lstrip("/\\")
+        rel_root = Path(path).as_posix() if path else ""
+
+        git = self._get_git_repo(uuid)
+        if git is not None:
+            cursor = git.subtree(ref or "HEAD", path)
+            return self._build_tree(
+                cursor,
+                rel_root,
+                depth,
+                lambda node: node.list(),
+                lambda node, name: node.child(name),
+            )
+
+        project_root = self._get_project_dir(uuid).resolve()
         target_path = (project_root / path).resolve()
 
         try:
@@ -238,28 +560,42 @@ class ProjectRepository:
             logger.warning(f"获取项目 {uuid} 路径不是目录: {path}")
             raise NotADirectoryError("Not a directory")
 
-        files = []
         try:
-            for entry in os.scandir(target_path):
-                files.append(
-                    {
-                        "name": entry.name,
-                        "type": "directory" if entry.is_dir() else "file",
-                        "size": entry.stat().st_size if entry.is_file() else 0,
-                        "path": (
-                            (Path(path) / entry.name).as_posix() if path else entry.name
-                        ),
-                    }
-                )
+            return self._build_tree(
+                target_path,
+                rel_root,
+                depth,
+                self._list_dir,
+                lambda dir_path, name: dir_path / name,
+            )
         except Exception as e:
             logger.error(f"获取项目 {uuid} 路径 {path} 文件列表时出错: {e}")
             raise e
 
-        files.sort(key=lambda x: (x["type"] != "directory", x["name"]))
-        return files
-
-    def get_file_content(self, uuid: str, path: str) -> str:
-        project_root = self._get_project_dir(uuid)
+    def get_raw_file(
+        self, uuid: str, path: str, ref: Optional[str] = None
+    ) -> Union[Path, Tuple[str, Union[bytes, BlobStream]]]:
+        """
+        获取原始文件: 项目目录中的文件返回绝对路径,
+        git 仓库中的文件返回 (blob sha, 内容); 超过 MAX_CACHED_OBJECT 的文件内容为 BlobStream,
+        由调用方流式发送, 不整体读入内存
+        """
+        git = self._get_git_repo(uuid)
+        if git is not None:
+            sha, size = git.blob_info(ref or "HEAD", path)
+            if size > MAX_CACHED_OBJECT:
+                return sha, git.open_blob(sha, size)
+            return sha, git.read_blob(sha)
+        return self.get_file_path(uuid, path)
+
+    def get_refs(self, uuid: str) -> Optional[List[Dict[str, str]]]:
+        """列出关联 git 仓库的分支与标签, 未关联时返回 None"""
+        git = self._get_git_repo(uuid)
+        return git.list_refs() if git is not None else None
+
+    def get_file_path(self, uuid: str, path: str) -> Path:
+        """解析项目内文件的绝对路径, 越界或不是文件时抛出 FileNotFoundError"""
+        project_root = self._get_project_dir(uuid).resolve()
         path = path.lstrip("/\\")
         target_path = (project_root / path).resolve()
 
@@ -269,19 +605,219 @@ class ProjectRepository:
             logger.warning(f"获取项目 {uuid} 路径越界: {path}")
             raise FileNotFoundError("File not found")
 
-        if not target_path.exists() or not target_path.is_file():
+        if not target_path.is_file():
             logger.warning(f"获取项目 {uuid} 路径不存在或不是文件: {path}")
             raise FileNotFoundError("File not found")
 
-        if target_path.stat().st_size > 1024 * 1024 * 2:
+        return target_path
+
+    def _read_git_blob(
+        self, git: GitRepository, uuid: str, path: str, ref: Optional[str]
+    ) -> bytes:
+        sha, size = git.blob_info(ref or "HEAD", path)
+        if size > MAX_VIEW_BYTES:
+            logger.warning(f"获取项目 {uuid} 路径 {path} 文件大小超限")
+            raise ValueError("File too large to view, use line ranges instead")
+        data = git.read_blob(sha)
+        if looks_binary(data):
+            logger.warning(f"获取项目 {uuid} 路径 {path} 文件: 不支持的编码")
+            raise ValueError("Binary file cannot be viewed")
+        return data
+
+    def get_file_content(self, uuid: str, path: str, ref: Optional[str] = None) -> str:
+        git = self._get_git_repo(uuid)
+        if git is not None:
+            data = self._read_git_blob(git, uuid, path, ref)
+            return data.decode("utf-8", errors="replace")
+
+        target_path = self.get_file_path(uuid, path)
+
+        if target_path.stat().st_size > MAX_VIEW_BYTES:
             size = target_path.stat().st_size / (1024 * 1024)
             logger.warning(f"获取项目 {uuid} 路径 {path} 文件大小超限: {size:.2f}MB")
-            raise ValueError("File too large to view")
+            raise ValueError("File too large to view, use line ranges instead")
 
-        try:
-            with open(target_path, "r", encoding="utf-8") as f:
-                content = f.read()
-            return content
-        except UnicodeDecodeError:
+        if is_binary(target_path):
             logger.warning(f"获取项目 {uuid} 路径 {path} 文件: 不支持的编码")
             raise ValueError("Binary file cannot be viewed")
+
+        with open(target_path, "r", encoding="utf-8", errors="replace") as f:
+            return f.read()
+
+    def get_file_lines(
+        self,
+        uuid: str,
+        path: str,
+        start_line: int,
+        end_line: int,
+        ref: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """按行区间读取文件, 不受整文件大小限制"""
+        git = self._get_git_repo(uuid)
+        if git is not None:
+            sha, size = git.blob_info(ref or "HEAD", path)
+            if size > MAX_CACHED_OBJECT:
+                return self._read_git_blob_lines(
+                    git.open_blob(sha, size), uuid, path, start_line, end_line
+                )
+            data = git.read_blob(sha)
+            if looks_binary(data):
+                logger.warning(f"获取项目 {uuid} 路径 {path} 文件: 不支持的编码")
+                raise ValueError("Binary file cannot be viewed")
+            return read_buffer_lines(data, start_line, end_line)
+
+        target_path = self.get_file_path(uuid, path)
+        if is_binary(target_path):
+            logger.warning(f"获取项目 {uuid} 路径 {path} 文件: 不支持的编码")
+            raise ValueError("Binary file cannot be viewed")
+        return read_lines(target_path, start_line, end_line)
+
+    def _read_git_blob_lines(
+        self, stream: BlobStream, uuid: str, path: str, start_line: int, end_line: int
+    ) -> Dict[str, Any]:
+        """大文件先写入临时文件再内存映射, 与项目目录中的文件一样按行读取"""
+        try:
+            if looks_binary(stream.peek(SNIFF_SIZE)):
+                logger.warning(f"获取项目 {uuid} 路径 {path} 文件: 不支持的编码")
+                raise ValueError("Binary file cannot be viewed")
+            with tempfile.TemporaryFile(dir=Config.CACHE_DIR) as f:
+                shutil.copyfileobj(stream, f)
+                f.flush()
+                return read_file_lines(f, start_line, end_line)
+        finally:
+            stream.close()
+
+    def _iter_archive_files(self, project_root: Path):
+        return iter_files(
+            project_root, exclude=lambda name: name.endswith(RENDER_CACHE_SUFFIX)
+        )
+
+    def _clear_archives(self, uuid: str, keep: Optional[str] = None):
+        """删除项目的归档缓存, keep 为需要保留的目录指纹"""
+        for path in Config.ARCHIVE_CACHE_DIR.glob(f"{uuid}-*"):
+            if keep and path.name.startswith(f"{uuid}-{keep}."):
+                continue
+            path.unlink(missing_ok=True)
+
+    def get_archive(
+        self, uuid: str, fmt: str
+    ) -> Tuple[str, Optional[Path], Optional[Iterator[bytes]]]:
+        """
+        获取项目目录的归档.
+        以文件路径, 大小与 mtime 计算目录指纹, 指纹相同的归档只生成一次.
+        :param fmt: ARCHIVE_FORMATS 中的格式
+        :return: (目录指纹, 缓存文件, 数据流); 命中缓存时数据流为 None, 否则缓存文件为 None,
+            数据流完整发送后写入缓存并删除该项目旧的归档
+        """
+        project_root = self._get_project_dir(uuid)
+        if not project_root.is_dir():
+            logger.warning(f"获取项目 {uuid} 归档: 项目目录不存在")
+            raise FileNotFoundError("Project directory not found")
+
+        digest = tree_hash(self._iter_archive_files(project_root))[:32]
+        ext = ARCHIVE_FORMATS[fmt][0]
+        cache_path = Config.ARCHIVE_CACHE_DIR / f"{uuid}-{digest}.{ext}"
+        if cache_path.is_file():
+            return digest, cache_path, None
+
+        stream = tee_to_file(
+            stream_archive(self._iter_archive_files(project_root), fmt),
+            cache_path,
+            on_complete=lambda _: self._clear_archives(uuid, keep=digest),
+        )
+        return digest, None, stream
+
+    @staticmethod
+    def _is_reserved_path(rel: str) -> bool:
+        """导入归档时跳过的路径: 渲染缓存与旧版元数据文件 (会被迁移程序读取)"""
+        return rel.endswith(RENDER_CACHE_SUFFIX) or rel == "metadata.json"
+
+    def _merge_staging(self, project_root: Path, staging: Path, extracted: dict):
+        """
+        把暂存目录中解压出的文件逐个原子替换到项目目录.
+        移动第一个文件之前先校验并创建所有目标目录, 路径越界或与已有目录冲突时项目目录不变
+        """
+        dirs = {project_root / rel for rel in extracted["dirs"]}
+        dirs.update((project_root / rel).parent for rel in extracted["files"])
+
+        # 先解析再创建: 项目内已有的符号链接不能把文件带出项目目录
+        for dir_path in dirs:
+            try:
+                dir_path.resolve().relative_to(project_root)
+            except ValueError:
+                rel = dir_path.relative_to(project_root).as_posix()
+                raise ArchiveError(f"path escapes project: {rel}")
+        for rel in extracted["files"]:
+            if (project_root / rel).is_dir():
+                raise ArchiveError(f"file conflicts with directory: {rel}")
+
+        for dir_path in sorted(dirs):
+            try:
+                dir_path.mkdir(parents=True, exist_ok=True)
+            except (FileExistsError, NotADirectoryError):
+                rel = dir_path.relative_to(project_root).as_posix()
+                raise ArchiveError(f"directory conflicts with file: {rel}")
+        for rel in extracted["files"]:
+            os.replace(staging / rel, project_root / rel)
+
+    def import_archive(
+        self, uuid: str, fileobj: IO[bytes], strip: int = 0
+    ) -> Optional[Dict[str, Any]]:
+        """
+        将 zip / tar 归档解压到项目目录, 同名文件被覆盖.
+        先解压到暂存目录, 全部成功且目标路径校验通过后再移入项目目录,
+        超出配额, 归档损坏或路径越界/冲突时项目目录不变 (创建的空目录除外).
+        导入后重建目录清单; 归档包含 README 时同步渲染缓存与搜索索引.
+        :return: {"files": 文件数, "bytes": 解压后总字节数, "readme": 是否更新了 README},
+                 项目不存在时返回 None
+        """
+        stmt = select(self.model).filter_by(uuid=uuid)
+        proj = db.session.scalars(stmt).first()
+        if not proj:
+            return None
+
+        project_dir = self._get_project_dir(uuid)
+        project_dir.mkdir(parents=True, exist_ok=True)
+        project_root = project_dir.resolve()
+
+        staging = Path(
+            tempfile.mkdtemp(prefix=f"{uuid}-", dir=Config.UPLOAD_STAGING_DIR)
+        )
+        try:
+            extracted = extract_archive(
+                fileobj,
+                staging,
+                max_bytes=Config.PROJECT_UPLOAD_MAX_BYTES,
+                max_files=Config.PROJECT_UPLOAD_MAX_FILES,
+                strip=strip,
+                exclude=self._is_reserved_path,
+                workers=Config.PROJECT_UPLOAD_WORKERS,
+            )
+            self._merge_staging(project_root, staging, extracted)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+        # 根目录的 mtime 已变化, 直接重建清单并缓存
+        self._manifests[uuid] = _ProjectManifest.scan(
+            project_dir, project_dir.stat().st_mtime_ns
+        )
+
+        readme_updated = any(rel in README_NAMES for rel in extracted["files"])
+        if readme_updated:
+            readme_path = self._find_readme(uuid)
+            readme = self._read_readme(uuid, readme_path)
+            if readme_path is not None:
+                write_render_cache(readme_path, readme)
+            proj.updated_at = datetime.now()
+            db.session.commit()
+            self.search_index.update(proj.id, {"readme": readme})
+
+        logger.info(
+            f"项目 {uuid} 导入归档: {len(extracted['files'])} 个文件, "
+            f"{extracted['bytes']} 字节"
+        )
+        return {
+            "files": len(extracted["files"]),
+            "bytes": extracted["bytes"],
+            "readme": readme_updated,
+        }
@@ -0,0 +1,186 @@
+# ------------------------------------------------------------
+# @author: Churk
+# @status: 阶段性完工
+# @description: 全文检索模块, 基于 SQLite FTS5 维护博客与项目的检索索引
+# ------------------------------------------------------------
+
+import html
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from backend.core.Logger import get_logger
+from backend.data.database import db
+
+logger = get_logger("Search_Index")
+
+# 高亮标记先用控制字符占位, 转义正文后再替换为 <mark>, 避免正文中的 HTML 被注入
+_HL_START = "\x01"
+_HL_END = "\x02"
+
+# trigram 分词器无法用 MATCH 检索少于 3 个字符的词, 这类词退化为 instr 扫描
+_MIN_MATCH_LEN = 3
+
+
+class SearchIndex:
+    """
+    FTS5 检索索引, 与模型表放在同一个 SQLite 绑定中, rowid 与模型表的 id 对应.
+    使用 trigram 分词器, 以支持中文等不以空格分词的内容.
+    """
+
+    def __init__(self, bind_key: str, model, columns: Tuple[str, ...]):
+        self.bind_key = bind_key
+        self.model = model
+        self.columns = columns
+        self.table = f"{model.__tablename__}_fts"
+
+    @property
+    def engine(self):
+        return db.engines[self.bind_key]
+
+    def exists(self) -> bool:
+        with self.engine.connect() as conn:
+            row = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :n"),
+                {"n": self.table},
+            ).first()
+        return row is not None
+
+    def create(self):
+        columns = ", ".join(self.columns)
+        with self.engine.begin() as conn:
+            conn.execute(
+                text(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} "
+                    f"USING fts5({columns}, tokenize='trigram')"
+                )
+            )
+
+    def _execute(self, sql: str, params: Dict[str, Any]):
+        return db.session.execute(
+            text(sql), params, bind_arguments={"bind": self.engine}
+        )
+
+    def _write(self, sqls: List[Tuple[str, Dict[str, Any]]]):
+        try:
+            for sql, params in sqls:
+                self._execute(sql, params)
+            db.session.commit()
+        except Exception as e:
+            # 记录错误但不中断写入流程, 索引可通过删除 FTS 表后重启重建
+            db.session.rollback()
+            logger.error(f"更新检索索引 {self.table} 时出错: {e}")
+
+    def index(self, rowid: int, fields: Dict[str, Any]):
+        """写入 (或覆盖) 一条文档"""
+        values = {c: self._to_text(fields.get(c)) for c in self.columns}
+        columns = ", ".join(self.columns)
+        params = ", ".join(f":{c}" for c in self.columns)
+        self._write(
+            [
+                (f"DELETE FROM {self.table} WHERE rowid = :rowid", {"rowid": rowid}),
+                (
+                    f"INSERT INTO {self.table} (rowid, {columns}) "
+                    f"VALUES (:rowid, {params})",
+                    {"rowid": rowid, **values},
+                ),
+            ]
+        )
+
+    def update(self, rowid: int, fields: Dict[str, Any]):
+        """仅更新传入的列, 文档不存在时不做任何事"""
+        values = {c: self._to_text(fields[c]) for c in self.columns if c in fields}
+        if not values:
+            return
+        assignments = ", ".join(f"{c} = :{c}" for c in values)
+        self._write(
+            [
+                (
+                    f"UPDATE {self.table} SET {assignments} WHERE rowid = :rowid",
+                    {"rowid": rowid, **values},
+                )
+            ]
+        )
+
+    def delete(self, rowid: int):
+        self._write(
+            [(f"DELETE FROM {self.table} WHERE rowid = :rowid", {"rowid": rowid})]
+        )
+
+    def search(
+        self,
+        query: str,
+        user_uuid: Optional[str] = None,
+        view_all: bool = False,
+        limit: int = 20,
+    ) -> List[Tuple[int, str]]:
+        """
+        检索并按相关度排序, 同时应用 公开 + 自己的 可见性规则.
+        :return: [(模型 id, 高亮片段 HTML)]
+        """
+        terms = [t for t in query.split() if t]
+        if not terms:
+            return []
+
+        long_terms = [t for t in terms if len(t) >= _MIN_MATCH_LEN]
+        short_terms = [t for t in terms if len(t) < _MIN_MATCH_LEN]
+
+        where = []
+        params: Dict[str, Any] = {"limit": limit}
+
+        if long_terms:
+            # 每个词作为短语加引号, 防止用户输入被解析为 FTS5 查询语法
+            params["match"] = " ".join(
+                '"' + t.replace('"', '""') + '"' for t in long_terms
+            )
+            where.append(f"{self.table} MATCH :match")
+
+        for i, term in enumerate(short_terms):
+            params[f"t{i}"] = term
+            where.append(
+                "("
+                + " OR ".join(
+                    f"instr({self.table}.{c}, :t{i}) > 0" for c in self.columns
+                )
+                + ")"
+            )
+
+        if not view_all:
+            if user_uuid:
+                where.append("(m.is_public = 1 OR m.owner_uuid = :user_uuid)")
+                params["user_uuid"] = user_uuid
+            else:
+                where.append("m.is_public = 1")
+
+        order = f"bm25({self.table})" if long_terms else f"{self.table}.rowid DESC"
+        sql = (
+            f"SELECT {self.table}.rowid, "
+            f"snippet({self.table}, -1, :hl_start, :hl_end, '…', 24) "
+            f"FROM {self.table} "
+            f"JOIN {self.model.__tablename__} AS m ON m.id = {self.table}.rowid "
+            f"WHERE {' AND '.join(where)} "
+            f"ORDER BY {order} LIMIT :limit"
+        )
+        params["hl_start"] = _HL_START
+        params["hl_end"] = _HL_END
+
+        rows = self._execute(sql, params).all()
+        return [(row[0], self._render_snippet(row[1])) for row in rows]
+
+    @staticmethod
+    def _to_text(value: Any) -> str:
+        if value is None:
+            return ""
+        if isinstance(value, (list, tuple)):
+            return " ".join(str(v) for v in value)
+        return str(value)
+
+    @staticmethod
+    def _render_snippet(snippet: Optional[str]) -> str:
+        if not snippet:
+            return ""
+        return (
+            html.escape(snippet)
+            .replace(_HL_START, "<mark>")
+            .replace(_HL_END, "</mark>")
+        )
@@ -0,0 +1,134 @@
+# ------------------------------------------------------------
+# @author: Churk
+# @status: 阶段性完工
+# @description: 标签倒排索引模块, 维护 标签 -> 条目 的映射, 用于按标签筛选与标签统计
+# ------------------------------------------------------------
+
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, func, insert, or_, select
+
+from backend.core.Logger import get_logger
+from backend.data.database import db
+
+logger = get_logger("Tag_Index")
+
+
+class TagIndex:
+    """
+    标签倒排索引, 与模型表放在同一个 SQLite 绑定中, item_id 与模型表的 id 对应.
+    主键为 (tag, item_id), 按标签查找条目时直接走主键索引.
+    """
+
+    def __init__(self, bind_key: str, model):
+        self.bind_key = bind_key
+        self.model = model
+        self.table = db.Table(
+            f"{model.__tablename__}_tag",
+            db.Column("tag", db.String(50), primary_key=True),
+            db.Column("item_id", db.Integer, primary_key=True, index=True),
+            bind_key=bind_key,
+        )
+
+    @property
+    def _bind_arguments(self) -> Dict[str, Any]:
+        # 仅涉及 Core 表的语句无法由 Flask-SQLAlchemy 自动路由到对应绑定, 读写都需显式指定
+        return {"bind": db.engines[self.bind_key]}
+
+    @staticmethod
+    def normalize(tags: Any) -> List[str]:
+        """接受列表或逗号分隔的字符串, 去除空白与重复项并保持顺序"""
+        if isinstance(tags, str):
+            tags = tags.split(",")
+        result = []
+        for tag in tags or []:
+            tag = str(tag).strip()
+            if tag and tag not in result:
+                result.append(tag)
+        return result
+
+    def set(self, item_id: int, tags: Iterable[str]):
+        """写入条目的完整标签集合, 只增删发生变化的标签"""
+        new_tags = set(self.normalize(tags))
+        old_tags = set(
+            db.session.scalars(
+                select(self.table.c.tag).where(self.table.c.item_id == item_id),
+                bind_arguments=self._bind_arguments,
+            )
+        )
+
+        removed = old_tags - new_tags
+        added = new_tags - old_tags
+        if not removed and not added:
+            return
+
+        try:
+            if removed:
+                db.session.execute(
+                    delete(self.table).where(
+                        self.table.c.item_id == item_id,
+                        self.table.c.tag.in_(removed),
+                    ),
+                    bind_arguments=self._bind_arguments,
+                )
+            if added:
+                db.session.execute(
+                    insert(self.table),
+                    [{"tag": tag, "item_id": item_id} for tag in added],
+                    bind_arguments=self._bind_arguments,
+                )
+            db.session.commit()
+        except Exception as e:
+            # 记录错误但不中断写入流程, 索引可通过删除迁移标记后重启重建, 见 migrate_tag_index
+            db.session.rollback()
+            logger.error(f"更新标签索引 {self.table.name} 时出错: {e}")
+
+    def delete(self, item_id: int):
+        try:
+            db.session.execute(
+                delete(self.table).where(self.table.c.item_id == item_id),
+                bind_arguments=self._bind_arguments,
+            )
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"删除标签索引 {self.table.name} 条目 {item_id} 时出错: {e}")
+
+    def filter(self, stmt, tag: str):
+        """为查询附加 包含指定标签 的条件"""
+        return stmt.where(
+            self.model.id.in_(
+                select(self.table.c.item_id).where(self.table.c.tag == tag)
+            )
+        )
+
+    def counts(
+        self, user_uuid: Optional[str] = None, view_all: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        统计每个标签下的可见条目数, 按数量降序.
+        :return: [{"tag": str, "count": int}]
+        """
+        count = func.count(self.table.c.item_id)
+        stmt = (
+            select(self.table.c.tag, count)
+            .join(self.model, self.model.id == self.table.c.item_id)
+            .group_by(self.table.c.tag)
+            .order_by(count.desc(), self.table.c.tag)
+        )
+
+        if not view_all:
+            if user_uuid:
+                stmt = stmt.where(
+                    or_(
+                        self.model.is_public.is_(True),
+                        self.model.owner_uuid == user_uuid,
+                    )
+                )
+            else:
+                stmt = stmt.where(self.model.is_public.is_(True))
+
+        return [
+            {"tag": tag, "count": n}
+            for tag, n in db.session.execute(stmt, bind_arguments=self._bind_arguments)
+        ]
@@ -0,0 +1,264 @@
+# ------------------------------------------------------------
+# @author: Churk
+# @status: 阶段性完工
+# @description: 输入联想索引模块, 在进程内维护 trigram 与词首前缀倒排表, 用于导航的即时搜索建议
+# ------------------------------------------------------------
+
+import heapq
+import re
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+DEFAULT_SUGGEST_LIMIT = 10
+
+# 过长的输入与过多的词对联想没有意义, 截断后再检索
+_MAX_QUERY_LEN = 100
+_MAX_TERMS = 5
+
+_WORD = re.compile(r"[^\W_]+")
+_URL_PREFIX = re.compile(r"^[a-z][a-z0-9+.-]*://(www\.)?")
+
+
+def _normalize(value: Any) -> str:
+    return str(value).casefold() if value else ""
+
+
+def _keys(text: str) -> Set[str]:
+    """
+    文本的倒排键: 所有三字符片段, 以及每个词前 1~2 个字符.
+    中文等不以空格分词的内容每个字都视为词首.
+    """
+    keys = {text[i : i + 3] for i in range(len(text) - 2)}
+    for word in _WORD.findall(text):
+        if word.isascii():
+            keys.add(word[:1])
+            keys.add(word[:2])
+        else:
+            for i in range(len(word)):
+                keys.add(word[i : i + 1])
+                keys.add(word[i : i + 2])
+    return keys
+
+
+class _Document:
+    __slots__ = (
+        "id",
+        "version",
+        "owner_uuid",
+        "is_public",
+        "rank",
+        "fields",
+        "text",
+        "data",
+    )
+
+    def __init__(self, obj, fields: Tuple[str, ...], payload: Callable[[Any], dict]):
+        self.id = obj.id
+        self.version = (obj.updated_at, obj.order)
+        self.owner_uuid = obj.owner_uuid
+        self.is_public = bool(obj.is_public)
+        created = obj.created_at.timestamp() if obj.created_at else 0
+        # 与列表排序一致: order 降序, created_at 降序
+        self.rank = (-(obj.order or 0), -created, obj.id)
+
+        values = []
+        for name in fields:
+            value = _normalize(getattr(obj, name))
+            if name == "url":
+                # 协议头与 www. 不参与匹配, 否则几乎所有链接都会命中 "htt" 之类的片段
+                value = _URL_PREFIX.sub("", value)
+            values.append(value)
+        self.fields = tuple(values)
+        # 字段之间用 \0 分隔, 检索词不会跨字段匹配
+        self.text = "\0".join(values)
+        self.data = payload(obj)
+
+    def keys(self) -> Set[str]:
+        keys = set()
+        for value in self.fields:
+            keys |= _keys(value)
+        return keys
+
+
+class TypeaheadIndex:
+    """
+    进程内的输入联想索引.
+    倒排表的键为三字符片段 (用于长度不少于 3 的检索词, 候选命中后再做子串校验)
+    与词首 1~2 个字符 (用于更短的检索词), 值为文档 id 集合.
+    可见性与排序所需的信息同样以集合与字典维护, 检索时只做集合运算与堆选择, 不逐项打分.
+    每个 worker 各自维护一份, 通过 sync() 与数据库比对版本后增量更新.
+    """
+
+    def __init__(
+        self, fields: Tuple[str, ...], payload: Callable[[Any], Dict[str, Any]]
+    ):
+        """
+        :param fields: 参与检索的模型字段, 首个字段的前缀命中时排在前面
+        :param payload: 由模型对象生成建议结果的函数, 结果在建索引时生成并缓存
+        """
+        self.fields = fields
+        self.payload = payload
+        self._docs: Dict[int, _Document] = {}
+        self._postings: Dict[str, Set[int]] = {}
+        # 首个字段的前 1~3 个字符 -> 文档 id
+        self._heads: Dict[str, Set[int]] = {}
+        self._public: Set[int] = set()
+        self._owned: Dict[str, Set[int]] = {}
+        self._rank: Dict[int, Tuple] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    @staticmethod
+    def _heads_of(doc: _Document) -> Set[str]:
+        head = doc.fields[0]
+        return {head[:n] for n in range(1, min(len(head), 3) + 1)}
+
+    @staticmethod
+    def _link(table: Dict[str, Set[int]], keys: Iterable[str], doc_id: int):
+        for key in keys:
+            table.setdefault(key, set()).add(doc_id)
+
+    @staticmethod
+    def _unlink(table: Dict[str, Set[int]], keys: Iterable[str], doc_id: int):
+        for key in keys:
+            posting = table.get(key)
+            if posting is not None:
+                posting.discard(doc_id)
+                if not posting:
+                    del table[key]
+
+    def _add(self, doc: _Document):
+        self._docs[doc.id] = doc
+        self._rank[doc.id] = doc.rank
+        self._link(self._postings, doc.keys(), doc.id)
+        self._link(self._heads, self._heads_of(doc), doc.id)
+        if doc.is_public:
+            self._public.add(doc.id)
+        if doc.owner_uuid:
+            self._link(self._owned, (doc.owner_uuid,), doc.id)
+
+    def _remove(self, doc_id: int):
+        doc = self._docs.pop(doc_id, None)
+        if doc is None:
+            return
+        del self._rank[doc_id]
+        self._unlink(self._postings, doc.keys(), doc_id)
+        self._unlink(self._heads, self._heads_of(doc), doc_id)
+        self._public.discard(doc_id)
+        if doc.owner_uuid:
+            self._unlink(self._owned, (doc.owner_uuid,), doc_id)
+
+    def sync(
+        self,
+        versions: Dict[int, Any],
+        load: Callable[[List[int]], Iterable[Any]],
+    ) -> Tuple[int, int]:
+        """
+        与数据库中的版本比对并增量更新.
+        :param versions: {id: (updated_at, order)}, 数据库中当前的全部文档版本
+        :param load: 按 id 列表加载模型对象
+        :return: (更新的文档数, 删除的文档数)
+        """
+        with self._lock:
+            removed = [doc_id for doc_id in self._docs if doc_id not in versions]
+            stale = [
+                doc_id
+                for doc_id, version in versions.items()
+                if doc_id not in self._docs or self._docs[doc_id].version != version
+            ]
+            for doc_id in removed:
+                self._remove(doc_id)
+            for obj in load(stale) if stale else ():
+                self._remove(obj.id)
+                self._add(_Document(obj, self.fields, self.payload))
+            return len(stale), len(removed)
+
+    def _candidates(self, term: str) -> Set[int]:
+        """
+        检索词的候选文档. 三字符片段按字段分别生成, 不超过三个字符的词结果是精确的;
+        更长的词取所有片段的交集, 可能包含片段不连续的项, 由 _select 在选出后校验.
+        """
+        if len(term) <= 3:
+            return self._postings.get(term, set())
+
+        postings = []
+        for i in range(len(term) - 2):
+            posting = self._postings.get(term[i : i + 3])
+            if not posting:
+                return set()
+            postings.append(posting)
+        postings.sort(key=len)
+        result = postings[0]
+        for posting in postings[1:]:
+            result = result & posting
+            if not result:
+                break
+        return result
+
+    def _select(
+        self, ids: Set[int], limit: int, accept: Callable[[_Document], bool]
+    ) -> List[int]:
+        """
+        按列表顺序选出前 limit 个通过校验的文档.
+        只校验被选中的项, 未通过的剔除后继续选择, 大多数情况下一轮即可完成.
+        """
+        rank = self._rank.__getitem__
+        docs = self._docs
+        result: List[int] = []
+        while ids and len(result) < limit:
+            batch = heapq.nsmallest(limit - len(result), ids, key=rank)
+            result.extend(d for d in batch if accept(docs[d]))
+            ids = ids.difference(batch)
+        return result
+
+    def search(
+        self,
+        query: str,
+        user_uuid: Optional[str] = None,
+        view_all: bool = False,
+        limit: int = DEFAULT_SUGGEST_LIMIT,
+    ) -> List[Dict[str, Any]]:
+        """
+        返回匹配所有检索词的前 limit 项, 同时应用 公开 + 自己的 可见性规则.
+        首个词为首个字段 (标题) 前缀的项排在前面, 其余按列表顺序.
+        """
+        terms = _normalize(query[:_MAX_QUERY_LEN]).split()[:_MAX_TERMS]
+        if not terms:
+            return []
+
+        with self._lock:
+            # 从最小的候选集开始求交集
+            candidates = sorted((self._candidates(t) for t in terms), key=len)
+            matched = candidates[0]
+            for other in candidates[1:]:
+                if not matched:
+                    break
+                matched = matched & other
+
+            if not view_all:
+                visible = matched & self._public
+                if user_uuid and user_uuid in self._owned:
+                    visible |= matched & self._owned[user_uuid]
+                matched = visible
+            if not matched:
+                return []
+
+            long_terms = [t for t in terms if len(t) > 3]
+
+            def contains(doc: _Document) -> bool:
+                return all(t in doc.text for t in long_terms)
+
+            first = terms[0]
+            heads = self._heads.get(first[:3], set()) & matched
+            top = self._select(
+                heads,
+                limit,
+                lambda doc: doc.fields[0].startswith(first) and contains(doc),
+            )
+            if len(top) < limit:
+                # 标题以前三个字符开头但不以整个词开头的项也在这里按顺序参与选择
+                rest = matched - set(top)
+                top += self._select(rest, limit - len(top), contains)
+            return [self._docs[doc_id].data for doc_id in top]
@@ -8,20 +8,26 @@ from backend.data import (
 )
 
 from .blog_service import BlogService
+from .counter_service import CounterService
 from .mail_service import MailService
 from .navigation_service import NavigationService
 from .project_service import ProjectService
+from .scheduler_service import SchedulerService
+from .search_service import SearchService
 from .user_service import UserService
 from .verification_service import VerificationService
 
 mail_service = MailService()
+counter_service = CounterService()
+scheduler_service = SchedulerService()
 verification_service = VerificationService(
     mail_service, verifications, totp_verifications
 )
 user_service = UserService(users, verifications)
-navigation_service = NavigationService(navigations)
-project_service = ProjectService(projects)
-blog_service = BlogService(blogs)
+navigation_service = NavigationService(navigations, scheduler_service)
+project_service = ProjectService(projects, counter_service)
+blog_service = BlogService(blogs, counter_service, scheduler_service)
+search_service = SearchService(blogs, projects)
 
 __all__ = [
     "user_service",
@@ -32,6 +38,12 @@ __all__ = [
     "ProjectService",
     "blog_service",
     "BlogService",
+    "search_service",
+    "SearchService",
+    "counter_service",
+    "CounterService",
+    "scheduler_service",
+    "SchedulerService",
     "mail_service",
     "MailService",
     "verification_service",
@@ -8,26 +8,71 @@ from typing import Any, Dict, List, Optional, Tuple
 
 from werkzeug.datastructures import FileStorage
 
-from backend.config import ROLE_ADMIN, ROLE_GUEST
+from backend.config import Config, ROLE_ADMIN, ROLE_GUEST
+from backend.core.Imaging import (
+    RASTER_MIME_TYPES,
+    VARIANT_FORMATS,
+    pick_width,
+    render_variant,
+)
+from backend.core.TextPatch import PatchConflict, PatchError
 from backend.data import BlogRepository
+from backend.data.repositories.blog_repo import DraftConflict
+from backend.services.counter_service import CounterService
+from backend.services.scheduler_service import SchedulerService
 
 
 class BlogService:
-    def __init__(self, blog_repo: BlogRepository):
+    def __init__(
+        self,
+        blog_repo: BlogRepository,
+        counter: CounterService,
+        scheduler: SchedulerService,
+    ):
         self.blog_repo = blog_repo
+        self.counter = counter
+        self.counter.register(
+            "blog.views", lambda deltas: self.blog_repo.add_counts("views", deltas)
+        )
+        scheduler.register(
+            "blog.sweep_assets",
+            Config.ASSET_SWEEP_INTERVAL,
+            lambda: self.blog_repo.sweep_orphaned_assets(Config.ASSET_SWEEP_GRACE),
+        )
 
     def get_all(
+        self,
+        user_uuid: Optional[str] = None,
+        view_all: bool = False,
+        tag: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        return self.blog_repo.get_all(user_uuid=user_uuid, view_all=view_all, tag=tag)
+
+    def get_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        user_uuid: Optional[str] = None,
+        view_all: bool = False,
+        tag: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        return self.blog_repo.get_page(
+            limit, cursor, user_uuid=user_uuid, view_all=view_all, tag=tag
+        )
+
+    def get_tags(
         self, user_uuid: Optional[str] = None, view_all: bool = False
     ) -> List[Dict[str, Any]]:
-        return self.blog_repo.get_all(user_uuid=user_uuid, view_all=view_all)
+        return self.blog_repo.get_tags(user_uuid=user_uuid, view_all=view_all)
 
     def get_by_uuid(
         self,
         uuid: str,
         user_uuid: Optional[str] = None,
         user_role: int = ROLE_GUEST,
+        as_html: bool = False,
     ) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
-        blog = self.blog_repo.get_by_uuid(uuid)
+        blog = self.blog_repo.get_by_uuid(uuid, as_html=as_html)
         if not blog:
             return False, "文章不存在", None
 
@@ -62,45 +107,139 @@ class BlogService:
         data: dict,
         user_uuid: Optional[str] = None,
         user_role: int = ROLE_GUEST,
+        partial: bool = False,
     ) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
+        """
+        更新博客.
+        :param partial: PATCH 语义, 允许通过 content_patch/base_hash 局部修改正文,
+            返回值不包含正文
+        """
         try:
-            # 先获取博客信息 (复用 get_by_uuid 可能会有点绕, 因为这里是写操作, 通常只要存在就可以进一步判断)
-            # 为了避免逻辑循环, 直接查 Repo, 然后在这里做写权限判断
-            blog = self.blog_repo.get_by_uuid(uuid)
+            # 写操作只需所有者信息, 不读取文章文件
+            success, msg = self._check_write(uuid, user_uuid, user_role)
+            if not success:
+                return False, msg, None
+
+            if partial:
+                data = dict(data)
+                blog = self.blog_repo.update(
+                    uuid,
+                    data,
+                    content_patch=data.pop("content_patch", None),
+                    base_hash=data.pop("base_hash", None),
+                    show_content=False,
+                )
+            else:
+                blog = self.blog_repo.update(uuid, data)
             if not blog:
                 return False, "文章不存在", None
+            return True, "文章更新成功", blog
+        except PatchConflict:
+            return False, "文章已被修改, 请刷新后重试", None
+        except PatchError:
+            return False, "无效的正文补丁", None
+        except Exception as e:
+            return False, f"更新失败: {str(e)}", None
+
+    def _check_write(
+        self, uuid: str, user_uuid: Optional[str], user_role: int
+    ) -> Tuple[bool, str]:
+        """检查写权限: 必须是管理员或作者"""
+        blog = self.blog_repo.get_permission(uuid)
+        if not blog:
+            return False, "文章不存在"
+        if user_role >= ROLE_ADMIN or (
+            user_uuid and user_uuid == blog.get("owner_uuid")
+        ):
+            return True, ""
+        return False, "权限不足"
+
+    def get_draft(
+        self,
+        uuid: str,
+        user_uuid: Optional[str] = None,
+        user_role: int = ROLE_GUEST,
+    ) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
+        success, msg = self._check_write(uuid, user_uuid, user_role)
+        if not success:
+            return False, msg, None
 
-            # 验权: 必须是管理员或作者
-            is_admin = user_role >= ROLE_ADMIN
-            is_owner = user_uuid and user_uuid == blog.get("owner_uuid")
+        draft = self.blog_repo.get_draft(uuid)
+        if draft is None:
+            return False, "草稿不存在", None
+        return True, "草稿获取成功", draft
 
-            if not (is_admin or is_owner):
-                return False, "权限不足", None
+    def save_draft(
+        self,
+        uuid: str,
+        data: dict,
+        user_uuid: Optional[str] = None,
+        user_role: int = ROLE_GUEST,
+    ) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
+        """
+        自动保存草稿.
+        :param data: {"content": str, "revision": int}, revision 由编辑器单调递增
+        :return: revision 落后时失败, data 为当前生效的草稿信息
+        """
+        success, msg = self._check_write(uuid, user_uuid, user_role)
+        if not success:
+            return False, msg, None
+
+        content = data.get("content")
+        revision = data.get("revision")
+        if not isinstance(content, str) or not isinstance(revision, int):
+            return False, "无效的草稿", None
 
-            blog = self.blog_repo.update(uuid, data)
-            if not blog:
-                return False, "文章不存在", None
-            return True, "文章更新成功", blog
+        try:
+            draft = self.blog_repo.save_draft(uuid, content, revision)
+            return True, "草稿已保存", draft
+        except DraftConflict as e:
+            return False, "草稿版本冲突", e.current
         except Exception as e:
-            return False, f"更新失败: {str(e)}", None
+            return False, f"草稿保存失败: {str(e)}", None
 
-    def delete(
+    def delete_draft(
         self,
         uuid: str,
         user_uuid: Optional[str] = None,
         user_role: int = ROLE_GUEST,
     ) -> Tuple[bool, str]:
+        success, msg = self._check_write(uuid, user_uuid, user_role)
+        if not success:
+            return False, msg
+
+        if self.blog_repo.delete_draft(uuid):
+            return True, "草稿已丢弃"
+        return False, "草稿不存在"
+
+    def publish_draft(
+        self,
+        uuid: str,
+        user_uuid: Optional[str] = None,
+        user_role: int = ROLE_GUEST,
+    ) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
+        success, msg = self._check_write(uuid, user_uuid, user_role)
+        if not success:
+            return False, msg, None
+
         try:
-            blog = self.blog_repo.get_by_uuid(uuid)
+            blog = self.blog_repo.publish_draft(uuid)
             if not blog:
-                return False, "文章不存在"
-
-            # 验权: 必须是管理员或作者
-            is_admin = user_role >= ROLE_ADMIN
-            is_owner = user_uuid and user_uuid == blog.get("owner_uuid")
+                return False, "草稿不存在", None
+            return True, "文章发布成功", blog
+        except Exception as e:
+            return False, f"发布失败: {str(e)}", None
 
-            if not (is_admin or is_owner):
-                return False, "权限不足"
+    def delete(
+        self,
+        uuid: str,
+        user_uuid: Optional[str] = None,
+        user_role: int = ROLE_GUEST,
+    ) -> Tuple[bool, str]:
+        try:
+            success, msg = self._check_write(uuid, user_uuid, user_role)
+            if not success:
+                return False, msg
 
             success = self.blog_repo.delete(uuid)
             if success:
@@ -115,65 +254,71 @@ class BlogService:
         file_obj: FileStorage,
         user_uuid: Optional[str] = None,
         user_role: int = ROLE_GUEST,
-    ) -> Tuple[bool, str, Optional[str]]:
+    ) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
         try:
-            # 检查博客是否存在
-            blog = self.blog_repo.get_by_uuid(blog_uuid)
-            if not blog:
-                return False, "文章不存在", None
-
-            # 验权
-            is_admin = user_role >= ROLE_ADMIN
-            is_owner = user_uuid and user_uuid == blog.get("owner_uuid")
-
-            if not (is_admin or is_owner):
-                return False, "权限不足", None
+            success, msg = self._check_write(blog_uuid, user_uuid, user_role)
+            if not success:
+                return False, msg, None
 
-            import uuid
-            from pathlib import Path
+            asset = self.blog_repo.save_asset(
+                blog_uuid, file_obj.stream, file_obj.filename, file_obj.mimetype
+            )
 
-            from backend.config import Config
-
-            # 确保目录存在
-            assets_dir = Config.BLOGS_DIR / blog_uuid / "assets"
-            assets_dir.mkdir(parents=True, exist_ok=True)
-
-            # 生成文件名
-            ext = Path(file_obj.filename).suffix
-            if not ext:
-                ext = ".png"  # 默认扩展名
-
-            asset_uuid = str(uuid.uuid4())
-            filename = f"{asset_uuid}{ext}"
-            file_path = assets_dir / filename
-
-            # 保存文件
-            file_obj.save(file_path)
-
-            return True, "上传成功", asset_uuid
+            return True, "上传成功", asset.to_dict()
         except Exception as e:
             return False, f"上传失败: {str(e)}", None
 
-    def get_asset_path(
+    def get_asset(
         self,
         blog_uuid: str,
         asset_uuid: str,
-    ) -> Tuple[bool, Optional[str]]:
+        width: Optional[int] = None,
+        accept_webp: bool = False,
+    ) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        获取资产信息, 指定 width 时返回 (按需生成的) 尺寸变体.
+        :param width: 期望宽度, 会取整到变体档位
+        :param accept_webp: 客户端是否接受 WebP
+        :return: (是否成功, {"path": Path, "etag": str, "mime_type": str, "negotiated": bool})
+        """
         try:
-            from backend.config import Config
-            import glob
-
-            # 查找文件 (因为不知道扩展名)
-            assets_dir = Config.BLOGS_DIR / blog_uuid / "assets"
-            pattern = str(assets_dir / f"{asset_uuid}.*")
-            files = glob.glob(pattern)
+            # 通过资产表定位文件, 无需扫描目录
+            asset = self.blog_repo.get_asset(blog_uuid, asset_uuid)
+            if not asset:
+                return False, None
 
-            if not files:
+            file_path = self.blog_repo.get_asset_path(asset)
+            if not file_path.exists():
                 return False, None
 
-            return True, files[0]
+            if not width or asset.mime_type not in RASTER_MIME_TYPES:
+                return True, {
+                    "path": file_path,
+                    "etag": asset.content_hash,
+                    "mime_type": asset.mime_type,
+                    "negotiated": False,
+                }
+
+            # 支持 WebP 的客户端使用 WebP, 否则 JPEG 原图用 JPEG, 其他 (可能含透明通道) 用 PNG
+            if accept_webp:
+                fmt = "webp"
+            else:
+                fmt = "jpeg" if asset.mime_type == "image/jpeg" else "png"
+            target_width = pick_width(width, asset.width)
+
+            variant_path = self.blog_repo.get_variant_path(asset, target_width, fmt)
+            if not variant_path.exists():
+                render_variant(file_path, variant_path, target_width, fmt)
+
+            return True, {
+                "path": variant_path,
+                "etag": f"{asset.content_hash}-{target_width}-{fmt}",
+                "mime_type": VARIANT_FORMATS[fmt][1],
+                "negotiated": True,
+            }
         except Exception:
             return False, None
 
-    def increment_views(self, uuid: str):
-        self.blog_repo.increment_views(uuid)
+    def increment_views(self, uuid: str) -> int:
+        """缓冲一次浏览计数, 返回尚未写回数据库的浏览增量"""
+        return self.counter.increment("blog.views", uuid)
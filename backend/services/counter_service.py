@@ -0,0 +1,111 @@
+# ------------------------------------------------------------
+# @author: Churk
+# @status: 阶段性完工
+# @description: 计数器服务, 在内存中聚合浏览量等计数并定期批量写回数据库
+# ------------------------------------------------------------
+
+import atexit
+from collections import defaultdict
+import threading
+from typing import Callable, Dict, Optional
+
+from flask import Flask
+
+from backend.config import Config
+from backend.core.Logger import get_logger
+
+logger = get_logger("Service_Counter")
+
+Flusher = Callable[[Dict[str, int]], None]
+
+
+class CounterService:
+    """
+    写回 (write-behind) 计数器.
+    每个 worker 在内存中累加计数, 由后台线程定期调用注册的 flusher 批量写入,
+    worker 退出时会再刷写一次, 避免丢失尚未写回的计数.
+    """
+
+    def __init__(
+        self,
+        flush_interval: float = Config.COUNTER_FLUSH_INTERVAL,
+        flush_threshold: int = Config.COUNTER_FLUSH_THRESHOLD,
+    ):
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self._flushers: Dict[str, Flusher] = {}
+        self._pending: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self._pending_total = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._app: Optional[Flask] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, name: str, flusher: Flusher):
+        """
+        注册计数器.
+        :param name: 计数器名称, 如 "blog.views"
+        :param flusher: 接收 {uuid: 增量} 并原子地写入数据库的函数
+        """
+        self._flushers[name] = flusher
+
+    def init_app(self, app: Flask):
+        """绑定应用并启动后台刷写线程"""
+        self._app = app
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="counter-flusher", daemon=True
+            )
+            self._thread.start()
+            atexit.register(self.shutdown)
+
+    def increment(self, name: str, uuid: str, n: int = 1) -> int:
+        """
+        累加计数.
+        :return: 该条目当前尚未写回的增量 (用于让响应立即反映本次计数)
+        """
+        if name not in self._flushers:
+            raise KeyError(f"Unknown counter: {name}")
+
+        with self._lock:
+            self._pending[name][uuid] += n
+            self._pending_total += 1
+            pending = self._pending[name][uuid]
+            should_flush = self._pending_total >= self.flush_threshold
+
+        # 未绑定应用 (如脚本环境) 时直接写入
+        if should_flush or self._app is None:
+            self.flush()
+        return pending
+
+    def flush(self):
+        """将缓冲区中的计数批量写回数据库, 写入失败的计数会放回缓冲区"""
+        with self._flush_lock:
+            with self._lock:
+                batches = {k: dict(v) for k, v in self._pending.items() if v}
+                self._pending.clear()
+                self._pending_total = 0
+
+            for name, deltas in batches.items():
+                try:
+                    if self._app is not None:
+                        with self._app.app_context():
+                            self._flushers[name](deltas)
+                    else:
+                        self._flushers[name](deltas)
+                except Exception as e:
+                    logger.error(f"刷写计数器 {name} 失败: {e}")
+                    with self._lock:
+                        for uuid, n in deltas.items():
+                            self._pending[name][uuid] += n
+                            self._pending_total += 1
+
+    def shutdown(self):
+        """停止后台线程并刷写剩余计数"""
+        self._stop.set()
+        self.flush()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
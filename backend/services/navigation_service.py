@@ -4,15 +4,27 @@
 # @description: 导航服务层, 包含导航项的创建, 更新, 删除, 查询等业务逻辑
 # ------------------------------------------------------------
 
-from typing import Any, Dict, List, Optional, Tuple
+import json
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-from backend.config import ROLE_ADMIN, ROLE_GUEST
+from backend.config import Config, ROLE_ADMIN, ROLE_GUEST
+from backend.core.Crawler import Crawler, is_http_url
+from backend.core.FileLock import file_lock
+from backend.core.Logger import get_logger
 from backend.data import NavigationRepository
+from backend.data.repositories.navigation_repo import IMPORT_FIELDS
+from backend.services.scheduler_service import SchedulerService
+
+logger = get_logger("Service_Navigation")
 
 
 class NavigationService:
-    def __init__(self, nav_repo: NavigationRepository):
+    def __init__(self, nav_repo: NavigationRepository, scheduler: SchedulerService):
         self.nav_repo = nav_repo
+        if Config.NAV_CRAWL_INTERVAL > 0:
+            scheduler.register(
+                "navigation.crawl", Config.NAV_CRAWL_INTERVAL, self.crawl
+            )
 
     def get_all(
         self, user_uuid: str = None, user_role: int = ROLE_GUEST, view_all: bool = False
@@ -24,6 +36,44 @@ class NavigationService:
         navs = self.nav_repo.get_all(user_uuid=user_uuid, view_all=view_all)
         return [nav.to_dict() for nav in navs]
 
+    def get_visible_json(self, user_uuid: str = None) -> Tuple[bytes, Optional[str]]:
+        """获取当前用户可见的导航列表, 返回预序列化的 JSON 数组与 ETag"""
+        return self.nav_repo.get_visible_json(user_uuid)
+
+    def suggest(
+        self,
+        query: str,
+        limit: int,
+        user_uuid: str = None,
+        user_role: int = ROLE_GUEST,
+        view_all: bool = False,
+    ) -> List[Dict[str, Any]]:
+        if view_all and user_role < ROLE_ADMIN:
+            view_all = False
+
+        return self.nav_repo.suggest(
+            query, user_uuid=user_uuid, view_all=view_all, limit=limit
+        )
+
+    def get_categories(self) -> List[str]:
+        return self.nav_repo.get_categories()
+
+    def get_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        user_uuid: str = None,
+        user_role: int = ROLE_GUEST,
+        view_all: bool = False,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        if view_all and user_role < ROLE_ADMIN:
+            view_all = False
+
+        navs, next_cursor = self.nav_repo.get_page(
+            limit, cursor, user_uuid=user_uuid, view_all=view_all
+        )
+        return [nav.to_dict() for nav in navs], next_cursor
+
     def get_by_uuid(
         self, uuid: str, user_uuid: str = None, user_role: int = ROLE_GUEST
     ) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
@@ -101,3 +151,158 @@ class NavigationService:
         if success:
             return True, "导航删除成功"
         return False, "导航不存在"
+
+    def _normalize_import_item(self, index: int, item: Any) -> dict:
+        """校验一条导入项, 只保留可导入的字段, 不合法时抛出 ValueError"""
+        if not isinstance(item, dict):
+            raise ValueError(f"第 {index} 项不是对象")
+        title, url = item.get("title"), item.get("url")
+        if not isinstance(title, str) or not title.strip():
+            raise ValueError(f"第 {index} 项缺少标题")
+        if not isinstance(url, str) or not url.strip():
+            raise ValueError(f"第 {index} 项缺少链接")
+
+        data = {key: item[key] for key in IMPORT_FIELDS if key in item}
+        data["title"], data["url"] = title.strip(), url.strip()
+        for key in ("icon", "description", "category"):
+            if data.get(key) is not None and not isinstance(data[key], str):
+                raise ValueError(f"第 {index} 项的 {key} 必须为字符串")
+        if "order" in data:
+            # bool 是 int 的子类, true/false 不视为排序值
+            if isinstance(data["order"], bool):
+                raise ValueError(f"第 {index} 项的排序值无效")
+            try:
+                data["order"] = int(data["order"])
+            except (TypeError, ValueError):
+                raise ValueError(f"第 {index} 项的排序值无效")
+        if "is_public" in data and not isinstance(data["is_public"], bool):
+            # 不做真值转换, 否则 "false" 之类的字符串会被导入为公开
+            raise ValueError(f"第 {index} 项的 is_public 必须为布尔值")
+        return data
+
+    def import_items(
+        self, items: List[Any], user_uuid: str = None, user_role: int = ROLE_GUEST
+    ) -> Tuple[bool, str, Optional[Dict[str, int]]]:
+        """
+        批量导入导航, 按 URL 在导入者的范围内覆盖已存在的项.
+        管理员导入为系统/公共导航, 成员导入为自己的导航.
+        """
+        try:
+            rows = [
+                self._normalize_import_item(i, item)
+                for i, item in enumerate(items, start=1)
+            ]
+        except ValueError as e:
+            return False, f"无效的导入数据: {e}", None
+        if not rows:
+            return False, "没有可导入的导航", None
+
+        owner_uuid = None if user_role >= ROLE_ADMIN else user_uuid
+        try:
+            result = self.nav_repo.bulk_upsert(rows, owner_uuid)
+        except Exception as e:
+            return False, f"导入失败: {str(e)}", None
+        return True, "导航导入成功", result
+
+    def export_ndjson(
+        self, user_uuid: str = None, user_role: int = ROLE_GUEST, view_all: bool = False
+    ) -> Iterator[bytes]:
+        """逐行导出当前用户可见的导航 (NDJSON), 格式可直接用于导入"""
+        if view_all and user_role < ROLE_ADMIN:
+            view_all = False
+
+        for nav in self.nav_repo.iter_visible(user_uuid=user_uuid, view_all=view_all):
+            yield json.dumps(nav.to_dict(), ensure_ascii=False).encode() + b"\n"
+
+    def reorder(
+        self, items: List[Any], user_uuid: str = None, user_role: int = ROLE_GUEST
+    ) -> Tuple[bool, str]:
+        """批量调整排序, 需要对每一项都有修改权限, 否则整批不生效"""
+        orders = {}
+        for item in items:
+            if not isinstance(item, dict) or not isinstance(item.get("uuid"), str):
+                return False, "无效的排序数据"
+            try:
+                orders[item["uuid"]] = int(item.get("order"))
+            except (TypeError, ValueError):
+                return False, "无效的排序数据"
+        if not orders:
+            return False, "无效的排序数据"
+
+        owners = self.nav_repo.get_owners(list(orders))
+        if len(owners) != len(orders):
+            return False, "导航不存在"
+        if user_role < ROLE_ADMIN and any(
+            owner != user_uuid for owner in owners.values()
+        ):
+            return False, "权限不足"
+
+        try:
+            self.nav_repo.reorder(orders)
+        except Exception as e:
+            return False, f"排序失败: {str(e)}"
+        return True, "排序更新成功"
+
+    def get_favicon_path(self, name: str):
+        return self.nav_repo.get_favicon_path(name)
+
+    def crawl(self, limit: Optional[int] = None) -> Optional[Dict[str, int]]:
+        """
+        检查一批从未检查或结果已过期的导航链接, 记录状态码与延迟, 并缓存链接形式的图标.
+        所有 worker 都会定时执行, 通过文件锁保证同一时间只有一个在检查;
+        未获取到锁时返回 None.
+        """
+        with file_lock("navigation_crawl", blocking=False) as acquired:
+            if not acquired:
+                return None
+
+            targets = self.nav_repo.get_crawl_targets(
+                limit or Config.NAV_CRAWL_BATCH, Config.NAV_CRAWL_MAX_AGE
+            )
+            summary = {"checked": len(targets), "alive": 0, "dead": 0, "icons": 0}
+            if not targets:
+                return summary
+
+            crawler = Crawler(
+                concurrency=Config.NAV_CRAWL_CONCURRENCY,
+                host_interval=Config.NAV_CRAWL_HOST_INTERVAL,
+                timeout=Config.NAV_CRAWL_TIMEOUT,
+                allow_private=Config.NAV_CRAWL_ALLOW_PRIVATE,
+            )
+            results = crawler.run(
+                (nav_id, url, icon if is_http_url(icon) else None)
+                for nav_id, url, icon, _ in targets
+            )
+
+            rows = []
+            for nav_id, url, icon, favicon in targets:
+                result = results[nav_id]
+                if not is_http_url(icon):
+                    favicon = None
+                elif result["icon"]:
+                    favicon = self.nav_repo.save_favicon(
+                        result["icon"], result["icon_ext"]
+                    )
+                    summary["icons"] += 1
+                # 图标下载失败时保留上次缓存的图标
+
+                status = result["status"]
+                if status is not None and status < 400:
+                    summary["alive"] += 1
+                else:
+                    summary["dead"] += 1
+                rows.append(
+                    {
+                        "id": nav_id,
+                        "url": url,
+                        "icon": icon,
+                        "status_code": status,
+                        "latency_ms": result["latency_ms"],
+                        "favicon": favicon,
+                    }
+                )
+
+            self.nav_repo.record_checks(rows)
+            self.nav_repo.sweep_favicons()
+            logger.info(f"导航链接检查完成: {summary}")
+            return summary
@@ -4,28 +4,57 @@
 # @description: 项目服务层, 包含项目项的创建, 更新, 删除, 查询等业务逻辑
 # ------------------------------------------------------------
 
-from typing import Any, Dict, List, Optional, Tuple
+from pathlib import Path
+from typing import IO, Any, Dict, List, Optional, Tuple, Union
 
 from backend.config import ROLE_ADMIN, ROLE_GUEST
+from backend.core.Archive import ArchiveError
+from backend.core.GitStore import BlobStream
 from backend.data import ProjectRepository
+from backend.services.counter_service import CounterService
 
 
 class ProjectService:
-    def __init__(self, proj_repo: ProjectRepository):
+    def __init__(self, proj_repo: ProjectRepository, counter: CounterService):
         self.proj_repo = proj_repo
+        self.counter = counter
+        self.counter.register(
+            "project.views", lambda deltas: self.proj_repo.add_counts("views", deltas)
+        )
 
     def get_all(
+        self,
+        user_uuid: Optional[str] = None,
+        view_all: bool = False,
+        tag: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        return self.proj_repo.get_all(user_uuid=user_uuid, view_all=view_all, tag=tag)
+
+    def get_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        user_uuid: Optional[str] = None,
+        view_all: bool = False,
+        tag: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        return self.proj_repo.get_page(
+            limit, cursor, user_uuid=user_uuid, view_all=view_all, tag=tag
+        )
+
+    def get_tags(
         self, user_uuid: Optional[str] = None, view_all: bool = False
     ) -> List[Dict[str, Any]]:
-        return self.proj_repo.get_all(user_uuid=user_uuid, view_all=view_all)
+        return self.proj_repo.get_tags(user_uuid=user_uuid, view_all=view_all)
 
     def get_by_uuid(
         self,
         uuid: str,
         user_uuid: Optional[str] = None,
         user_role: int = ROLE_GUEST,
+        as_html: bool = False,
     ) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
-        project = self.proj_repo.get_by_uuid(uuid)
+        project = self.proj_repo.get_by_uuid(uuid, as_html=as_html)
         if not project:
             return False, "项目不存在", None
 
@@ -44,12 +73,39 @@ class ProjectService:
 
         return False, "权限不足", None
 
+    def _check_access(
+        self,
+        uuid: str,
+        user_uuid: Optional[str] = None,
+        user_role: int = ROLE_GUEST,
+        write: bool = False,
+    ) -> Tuple[bool, str]:
+        """仅根据数据库中的所有者与可见性鉴权, 不读取 README"""
+        perm = self.proj_repo.get_permission(uuid)
+        if not perm:
+            return False, "项目不存在"
+
+        is_admin = user_role >= ROLE_ADMIN
+        is_owner = user_uuid and perm["owner_uuid"] == user_uuid
+
+        if write:
+            if not (is_admin or is_owner):
+                return False, "权限不足"
+        elif not (perm["is_public"] or is_admin or is_owner):
+            return False, "权限不足"
+
+        return True, "鉴权成功"
+
     def create(
         self, data: dict, user_uuid: str, user_role: int = ROLE_GUEST
     ) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
         if user_role < ROLE_ADMIN:
             return False, "权限不足", None
 
+        error = self._check_git_repo(data, user_role)
+        if error:
+            return False, error, None
+
         data["owner_uuid"] = user_uuid
         try:
             proj = self.proj_repo.create(data)
@@ -63,52 +119,82 @@ class ProjectService:
         data: dict,
         user_role: int = ROLE_GUEST,
         user_uuid: Optional[str] = None,
+        partial: bool = False,
     ) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
-        success, msg, project = self.get_by_uuid(
-            uuid, user_uuid=user_uuid, user_role=user_role
-        )
+        """
+        更新项目.
+        :param partial: PATCH 语义, 返回值不包含 README
+        """
+        success, msg = self._check_access(uuid, user_uuid, user_role, write=True)
         if not success:
             return False, msg, None
 
-        if user_role < ROLE_ADMIN and project.get("owner_uuid") != user_uuid:
-            return False, "权限不足", None
+        error = self._check_git_repo(
+            data, user_role, self.proj_repo.get_git_repo_name(uuid)
+        )
+        if error:
+            return False, error, None
 
-        proj = self.proj_repo.update(uuid, data)
+        proj = self.proj_repo.update(uuid, data, show_content=not partial)
         if not proj:
             return False, "项目不存在", None
         return True, "项目更新成功", proj
 
+    def import_archive(
+        self,
+        uuid: str,
+        fileobj: IO[bytes],
+        strip: int = 0,
+        user_role: int = ROLE_GUEST,
+        user_uuid: Optional[str] = None,
+    ) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
+        """上传 zip / tar 归档并解压到项目目录"""
+        success, msg = self._check_access(uuid, user_uuid, user_role, write=True)
+        if not success:
+            return False, msg, None
+
+        try:
+            result = self.proj_repo.import_archive(uuid, fileobj, strip=strip)
+        except ArchiveError as e:
+            return False, f"无效的归档: {str(e)}", None
+        except Exception as e:
+            # 合并到项目目录时的文件系统错误 (包括 FileNotFoundError) 属于服务端错误
+            return False, f"导入归档失败: {str(e)}", None
+
+        if result is None:
+            return False, "项目不存在", None
+        return True, "归档导入成功", result
+
     def delete(
         self, uuid: str, user_role: int = ROLE_GUEST, user_uuid: Optional[str] = None
     ) -> Tuple[bool, str]:
-        success, msg, project = self.get_by_uuid(
-            uuid, user_uuid=user_uuid, user_role=user_role
-        )
+        success, msg = self._check_access(uuid, user_uuid, user_role, write=True)
         if not success:
             return False, msg
 
-        if user_role < ROLE_ADMIN and project.get("owner_uuid") != user_uuid:
-            return False, "权限不足"
-
         if self.proj_repo.delete(uuid):
             return True, "项目删除成功"
         return False, "项目不存在"
 
+    def increment_views(self, uuid: str) -> int:
+        """缓冲一次浏览计数, 返回尚未写回数据库的浏览增量"""
+        return self.counter.increment("project.views", uuid)
+
     def get_file_tree(
         self,
         uuid: str,
         path: str = "",
         user_role: int = ROLE_GUEST,
         user_uuid: Optional[str] = None,
+        depth: int = 1,
+        ref: Optional[str] = None,
     ) -> Tuple[bool, str, Optional[List[Dict[str, Any]]]]:
-        success, msg, _ = self.get_by_uuid(
-            uuid, user_uuid=user_uuid, user_role=user_role
-        )
+        success, msg = self._check_access(uuid, user_uuid, user_role)
         if not success:
             return False, msg, None
 
         try:
-            files = self.proj_repo.get_file_tree(uuid, path)
+            files = self.proj_repo.get_file_tree(uuid, path, depth, ref)
             return True, "文件树获取成功", files
         except FileNotFoundError:
             return False, "路径不存在", None
@@ -121,17 +207,117 @@ class ProjectService:
         path: str,
         user_role: int = ROLE_GUEST,
         user_uuid: Optional[str] = None,
+        ref: Optional[str] = None,
     ) -> Tuple[bool, str, Optional[str]]:
-        success, msg, _ = self.get_by_uuid(
-            uuid, user_uuid=user_uuid, user_role=user_role
-        )
+        success, msg = self._check_access(uuid, user_uuid, user_role)
         if not success:
             return False, msg, None
 
         try:
-            content = self.proj_repo.get_file_content(uuid, path)
+            content = self.proj_repo.get_file_content(uuid, path, ref)
             return True, "文件内容获取成功", content
         except FileNotFoundError:
             return False, "文件不存在", None
         except Exception as e:
             return False, f"读取文件内容失败: {str(e)}", None
+
+    def get_file_lines(
+        self,
+        uuid: str,
+        path: str,
+        start_line: int,
+        end_line: int,
+        user_role: int = ROLE_GUEST,
+        user_uuid: Optional[str] = None,
+        ref: Optional[str] = None,
+    ) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
+        success, msg = self._check_access(uuid, user_uuid, user_role)
+        if not success:
+            return False, msg, None
+
+        try:
+            lines = self.proj_repo.get_file_lines(uuid, path, start_line, end_line, ref)
+            return True, "文件内容获取成功", lines
+        except FileNotFoundError:
+            return False, "文件不存在", None
+        except Exception as e:
+            return False, f"读取文件内容失败: {str(e)}", None
+
+    def get_raw_file(
+        self,
+        uuid: str,
+        path: str,
+        user_role: int = ROLE_GUEST,
+        user_uuid: Optional[str] = None,
+        ref: Optional[str] = None,
+    ) -> Tuple[bool, str, Optional[Union[Path, Tuple[str, Union[bytes, BlobStream]]]]]:
+        """
+        获取原始文件, 由 API 层直接发送 (支持 HTTP Range).
+        :return: data 为文件路径, 或 git 仓库中的 (blob sha, 内容或 BlobStream)
+        """
+        success, msg = self._check_access(uuid, user_uuid, user_role)
+        if not success:
+            return False, msg, None
+
+        try:
+            return True, "", self.proj_repo.get_raw_file(uuid, path, ref)
+        except FileNotFoundError:
+            return False, "文件不存在", None
+        except Exception as e:
+            return False, f"读取文件失败: {str(e)}", None
+
+    def get_refs(
+        self, uuid: str, user_role: int = ROLE_GUEST, user_uuid: Optional[str] = None
+    ) -> Tuple[bool, str, Optional[List[Dict[str, str]]]]:
+        """列出关联 git 仓库的分支与标签"""
+        success, msg = self._check_access(uuid, user_uuid, user_role)
+        if not success:
+            return False, msg, None
+
+        try:
+            refs = self.proj_repo.get_refs(uuid)
+        except Exception as e:
+            return False, f"读取 git 引用失败: {str(e)}", None
+        if refs is None:
+            return False, "项目未关联 git 仓库", None
+        return True, "获取 git 引用成功", refs
+
+    def _check_git_repo(
+        self, data: dict, user_role: int, current: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        校验请求中的 git 仓库路径, 返回错误信息.
+        关联仓库即可读取仓库的全部内容, 因此只允许管理员设置或取消关联;
+        其他用户提交的值与当前值 current 相同时视为未修改
+        """
+        if "git_repo" not in data or (data["git_repo"] or None) == current:
+            return None
+        if user_role < ROLE_ADMIN:
+            return "权限不足"
+        if not data["git_repo"]:
+            return None
+        try:
+            self.proj_repo.resolve_git_repo(data["git_repo"])
+        except ValueError:
+            return "无效的 git 仓库"
+        return None
+
+    def get_archive(
+        self,
+        uuid: str,
+        fmt: str,
+        user_role: int = ROLE_GUEST,
+        user_uuid: Optional[str] = None,
+    ) -> Tuple[bool, str, Optional[tuple]]:
+        """
+        获取项目归档, 由 API 层发送缓存文件或流式发送数据.
+        :return: data 为 (目录指纹, 缓存文件, 数据流), 见 ProjectRepository.get_archive
+        """
+        success, msg = self._check_access(uuid, user_uuid, user_role)
+        if not success:
+            return False, msg, None
+
+        try:
+            return True, "", self.proj_repo.get_archive(uuid, fmt)
+        except FileNotFoundError:
+            return False, "项目目录不存在", None
@@ -0,0 +1,85 @@
+# ------------------------------------------------------------
+# @author: Churk
+# @status: 阶段性完工
+# @description: 定时任务服务, 在后台线程中周期性执行清理等维护任务
+# ------------------------------------------------------------
+
+import atexit
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from flask import Flask
+
+from backend.core.Logger import get_logger
+
+logger = get_logger("Service_Scheduler")
+
+
+class _Job:
+    __slots__ = ("func", "interval", "next_run")
+
+    def __init__(self, func: Callable[[], None], interval: float):
+        self.func = func
+        self.interval = interval
+        self.next_run = time.monotonic() + interval
+
+
+class SchedulerService:
+    """
+    周期任务调度器.
+    所有任务共用一个后台线程, 在应用上下文中依次执行, 单个任务出错不影响其他任务.
+    多 worker 部署时每个 worker 都会执行, 因此注册的任务必须是幂等的.
+    """
+
+    def __init__(self):
+        self._jobs: Dict[str, _Job] = {}
+        self._app: Optional[Flask] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, name: str, interval: float, func: Callable[[], None]):
+        """
+        注册周期任务.
+        :param name: 任务名称, 如 "blog.sweep_assets"
+        :param interval: 执行间隔 (秒), 首次执行在注册后一个间隔
+        :param func: 任务函数
+        """
+        self._jobs[name] = _Job(func, interval)
+
+    def init_app(self, app: Flask):
+        """绑定应用并启动后台线程"""
+        self._app = app
+        if self._thread is None and self._jobs:
+            self._thread = threading.Thread(
+                target=self._run, name="scheduler", daemon=True
+            )
+            self._thread.start()
+            atexit.register(self.shutdown)
+
+    def run(self, name: str):
+        """立即执行指定任务"""
+        job = self._jobs[name]
+        try:
+            if self._app is not None:
+                with self._app.app_context():
+                    job.func()
+            else:
+                job.func()
+        except Exception as e:
+            logger.error(f"执行定时任务 {name} 失败: {e}")
+        finally:
+            job.next_run = time.monotonic() + job.interval
+
+    def shutdown(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            now = time.monotonic()
+            for name, job in list(self._jobs.items()):
+                if job.next_run <= now:
+                    self.run(name)
+
+            next_run = min(job.next_run for job in self._jobs.values())
+            self._stop.wait(max(next_run - time.monotonic(), 0.1))
@@ -0,0 +1,43 @@
+# ------------------------------------------------------------
+# @author: Churk
+# @status: 阶段性完工
+# @description: 检索服务层, 对博客与项目进行全文检索
+# ------------------------------------------------------------
+
+from typing import Any, Dict, List, Optional
+
+from backend.config import ROLE_ADMIN, ROLE_GUEST
+from backend.data import BlogRepository, ProjectRepository
+
+
+class SearchService:
+    SCOPES = ("blog", "project")
+
+    def __init__(self, blog_repo: BlogRepository, proj_repo: ProjectRepository):
+        self.blog_repo = blog_repo
+        self.proj_repo = proj_repo
+
+    def search(
+        self,
+        query: str,
+        scopes: Optional[List[str]] = None,
+        user_uuid: Optional[str] = None,
+        user_role: int = ROLE_GUEST,
+        view_all: bool = False,
+        limit: int = 20,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        # 如果请求查看所有, 必须是管理员
+        if view_all and user_role < ROLE_ADMIN:
+            view_all = False
+
+        scopes = scopes or list(self.SCOPES)
+        result = {}
+        if "blog" in scopes:
+            result["blogs"] = self.blog_repo.search(
+                query, user_uuid=user_uuid, view_all=view_all, limit=limit
+            )
+        if "project" in scopes:
+            result["projects"] = self.proj_repo.search(
+                query, user_uuid=user_uuid, view_all=view_all, limit=limit
+            )
+        return result
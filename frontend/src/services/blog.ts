@@ -1,5 +1,5 @@
 import { request } from "@/utils/request";
-import type { Blog } from "@/types/models";
+import type { Blog, BlogDraft } from "@/types/models";
 import type { CreateBlogDto, UpdateBlogDto } from "@/types/api";
 
 export const blogService = {
@@ -31,6 +31,37 @@ export const blogService = {
     });
   },
 
+  async getDraft(uuid: string): Promise<BlogDraft | null> {
+    try {
+      return await request<BlogDraft>(`/api/blog/${uuid}/draft`, {}, {
+        silent: true,
+      });
+    } catch {
+      return null;
+    }
+  },
+
+  async saveDraft(
+    uuid: string,
+    content: string,
+    revision: number,
+  ): Promise<Omit<BlogDraft, "content">> {
+    return request<Omit<BlogDraft, "content">>(
+      `/api/blog/${uuid}/draft`,
+      {
+        method: "PUT",
+        body: JSON.stringify({ content, revision }),
+      },
+      { silent: true },
+    );
+  },
+
+  async publishDraft(uuid: string): Promise<Blog> {
+    return request<Blog>(`/api/blog/${uuid}/draft/publish`, {
+      method: "POST",
+    });
+  },
+
   async uploadAsset(uuid: string, file: File): Promise<{ uuid: string }> {
     const formData = new FormData();
     formData.append("file", file);
@@ -1,6 +1,14 @@
 import { request } from "@/utils/request";
-import type { Navigation } from "@/types/models";
-import type { CreateNavigationDto, UpdateNavigationDto } from "@/types/api";
+import type {
+  Navigation,
+  NavigationImportResult,
+  NavigationSuggestion,
+} from "@/types/models";
+import type {
+  CreateNavigationDto,
+  NavigationOrderDto,
+  UpdateNavigationDto,
+} from "@/types/api";
 
 export const navigationService = {
   getIcon(iconClass: string | undefined): any {
@@ -17,10 +25,20 @@ export const navigationService = {
     return iconClass;
   },
 
+  getFaviconUrl(favicon: string): string {
+    return `/api/navigation/favicon/${encodeURIComponent(favicon)}`;
+  },
+
   async getAll(showAll: boolean = false): Promise<Navigation[]> {
     return request<Navigation[]>(`/api/navigation/?all=${showAll}`);
   },
 
+  async suggest(query: string, limit = 10): Promise<NavigationSuggestion[]> {
+    return request<NavigationSuggestion[]>(
+      `/api/navigation/suggest?q=${encodeURIComponent(query)}&limit=${limit}`,
+    );
+  },
+
   async create(data: CreateNavigationDto): Promise<Navigation> {
     return request<Navigation>("/api/navigation/", {
       method: "POST",
@@ -40,4 +58,24 @@ export const navigationService = {
       method: "DELETE",
     });
   },
+
+  async importItems(
+    items: CreateNavigationDto[],
+  ): Promise<NavigationImportResult> {
+    return request<NavigationImportResult>("/api/navigation/import", {
+      method: "POST",
+      body: JSON.stringify({ items }),
+    });
+  },
+
+  getExportUrl(showAll: boolean = false): string {
+    return `/api/navigation/export?all=${showAll}`;
+  },
+
+  async reorder(items: NavigationOrderDto[]): Promise<void> {
+    return request<void>("/api/navigation/order", {
+      method: "PUT",
+      body: JSON.stringify({ items }),
+    });
+  },
 };
@@ -1,5 +1,11 @@
 import { request } from "@/utils/request";
-import type { Project, ProjectFile } from "@/types/models";
+import type {
+  Project,
+  ProjectFile,
+  ProjectFileLines,
+  ProjectImportResult,
+  ProjectRef,
+} from "@/types/models";
 import type { CreateProjectDto, UpdateProjectDto } from "@/types/api";
 
 export const projectService = {
@@ -11,14 +17,73 @@ export const projectService = {
     return request<Project>(`/api/project/${uuid}`);
   },
 
-  async getFileTree(uuid: string, path: string = ""): Promise<ProjectFile[]> {
-    const query = path ? `?path=${encodeURIComponent(path)}` : "";
+  async getFileTree(
+    uuid: string,
+    path: string = "",
+    depth: number = 1,
+    ref?: string,
+  ): Promise<ProjectFile[]> {
+    const params = new URLSearchParams();
+    if (path) params.set("path", path);
+    if (depth !== 1) params.set("depth", String(depth));
+    if (ref) params.set("ref", ref);
+    const query = params.toString() ? `?${params}` : "";
     return request<ProjectFile[]>(`/api/project/${uuid}/files${query}`);
   },
 
-  async getFileContent(uuid: string, path: string): Promise<string> {
-    const query = `?path=${encodeURIComponent(path)}`;
-    return request<string>(`/api/project/${uuid}/file${query}`);
+  async getFileContent(
+    uuid: string,
+    path: string,
+    ref?: string,
+  ): Promise<string> {
+    const params = new URLSearchParams({ path });
+    if (ref) params.set("ref", ref);
+    return request<string>(`/api/project/${uuid}/file?${params}`);
+  },
+
+  async getFileLines(
+    uuid: string,
+    path: string,
+    startLine: number,
+    endLine?: number,
+    ref?: string,
+  ): Promise<ProjectFileLines> {
+    const params = new URLSearchParams({
+      path,
+      start_line: String(startLine),
+    });
+    if (endLine !== undefined) params.set("end_line", String(endLine));
+    if (ref) params.set("ref", ref);
+    return request<ProjectFileLines>(`/api/project/${uuid}/file?${params}`);
+  },
+
+  getRawFileUrl(uuid: string, path: string, ref?: string): string {
+    const params = new URLSearchParams({ path });
+    if (ref) params.set("ref", ref);
+    return `/api/project/${uuid}/raw?${params}`;
+  },
+
+  async getRefs(uuid: string): Promise<ProjectRef[]> {
+    return request<ProjectRef[]>(`/api/project/${uuid}/refs`);
+  },
+
+  getArchiveUrl(uuid: string, format: "zip" | "tar.gz" = "zip"): string {
+    return `/api/project/${uuid}/archive?format=${encodeURIComponent(format)}`;
+  },
+
+  async uploadArchive(
+    uuid: string,
+    file: File,
+    strip = 0,
+  ): Promise<ProjectImportResult> {
+    const formData = new FormData();
+    formData.append("file", file);
+    formData.append("strip", String(strip));
+
+    return request<ProjectImportResult>(`/api/project/${uuid}/upload`, {
+      method: "POST",
+      body: formData,
+    });
   },
 
   async create(data: CreateProjectDto): Promise<Project> {
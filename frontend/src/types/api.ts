@@ -23,6 +23,7 @@ export interface CreateProjectDto {
   readme?: string;
   url?: string;
   icon?: string;
+  git_repo?: string;
   tags?: string[];
   is_public?: boolean;
   order?: number;
@@ -42,6 +43,11 @@ export interface CreateNavigationDto {
 
 export interface UpdateNavigationDto extends Partial<CreateNavigationDto> {}
 
+export interface NavigationOrderDto {
+  uuid: string;
+  order: number;
+}
+
 export interface UserAvatar {
   avatar_url: string;
   filename: string;
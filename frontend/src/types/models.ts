@@ -27,11 +27,53 @@ export interface Blog {
   updated_at: string;
 }
 
+export interface BlogDraft {
+  content: string;
+  revision: number;
+  saved_at: string;
+}
+
 export interface ProjectFile {
   name: string;
   type: "file" | "directory";
   path: string;
   size: number;
+  // 仅在按 depth 展开时存在, 缺失表示该目录尚未加载
+  children?: ProjectFile[];
+}
+
+export interface ProjectFileLines {
+  content: string;
+  start_line: number;
+  end_line: number;
+  total_lines: number;
+  truncated: boolean;
+}
+
+export interface ProjectImportResult {
+  files: number;
+  bytes: number;
+  readme: boolean;
+}
+
+export interface NavigationSuggestion {
+  uuid: string;
+  title: string;
+  url: string;
+  icon?: string;
+  category?: string;
+  description?: string;
+}
+
+export interface NavigationImportResult {
+  created: number;
+  updated: number;
+}
+
+export interface ProjectRef {
+  name: string;
+  type: "branch" | "tag";
+  sha: string;
 }
 
 export interface Project {
@@ -42,6 +84,7 @@ export interface Project {
   readme?: string;
   url?: string;
   icon?: string;
+  git_repo?: string;
   tags: string[];
   is_public: boolean;
   order: number;
@@ -61,6 +104,10 @@ export interface Navigation {
   category?: string;
   is_public: boolean;
   order: number;
+  status_code?: number | null;
+  latency_ms?: number | null;
+  checked_at?: string | null;
+  favicon?: string | null;
   created_at: string;
   updated_at: string;
 }
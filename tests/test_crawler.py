@@ -0,0 +1,178 @@
+# ------------------------------------------------------------
+# @author: Churk
+# @status: 阶段性完工
+# @description: 链接检查模块测试, 以本地 HTTP 服务代替外部站点
+# ------------------------------------------------------------
+
+import socket
+import socketserver
+import threading
+import time
+
+import pytest
+
+from backend.core.Crawler import ICON_MAX_BYTES, Crawler
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\0" * 64
+
+
+def _chunked(body: bytes, size: int) -> bytes:
+    chunks = [body[i : i + size] for i in range(0, len(body), size)]
+    return b"".join(b"%x\r\n%s\r\n" % (len(c), c) for c in chunks) + b"0\r\n\r\n"
+
+
+# 路径 -> (状态行与响应头, 响应体), 响应体为 None 时不发送
+_ROUTES = {
+    "/ok": (b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n", b"ok"),
+    "/missing": (b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\n", b""),
+    "/redirect": (b"HTTP/1.1 302 Found\r\nLocation: /ok\r\n", b""),
+    "/loop": (b"HTTP/1.1 301 Moved\r\nLocation: /loop\r\n", b""),
+    "/icon.png": (
+        b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\n" % len(PNG),
+        PNG,
+    ),
+    "/icon-chunked.png": (
+        b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n",
+        _chunked(PNG, 10),
+    ),
+    "/icon-until-close.png": (b"HTTP/1.1 200 OK\r\n", PNG),
+    "/icon-large.png": (
+        b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\n" % (ICON_MAX_BYTES + 1),
+        PNG + b"\0" * (ICON_MAX_BYTES + 1 - len(PNG)),
+    ),
+    "/icon-large-chunked.png": (
+        b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n",
+        _chunked(PNG + b"\0" * ICON_MAX_BYTES, 65536),
+    ),
+    "/not-an-icon.png": (b"HTTP/1.1 200 OK\r\nContent-Length: 5\r\n", b"<html"),
+}
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        request_line = self.rfile.readline().decode("latin-1")
+        while self.rfile.readline() not in (b"\r\n", b"\n", b""):
+            pass
+        path = request_line.split()[1]
+        self.server.requests.append((time.monotonic(), path))
+
+        head, body = _ROUTES.get(path, _ROUTES["/missing"])
+        try:
+            self.wfile.write(head + b"Connection: close\r\n\r\n" + body)
+        except OSError:
+            # 客户端超过大小上限后提前断开
+            pass
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.requests = []
+
+
+@pytest.fixture
+def server():
+    srv = _Server()
+    thread = threading.Thread(
+        target=srv.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+@pytest.fixture
+def base(server):
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def _crawler(**kwargs) -> Crawler:
+    kwargs.setdefault("host_interval", 0)
+    kwargs.setdefault("timeout", 5)
+    kwargs.setdefault("allow_private", True)
+    return Crawler(**kwargs)
+
+
+def test_status_and_latency(base):
+    results = _crawler().run([(1, f"{base}/ok", None), (2, f"{base}/missing", None)])
+    assert results[1]["status"] == 200
+    assert results[1]["latency_ms"] is not None
+    assert results[2]["status"] == 404
+
+
+def test_follows_redirects(base, server):
+    result = _crawler().run([(1, f"{base}/redirect", None)])[1]
+    assert result["status"] == 200
+    assert [path for _, path in server.requests] == ["/redirect", "/ok"]
+
+
+def test_redirect_loop_is_unreachable(base, server):
+    result = _crawler().run([(1, f"{base}/loop", None)])[1]
+    assert result["status"] is None
+    # 首次请求加上最多 5 次重定向
+    assert len(server.requests) == 6
+
+
+@pytest.mark.parametrize(
+    "path", ["/icon.png", "/icon-chunked.png", "/icon-until-close.png"]
+)
+def test_downloads_icon(base, path):
+    result = _crawler().run([(1, f"{base}/ok", f"{base}{path}")])[1]
+    assert result["icon"] == PNG
+    assert result["icon_ext"] == "png"
+
+
+@pytest.mark.parametrize(
+    "path", ["/icon-large.png", "/icon-large-chunked.png", "/not-an-icon.png"]
+)
+def test_rejects_invalid_icon(base, path):
+    result = _crawler().run([(1, f"{base}/ok", f"{base}{path}")])[1]
+    assert result["status"] == 200
+    assert result["icon"] is None
+    assert result["icon_ext"] is None
+
+
+def test_spaces_requests_to_same_host(base, server):
+    interval = 0.2
+    _crawler(host_interval=interval).run((i, f"{base}/ok?{i}", None) for i in range(4))
+    times = sorted(t for t, _ in server.requests)
+    assert len(times) == 4
+    # 间隔从上一次请求结束时计算, 因此相邻两次请求的到达时间至少相隔 interval
+    assert all(b - a >= interval * 0.9 for a, b in zip(times, times[1:]))
+
+
+def test_different_hosts_run_in_parallel(server):
+    port = server.server_address[1]
+    if socket.getaddrinfo("localhost", port, type=socket.SOCK_STREAM)[0][4][0] != (
+        "127.0.0.1"
+    ):
+        pytest.skip("localhost does not resolve to 127.0.0.1 first")
+    interval = 0.5
+    started = time.monotonic()
+    _crawler(host_interval=interval).run(
+        [
+            (1, f"http://127.0.0.1:{port}/ok", None),
+            (2, f"http://localhost:{port}/ok", None),
+        ]
+    )
+    assert len(server.requests) == 2
+    # 不同主机不互相等待, 两次请求都应在第一个间隔结束前到达
+    assert all(t - started < interval for t, _ in server.requests)
+
+
+def test_refuses_private_addresses(base, server):
+    results = Crawler(host_interval=0, timeout=5).run(
+        [(1, f"{base}/ok", f"{base}/icon.png")]
+    )
+    assert results[1]["status"] is None
+    assert results[1]["icon"] is None
+    assert server.requests == []
+
+
+def test_rejects_unsupported_scheme():
+    result = _crawler().run([(1, "ftp://127.0.0.1/", None)])[1]
+    assert result["status"] is None